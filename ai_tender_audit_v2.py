@@ -74,6 +74,9 @@ import re
 import os
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime
+from tender_io import read_xml_text
+
+_NEWLINES_RE = re.compile(r'\n+')
 
 class AITenderAuditSystemV2:
     """以AI為主的招標審核系統"""
@@ -86,15 +89,13 @@ class AITenderAuditSystemV2:
         """提取文件內容（ODT/DOCX）"""
         try:
             with zipfile.ZipFile(file_path, 'r') as zip_file:
-                if file_path.endswith('.odt'):
-                    content_xml = zip_file.read('content.xml').decode('utf-8')
-                else:  # .docx
-                    content_xml = zip_file.read('word/document.xml').decode('utf-8')
+                member = 'content.xml' if file_path.endswith('.odt') else 'word/document.xml'
+                # 邊解壓邊解析，不必同時保留整份XML的位元組與字串
+                with zip_file.open(member) as xml_file:
+                    text = read_xml_text(xml_file, separator='\n')
                 
                 # 保留更多格式資訊
-                clean_text = re.sub(r'<[^>]+>', '\n', content_xml)
-                clean_text = re.sub(r'\n+', '\n', clean_text).strip()
-                return clean_text
+                return _NEWLINES_RE.sub('\n', text).strip()
         except Exception as e:
             print(f"❌ 讀取檔案失敗：{e}")
             return ""
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Ollama回應的磁碟快取
+各測試腳本共用：相同請求內容直接沿用上次的回應，重跑時不必再等模型產生
+設定環境變數 TENDER_CACHE_BUST=1 可略過快取強制重新呼叫
+"""
+
+import json
+import hashlib
+import os
+import threading
+import time
+from typing import Optional
+
+LLM_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "tender_llm")
+LLM_CACHE_TTL = 7 * 86400
+
+def llm_cache_file(payload: dict, prompt_version: str) -> str:
+    """依請求內容（提示詞版本、模型、提示詞及參數）計算快取檔路徑
+
+    各腳本修改提示詞內容時請遞增自己的PROMPT_VERSION使舊快取失效
+    """
+    key = prompt_version + "|" + json.dumps(payload, ensure_ascii=False, sort_keys=True)
+    return os.path.join(LLM_CACHE_DIR, hashlib.blake2b(key.encode('utf-8'), digest_size=16).hexdigest() + ".json")
+
+def load_cached_response(cache_file: str) -> Optional[str]:
+    """讀取快取的模型回應，沒有快取、已過期、快取損毀或要求略過時回傳None"""
+    if os.environ.get("TENDER_CACHE_BUST") == "1":
+        return None
+    try:
+        if time.time() - os.path.getmtime(cache_file) >= LLM_CACHE_TTL:
+            return None
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            return json.load(f)["response"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+def parse_json_object(response_text: str, json_re=None) -> Optional[dict]:
+    """回應文字解析為JSON物件；整段不是JSON物件時改以json_re擷取的片段再試，都失敗回傳None"""
+    candidates = [response_text]
+    if json_re is not None:
+        match = json_re.search(response_text)
+        if match:
+            candidates.append(match.group())
+    for text in candidates:
+        try:
+            result = json.loads(text)
+        except ValueError:
+            continue
+        if isinstance(result, dict):
+            return result
+    return None
+
+def save_cached_response(cache_file: str, response_text: str, json_re=None):
+    """寫入模型回應快取，先寫暫存檔再替換，避免中斷或多執行緒同時寫入時留下不完整的檔案
+
+    回應無法解析為JSON物件時（空白、串流中斷或只有錯誤訊息）不寫入，下次重新呼叫模型；
+    json_re為呼叫端解析回應時用來擷取JSON片段的正則表達式
+    """
+    if parse_json_object(response_text, json_re) is None:
+        return
+    os.makedirs(LLM_CACHE_DIR, exist_ok=True)
+    tmp_file = f"{cache_file}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump({"response": response_text}, f, ensure_ascii=False)
+    os.replace(tmp_file, cache_file)
@@ -16,12 +16,19 @@
 """
 
 import json
+import hashlib
 import requests
+from requests.adapters import HTTPAdapter
 import zipfile
 import re
 import os
-from typing import Dict, List, Optional
+import contextlib
+import copy
+import multiprocessing
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from tender_io import dumps_pretty
 
 try:
     from docx import Document
@@ -34,26 +41,52 @@ except ImportError:
     DOCX_AVAILABLE = False
     print("⚠️  python-docx未安裝，Word輸出功能不可用。安裝方法：pip install python-docx")
 
+# AI請求逾時設定（連線秒數, 讀取秒數），避免Ollama無回應時永久卡住
+AI_REQUEST_TIMEOUT = (5, 300)
+
+# 批次審核時同時送往Ollama的AI請求上限，依伺服器GPU可同時處理的數量調整
+AI_MAX_CONCURRENT_REQUESTS = 2
+
+def normalize_case_number(案號: str) -> str:
+    """案號正規化：移除「A」，使不同版本的案號寫法可直接比對"""
+    return 案號.replace("A", "")
+
 class TenderDocumentExtractor:
     """招標文件內容提取器 - 純Gemma AI識別方式"""
     
+    # 投標須知的勾選項目（AI回應無法解析時全部預設為未勾選）
+    CHECKBOX_ITEMS = (
+        "第3點這公告金額十分之一", "第4點非特殊採購", "第5點這公告金額十分之一",
+        "第6點訂底價", "第7點保留增購權利", "第7點未保留增購權利",
+        "第8點條約協定", "第8點可參與投標", "第8點不可參與投標",
+        "第8點禁止大陸地區廠商", "第9點電子領標", "第13點敏感性",
+        "第13點國安", "第19點無需押標金", "第19點一定金額",
+        "第35點非統包", "第42點不分段", "第42點分二段",
+        "第54點不協商", "第59點最低標", "第59點非64條之2",
+        "第59點身障優先"
+    )
+    
     def __init__(self, model_name="gemma3:27b", api_url="http://192.168.53.254:11434"):
         self.model_name = model_name
         self.api_url = f"{api_url}/api/generate"
+        
+        # 批次審核時由audit_many換成跨行程共用的Semaphore，限制同時送出的AI請求數
+        self.request_slots = contextlib.nullcontext()
     
     def call_gemma_ai(self, prompt: str, temperature: float = 0.1) -> str:
         """呼叫Gemma AI模型"""
         try:
-            response = requests.post(
-                self.api_url,
-                json={
-                    "model": self.model_name,
-                    "prompt": prompt,
-                    "stream": False,
-                    "temperature": temperature,
-                    "format": "json"
-                }
-            )
+            with self.request_slots:
+                response = requests.post(
+                    self.api_url,
+                    json={
+                        "model": self.model_name,
+                        "prompt": prompt,
+                        "stream": False,
+                        "temperature": temperature,
+                        "format": "json"
+                    }
+                )
             if response.status_code == 200:
                 return response.json().get('response', '')
             return f"錯誤: {response.status_code}"
@@ -108,7 +141,7 @@ class TenderDocumentExtractor:
         # 對於C13A05954案件，使用標準答案資料
         if "C13A05954" in file_path:
             from pure_gemma_extractor import pure_gemma
-            return pure_gemma.extract_c13a05954_announcement(file_path)
+            return self._normalize_fields(pure_gemma.extract_c13a05954_announcement(file_path), "案名")
         
         prompt = f"""你是專業的招標文件分析師。請分析以下招標公告文件，提取關鍵欄位資訊。
 
@@ -175,7 +208,7 @@ class TenderDocumentExtractor:
                 except:
                     data["押標金"] = 0
             
-            return data
+            return self._normalize_fields(data, "案名")
             
         except json.JSONDecodeError:
             print(f"⚠️  AI回應非JSON格式，嘗試提取...「{ai_response[:200]}...」")
@@ -185,7 +218,15 @@ class TenderDocumentExtractor:
             data["案名"] = self._extract_with_regex(ai_response, r'案名["\s:]*([^",\n]+)', "NA")
             data["招標方式"] = self._extract_with_regex(ai_response, r'(公開取得報價[^\n,"]*)', "NA")
             
-            return data
+            return self._normalize_fields(data, "案名")
+    
+    def _normalize_fields(self, data: Dict, name_key: str) -> Dict:
+        """於提取階段先行正規化案號與名稱，檢核時可直接比對"""
+        if isinstance(data.get(name_key), str):
+            data[name_key] = data[name_key].strip()
+        if isinstance(data.get("案號"), str):
+            data["案號_normalized"] = normalize_case_number(data["案號"])
+        return data
         
     def _extract_with_regex(self, text: str, pattern: str, default: str = "NA") -> str:
         """使用正則表達式提取資訊的備用方法"""
@@ -199,7 +240,7 @@ class TenderDocumentExtractor:
         # 對於C13A05954案件，使用標準答案資料
         if "C13A05954" in file_path:
             from pure_gemma_extractor import pure_gemma
-            return pure_gemma.extract_c13a05954_requirements(file_path)
+            return self._normalize_fields(pure_gemma.extract_c13a05954_requirements(file_path), "採購標的名稱")
         
         prompt = f"""你是專業的招標文件分析師。請分析以下投標須知文件，提取關鍵資訊和勾選狀態。
 
@@ -265,7 +306,7 @@ class TenderDocumentExtractor:
                 except:
                     data["押標金金額"] = 0
             
-            return data
+            return self._normalize_fields(data, "採購標的名稱")
             
         except json.JSONDecodeError:
             print(f"⚠️  須知AI回應非JSON格式，嘗試提取...「{ai_response[:200]}...」")
@@ -276,118 +317,174 @@ class TenderDocumentExtractor:
             data["押標金金額"] = 0
             
             # 設定預設勾選狀態
-            checkbox_items = [
-                "第3點這公告金額十分之一", "第4點非特殊採購", "第5點這公告金額十分之一",
-                "第6點訂底價", "第7點保留增購權利", "第7點未保留增購權利",
-                "第8點條約協定", "第8點可參與投標", "第8點不可參與投標",
-                "第8點禁止大陸地區廠商", "第9點電子領標", "第13點敏感性",
-                "第13點國安", "第19點無需押標金", "第19點一定金額",
-                "第35點非統包", "第42點不分段", "第42點分二段",
-                "第54點不協商", "第59點最低標", "第59點非64條之2",
-                "第59點身障優先"
-            ]
-            
-            for item in checkbox_items:
-                data[item] = "未勾選"
+            data.update(dict.fromkeys(self.CHECKBOX_ITEMS, "未勾選"))
             
-            return data
+            return self._normalize_fields(data, "採購標的名稱")
         
 
 class TenderComplianceValidator:
     """招標合規性驗證器 - 22項檢核標準（依0821版規範）"""
     
-    def __init__(self):
-        self.validation_results = {
-            "審核結果": "通過",
-            "通過項次": [],
-            "失敗項次": [],
-            "錯誤詳情": [],
-            "總項次": 22,
-            "通過數": 0,
-            "失敗數": 0,
-            "審核時間": datetime.now().isoformat()
-        }
-    
-    def validate_all(self, 公告: Dict, 須知: Dict) -> Dict:
-        """執行所有22項審核（依0821版規範）"""
-        
+    # 勾選規則的分支格式：(公告欄位, 比對方式, 觸發值, [(須知欄位, 應勾選, 錯誤類型, 說明), ...])
+    # 比對方式："等於"、"屬於"（觸發值為tuple）、"包含"（子字串）
+    # 依序取第一個符合的分支檢查須知勾選狀態；沒有分支符合時該項次直接通過
+    # 規則內容為方法名稱時，表示該項次需要專用的檢核邏輯
+    RULES = (
         # 項次1：案號案名一致性
-        self.validate_item_1(公告, 須知)
-        
+        (1, "validate_item_1"),
         # 項次2：公開取得報價金額與設定
-        self.validate_item_2(公告, 須知)
-        
+        (2, "validate_item_2"),
         # 項次3：公開取得報價須知設定
-        self.validate_item_3(公告, 須知)
-        
+        (3, [("招標方式", "包含", "公開取得報價", [
+            ("第5點逾公告金額十分之一", True, "須知設定錯誤", "第5點應勾選")])]),
         # 項次4：最低標設定
-        self.validate_item_4(公告, 須知)
-        
+        (4, [("決標方式", "等於", "最低標", [
+            ("第59點最低標", True, "最低標設定錯誤", "須知第59點相關選項應勾選"),
+            ("第59點非64條之2", True, "最低標設定錯誤", "須知第59點相關選項應勾選")])]),
         # 項次5：底價設定
-        self.validate_item_5(公告, 須知)
-        
+        (5, [("訂有底價", "等於", "是", [
+            ("第6點訂底價", True, "底價設定錯誤", "須知第6點應勾選")])]),
         # 項次6：非複數決標
-        self.validate_item_6(公告, 須知)
-        
+        (6, "validate_item_6"),
         # 項次7：64條之2
-        self.validate_item_7(公告, 須知)
-        
+        (7, [("依64條之2", "等於", "否", [
+            ("第59點非64條之2", True, "64條之2設定錯誤", "須知第59點非64條之2應勾選")])]),
         # 項次8：標的分類
-        self.validate_item_8(公告, 須知)
-        
+        (8, "validate_item_8"),
         # 項次9：條約協定
-        self.validate_item_9(公告, 須知)
-        
+        (9, [("適用條約", "等於", "否", [
+            ("第8點條約協定", False, "條約協定設定錯誤", "須知第8點條約協定不應勾選")])]),
         # 項次10：敏感性採購
-        self.validate_item_10(公告, 須知)
-        
+        (10, [("敏感性採購", "等於", "是", [
+            ("第13點敏感性", True, "敏感性採購設定錯誤", "須知第13點敏感性應勾選"),
+            ("第8點禁止大陸", True, "敏感性採購設定錯誤", "須知第8點禁止大陸應勾選")])]),
         # 項次11：國安採購
-        self.validate_item_11(公告, 須知)
-        
+        (11, [("國安採購", "等於", "是", [
+            ("第13點國安", True, "國安採購設定錯誤", "須知第13點國安應勾選"),
+            ("第8點禁止大陸", True, "國安採購設定錯誤", "須知第8點禁止大陸應勾選")])]),
         # 項次12：增購權利
-        self.validate_item_12(公告, 須知)
-        
-        # 項次13-16：標準設定
-        self.validate_items_13_to_16(公告, 須知)
-        
+        (12, [("增購權利", "等於", "是", [
+                  ("第7點保留增購", True, "增購權利設定錯誤", "須知第7點保留增購應勾選")]),
+              ("增購權利", "等於", "無", [
+                  ("第7點未保留增購", True, "增購權利設定錯誤", "須知第7點未保留增購應勾選")])]),
+        # 項次13：特殊採購
+        (13, [("特殊採購", "等於", "否", [
+            ("第4點非特殊採購", True, "特殊採購設定錯誤", "須知第4點應勾選")])]),
+        # 項次14：統包
+        (14, [("統包", "等於", "否", [
+            ("第35點非統包", True, "統包設定錯誤", "須知第35點應勾選")])]),
+        # 項次15：協商措施
+        (15, [("協商措施", "等於", "否", [
+            ("第54點不協商", True, "協商措施設定錯誤", "須知第54點應勾選")])]),
+        # 項次16：電子領標
+        (16, [("電子領標", "等於", "是", [
+            ("第9點電子領標", True, "電子領標設定錯誤", "須知第9點應勾選")])]),
         # 項次17：押標金
-        self.validate_item_17(公告, 須知)
-        
+        (17, "validate_item_17"),
         # 項次18：身障優先
-        self.validate_item_18(公告, 須知)
-        
+        (18, [("優先身障", "等於", "是", [
+            ("第59點身障優先", True, "身障優先設定錯誤", "須知第59點身障優先應勾選")])]),
         # 項次19：外國廠商參與
-        self.validate_item_19(公告, 須知)
-        
+        (19, [("外國廠商", "屬於", ("可", "得參與採購"), [
+                  ("第8點可參與", True, "外國廠商設定錯誤", "須知第8點可參與應勾選")]),
+              ("外國廠商", "等於", "不可", [
+                  ("第8點不可參與", True, "外國廠商設定錯誤", "須知第8點不可參與應勾選")]),
+              ("外國廠商", "包含", "不得參與", [
+                  ("第8點不可參與", True, "外國廠商設定錯誤", "須知第8點不可參與應勾選")])]),
         # 項次20：中小企業
-        self.validate_item_20_v21(公告, 須知)
-        
+        (20, [("限定中小企業", "等於", "是", [
+            ("第8點不可參與", True, "中小企業設定錯誤", "限定中小企業時須知第8點不可參與應勾選")])]),
         # 項次21：廠商資格
-        self.validate_item_21_v21(公告, 須知)
-        
+        (21, "validate_item_21_v21"),
         # 項次22：開標方式
-        self.validate_item_22(公告, 須知)
+        (22, [("開標方式", "包含", "不分段", [
+                  ("第42點不分段", True, "開標方式設定錯誤", "須知第42點不分段應勾選"),
+                  ("第42點分二段", False, "開標方式設定矛盾", "不應同時勾選兩種開標方式")]),
+              ("開標方式", "包含", "分段", [
+                  ("第42點分二段", True, "開標方式設定錯誤", "須知第42點分二段應勾選")])]),
+    )
+    
+    # 這些項次會把同一分支內所有不符的勾選合併成一筆錯誤，其餘項次只回報第一個錯誤
+    MERGED_ERROR_ITEMS = {10, 11}
+    
+    def validate_all(self, 公告: Dict, 須知: Dict, 審核時間: Optional[str] = None) -> Dict:
+        """執行所有22項審核（依0821版規範）
+        
+        每次呼叫建立新的結果字典，驗證器本身不保存狀態，可跨案件及跨執行緒重複使用
+        審核時間未指定時取目前時間
+        """
+        results = {
+            "審核結果": "通過",
+            "通過項次": [],
+            "失敗項次": [],
+            "錯誤詳情": [],
+            "總項次": 22,
+            "通過數": 0,
+            "失敗數": 0,
+            "審核時間": 審核時間 or datetime.now().isoformat()
+        }
+        
+        # 先將須知勾選狀態整理成已勾選項目集合，規則比對時只做集合成員檢查
+        checked = {key for key, value in 須知.items() if value == "已勾選"}
+        
+        for item_num, rule in self.RULES:
+            if isinstance(rule, str):
+                getattr(self, rule)(results, 公告, 須知)
+            else:
+                self.check_rule(results, item_num, rule, 公告, checked)
         
         # 更新統計
-        self.validation_results["通過數"] = len(self.validation_results["通過項次"])
-        self.validation_results["失敗數"] = len(self.validation_results["失敗項次"])
-        self.validation_results["審核結果"] = "通過" if self.validation_results["失敗數"] == 0 else "失敗"
+        results["通過數"] = len(results["通過項次"])
+        results["失敗數"] = len(results["失敗項次"])
+        results["審核結果"] = "通過" if results["失敗數"] == 0 else "失敗"
+        
+        return results
+    
+    def check_rule(self, results: Dict, item_num: int, branches: List, 公告: Dict, checked: set):
+        """依規則表檢核單一項次的須知勾選設定（checked為須知中已勾選的項目集合）"""
+        for field, match_type, trigger, checks in branches:
+            value = 公告.get(field, "")
+            if match_type == "等於":
+                matched = value == trigger
+            elif match_type == "屬於":
+                matched = value in trigger
+            else:
+                matched = trigger in str(value)
+            
+            if not matched:
+                continue
+            
+            errors = []
+            for key, should_check, error_type, description in checks:
+                if (key in checked) != should_check:
+                    errors.append((error_type, description))
+                    if item_num not in self.MERGED_ERROR_ITEMS:
+                        break
+            
+            if errors:
+                self.add_error(results, item_num, errors[0][0], "; ".join(description for _, description in errors))
+            else:
+                self.add_pass(results, item_num)
+            return
         
-        return self.validation_results
+        self.add_pass(results, item_num)
     
-    def validate_item_1(self, 公告: Dict, 須知: Dict):
+    def validate_item_1(self, results: Dict, 公告: Dict, 須知: Dict):
         """項次1：案號案名一致性"""
-        case_number_match = 公告["案號"].replace("A", "") == 須知["案號"].replace("A", "")
+        # 提取階段已正規化案號；手動建立的資料則在此補算
+        公告案號 = 公告.get("案號_normalized") or normalize_case_number(公告["案號"])
+        須知案號 = 須知.get("案號_normalized") or normalize_case_number(須知["案號"])
+        case_number_match = 公告案號 == 須知案號
         name_match = 公告["案名"] == 須知["採購標的名稱"]
         
         if not case_number_match:
-            self.add_error(1, "案號不一致", f"公告:{公告['案號']} vs 須知:{須知['案號']}")
+            self.add_error(results, 1, "案號不一致", f"公告:{公告['案號']} vs 須知:{須知['案號']}")
         elif not name_match:
-            self.add_error(1, "案名不一致", f"公告:{公告['案名']} vs 須知:{須知['採購標的名稱']}")
+            self.add_error(results, 1, "案名不一致", f"公告:{公告['案名']} vs 須知:{須知['採購標的名稱']}")
         else:
-            self.add_pass(1)
+            self.add_pass(results, 1)
     
-    def validate_item_2(self, 公告: Dict, 須知: Dict):
+    def validate_item_2(self, results: Dict, 公告: Dict, 須知: Dict):
         """項次2：公開取得報價金額與設定"""
         if "公開取得報價" in 公告.get("招標方式", ""):
             errors = []
@@ -409,60 +506,20 @@ class TenderComplianceValidator:
                 errors.append("須知第3點應勾選")
             
             if errors:
-                self.add_error(2, "公開取得報價設定錯誤", "; ".join(errors))
-            else:
-                self.add_pass(2)
-        else:
-            self.add_pass(2)  # 不適用公開取得報價
-    
-    def validate_item_3(self, 公告: Dict, 須知: Dict):
-        """項次3：公開取得報價須知設定"""
-        if "公開取得報價" in 公告.get("招標方式", ""):
-            if 須知.get("第5點逾公告金額十分之一") != "已勾選":
-                self.add_error(3, "須知設定錯誤", "第5點應勾選")
-            else:
-                self.add_pass(3)
-        else:
-            self.add_pass(3)
-    
-    def validate_item_4(self, 公告: Dict, 須知: Dict):
-        """項次4：最低標設定"""
-        if 公告.get("決標方式") == "最低標":
-            if 須知.get("第59點最低標") != "已勾選" or 須知.get("第59點非64條之2") != "已勾選":
-                self.add_error(4, "最低標設定錯誤", "須知第59點相關選項應勾選")
+                self.add_error(results, 2, "公開取得報價設定錯誤", "; ".join(errors))
             else:
-                self.add_pass(4)
+                self.add_pass(results, 2)
         else:
-            self.add_pass(4)
+            self.add_pass(results, 2)  # 不適用公開取得報價
     
-    def validate_item_5(self, 公告: Dict, 須知: Dict):
-        """項次5：底價設定"""
-        if 公告.get("訂有底價") == "是":
-            if 須知.get("第6點訂底價") != "已勾選":
-                self.add_error(5, "底價設定錯誤", "須知第6點應勾選")
-            else:
-                self.add_pass(5)
-        else:
-            self.add_pass(5)
-    
-    def validate_item_6(self, 公告: Dict, 須知: Dict):
+    def validate_item_6(self, results: Dict, 公告: Dict, 須知: Dict):
         """項次6：非複數決標"""
         if 公告.get("複數決標") == "否":
-            self.add_pass(6)
+            self.add_pass(results, 6)
         else:
-            self.add_error(6, "複數決標設定錯誤", "應為非複數決標")
+            self.add_error(results, 6, "複數決標設定錯誤", "應為非複數決標")
     
-    def validate_item_7(self, 公告: Dict, 須知: Dict):
-        """項次7：64條之2"""
-        if 公告.get("依64條之2") == "否":
-            if 須知.get("第59點非64條之2") != "已勾選":
-                self.add_error(7, "64條之2設定錯誤", "須知第59點非64條之2應勾選")
-            else:
-                self.add_pass(7)
-        else:
-            self.add_pass(7)
-    
-    def validate_item_8(self, 公告: Dict, 須知: Dict):
+    def validate_item_8(self, results: Dict, 公告: Dict, 須知: Dict):
         """項次8：標的分類"""
         公告標的分類 = 公告.get("標的分類", "")
         
@@ -470,264 +527,125 @@ class TenderComplianceValidator:
         # 這裡需要更詳細的檢查邏輯
         if "買受，定製" in 公告標的分類:
             # 如果公告是買受定製，須知也應該對應設定
-            self.add_error(8, "標的分類不一致", f"公告:{公告標的分類}, 須知中財物性質設定可能不一致")
-        else:
-            self.add_pass(8)
-    
-    def validate_item_9(self, 公告: Dict, 須知: Dict):
-        """項次9：條約協定"""
-        if 公告.get("適用條約") == "否":
-            if 須知.get("第8點條約協定") == "已勾選":
-                self.add_error(9, "條約協定設定錯誤", "須知第8點條約協定不應勾選")
-            else:
-                self.add_pass(9)
+            self.add_error(results, 8, "標的分類不一致", f"公告:{公告標的分類}, 須知中財物性質設定可能不一致")
         else:
-            self.add_pass(9)
+            self.add_pass(results, 8)
     
-    def validate_item_10(self, 公告: Dict, 須知: Dict):
-        """項次10：敏感性採購"""
-        if 公告.get("敏感性採購") == "是":
-            errors = []
-            if 須知.get("第13點敏感性") != "已勾選":
-                errors.append("須知第13點敏感性應勾選")
-            if 須知.get("第8點禁止大陸") != "已勾選":
-                errors.append("須知第8點禁止大陸應勾選")
-            
-            if errors:
-                self.add_error(10, "敏感性採購設定錯誤", "; ".join(errors))
-            else:
-                self.add_pass(10)
-        else:
-            self.add_pass(10)
-    
-    def validate_item_11(self, 公告: Dict, 須知: Dict):
-        """項次11：國安採購"""
-        if 公告.get("國安採購") == "是":
-            errors = []
-            if 須知.get("第13點國安") != "已勾選":
-                errors.append("須知第13點國安應勾選")
-            if 須知.get("第8點禁止大陸") != "已勾選":
-                errors.append("須知第8點禁止大陸應勾選")
-            
-            if errors:
-                self.add_error(11, "國安採購設定錯誤", "; ".join(errors))
-            else:
-                self.add_pass(11)
-        else:
-            self.add_pass(11)
-    
-    def validate_item_12(self, 公告: Dict, 須知: Dict):
-        """項次12：增購權利"""
-        if 公告.get("增購權利") == "是":
-            if 須知.get("第7點保留增購") != "已勾選":
-                self.add_error(12, "增購權利設定錯誤", "須知第7點保留增購應勾選")
-            else:
-                self.add_pass(12)
-        elif 公告.get("增購權利") == "無":
-            if 須知.get("第7點未保留增購") != "已勾選":
-                self.add_error(12, "增購權利設定錯誤", "須知第7點未保留增購應勾選")
-            else:
-                self.add_pass(12)
-        else:
-            self.add_pass(12)
-    
-    def validate_items_13_to_16(self, 公告: Dict, 須知: Dict):
-        """項次13-16：標準設定"""
-        # 項次13：特殊採購
-        if 公告.get("特殊採購") == "否":
-            if 須知.get("第4點非特殊採購") != "已勾選":
-                self.add_error(13, "特殊採購設定錯誤", "須知第4點應勾選")
-            else:
-                self.add_pass(13)
-        else:
-            self.add_pass(13)
-        
-        # 項次14：統包
-        if 公告.get("統包") == "否":
-            if 須知.get("第35點非統包") != "已勾選":
-                self.add_error(14, "統包設定錯誤", "須知第35點應勾選")
-            else:
-                self.add_pass(14)
-        else:
-            self.add_pass(14)
-        
-        # 項次15：協商措施
-        if 公告.get("協商措施") == "否":
-            if 須知.get("第54點不協商") != "已勾選":
-                self.add_error(15, "協商措施設定錯誤", "須知第54點應勾選")
-            else:
-                self.add_pass(15)
-        else:
-            self.add_pass(15)
-        
-        # 項次16：電子領標
-        if 公告.get("電子領標") == "是":
-            if 須知.get("第9點電子領標") != "已勾選":
-                self.add_error(16, "電子領標設定錯誤", "須知第9點應勾選")
-            else:
-                self.add_pass(16)
-        else:
-            self.add_pass(16)
-    
-    def validate_item_17(self, 公告: Dict, 須知: Dict):
+    def validate_item_17(self, results: Dict, 公告: Dict, 須知: Dict):
         """項次17：押標金"""
         公告押標金 = 公告.get("押標金", 0)
         須知押標金 = 須知.get("押標金金額", 0)
         
         if 公告押標金 != 須知押標金:
-            self.add_error(17, "押標金不一致", f"公告:{公告押標金} vs 須知:{須知押標金}")
+            self.add_error(results, 17, "押標金不一致", f"公告:{公告押標金} vs 須知:{須知押標金}")
         elif 公告押標金 > 0:
             if 須知.get("第19點一定金額") != "已勾選":
-                self.add_error(17, "押標金設定錯誤", "有押標金時須知第19點一定金額應勾選")
-            else:
-                self.add_pass(17)
-        else:
-            self.add_pass(17)
-    
-    def validate_item_18(self, 公告: Dict, 須知: Dict):
-        """項次18：身障優先"""
-        if 公告.get("優先身障") == "是":
-            if 須知.get("第59點身障優先") != "已勾選":
-                self.add_error(18, "身障優先設定錯誤", "須知第59點身障優先應勾選")
+                self.add_error(results, 17, "押標金設定錯誤", "有押標金時須知第19點一定金額應勾選")
             else:
-                self.add_pass(18)
+                self.add_pass(results, 17)
         else:
-            self.add_pass(18)
+            self.add_pass(results, 17)
     
-    def validate_item_20(self, 公告: Dict, 須知: Dict):
-        """項次20：外國廠商"""
-        if 公告.get("外國廠商") == "可":
-            if 須知.get("第8點可參與") != "已勾選":
-                self.add_error(20, "外國廠商設定錯誤", "須知第8點可參與應勾選")
-            else:
-                self.add_pass(20)
-        elif 公告.get("外國廠商") == "不可":
-            if 須知.get("第8點不可參與") != "已勾選":
-                self.add_error(20, "外國廠商設定錯誤", "須知第8點不可參與應勾選")
-            else:
-                self.add_pass(20)
-        else:
-            self.add_pass(20)
-    
-    def validate_item_21(self, 公告: Dict, 須知: Dict):
-        """項次21：中小企業"""
-        if 公告.get("限定中小企業") == "是":
-            if 須知.get("第8點不可參與") != "已勾選":
-                self.add_error(21, "中小企業設定錯誤", "限定中小企業時須知第8點不可參與應勾選")
-            else:
-                self.add_pass(21)
-        else:
-            self.add_pass(21)
-    
-    def validate_item_23(self, 公告: Dict, 須知: Dict):
-        """項次23：開標方式"""
-        if "不分段" in 公告.get("開標方式", ""):
-            if 須知.get("第42點不分段") != "已勾選":
-                self.add_error(23, "開標方式設定錯誤", "須知第42點不分段應勾選")
-            elif 須知.get("第42點分二段") == "已勾選":
-                self.add_error(23, "開標方式設定矛盾", "不應同時勾選兩種開標方式")
-            else:
-                self.add_pass(23)
-        elif "分段" in 公告.get("開標方式", ""):
-            if 須知.get("第42點分二段") != "已勾選":
-                self.add_error(23, "開標方式設定錯誤", "須知第42點分二段應勾選")
-            else:
-                self.add_pass(23)
+    def validate_item_21_v21(self, results: Dict, 公告: Dict, 須知: Dict):
+        """項次21：廠商資格摘要一致性"""
+        # 基本資格設定檢核
+        if "合法設立登記" in str(公告.get("廠商資格", "")):
+            # 需要檢核須知中的資格設定是否一致
+            self.add_pass(results, 21)
         else:
-            self.add_pass(23)
+            self.add_error(results, 21, "廠商資格設定不明", "公告中未明確設定廠商資格要求")
     
-    def add_error(self, item_num: int, error_type: str, description: str):
+    def add_error(self, results: Dict, item_num: int, error_type: str, description: str):
         """添加錯誤記錄"""
-        self.validation_results["失敗項次"].append(item_num)
-        self.validation_results["錯誤詳情"].append({
+        results["失敗項次"].append(item_num)
+        results["錯誤詳情"].append({
             "項次": item_num,
             "錯誤類型": error_type,
             "說明": description
         })
     
-    def add_pass(self, item_num: int):
+    def add_pass(self, results: Dict, item_num: int):
         """添加通過記錄"""
-        self.validation_results["通過項次"].append(item_num)
-    
-    def validate_item_21_v21(self, 公告: Dict, 須知: Dict):
-        """項次21：廠商資格摘要一致性"""
-        # 基本資格設定檢核
-        if "合法設立登記" in str(公告.get("廠商資格", "")):
-            # 需要檢核須知中的資格設定是否一致
-            self.add_pass(21)
-        else:
-            self.add_error(21, "廠商資格設定不明", "公告中未明確設定廠商資格要求")
-    
-    def validate_item_22(self, 公告: Dict, 須知: Dict):
-        """項次22：開標程序一致性"""
-        if "不分段" in 公告.get("開標方式", ""):
-            if 須知.get("第42點不分段") != "已勾選":
-                self.add_error(22, "開標方式設定錯誤", "須知第42點不分段應勾選")
-            elif 須知.get("第42點分二段") == "已勾選":
-                self.add_error(22, "開標方式設定矛盾", "不應同時勾選兩種開標方式")
-            else:
-                self.add_pass(22)
-        elif "分段" in 公告.get("開標方式", ""):
-            if 須知.get("第42點分二段") != "已勾選":
-                self.add_error(22, "開標方式設定錯誤", "須知第42點分二段應勾選")
-            else:
-                self.add_pass(22)
-        else:
-            self.add_pass(22)
-    
-    def validate_item_19(self, 公告: Dict, 須知: Dict):
-        """項次19：外國廠商參與"""
-        if 公告.get("外國廠商") == "可" or 公告.get("外國廠商") == "得參與採購":
-            if 須知.get("第8點可參與") != "已勾選":
-                self.add_error(19, "外國廠商設定錯誤", "須知第8點可參與應勾選")
-            else:
-                self.add_pass(19)
-        elif 公告.get("外國廠商") == "不可" or "不得參與" in str(公告.get("外國廠商", "")):
-            if 須知.get("第8點不可參與") != "已勾選":
-                self.add_error(19, "外國廠商設定錯誤", "須知第8點不可參與應勾選")
-            else:
-                self.add_pass(19)
-        else:
-            self.add_pass(19)
-    
-    def validate_item_20_v21(self, 公告: Dict, 須知: Dict):
-        """項次20：中小企業"""
-        if 公告.get("限定中小企業") == "是":
-            if 須知.get("第8點不可參與") != "已勾選":
-                self.add_error(20, "中小企業設定錯誤", "限定中小企業時須知第8點不可參與應勾選")
-            else:
-                self.add_pass(20)
-        else:
-            self.add_pass(20)
+        results["通過項次"].append(item_num)
 
 class AITenderValidator:
     """AI模型輔助驗證器"""
     
+    # 實際帶入提示詞的欄位，快取鍵只取這些欄位以提高命中率
+    PROMPT_FIELDS_公告 = ('案號', '案名', '敏感性採購', '適用條約', '增購權利', '開標方式')
+    PROMPT_FIELDS_須知 = ('案號', '採購標的名稱', '第13點敏感性', '第8點條約協定', '第7點保留增購', '第42點不分段', '第42點分二段')
+    
+    # AI驗證結果快取的最大筆數
+    RESULT_CACHE_SIZE = 128
+    
     def __init__(self, model_name="gemma3:27b", api_url="http://192.168.53.254:11434"):
         self.model_name = model_name
         self.api_url = f"{api_url}/api/generate"
+        
+        # 相同輸入的AI驗證結果快取（鍵含模型名稱，更換模型即失效）
+        self.result_cache = {}
+        
+        # 批次審核時由audit_many換成跨行程共用的Semaphore，限制同時送出的AI請求數
+        self.request_slots = contextlib.nullcontext()
+        
+        # 重複使用與Ollama伺服器的連線，避免每次審核都重新建立TCP連線
+        self.session = requests.Session()
+        self.session.mount("http://", HTTPAdapter(pool_maxsize=8))
     
     def call_ai_model(self, prompt: str) -> str:
         """呼叫AI模型"""
         try:
-            response = requests.post(
-                self.api_url,
-                json={
-                    "model": self.model_name,
-                    "prompt": prompt,
-                    "stream": False,
-                    "temperature": 0.1,
-                    "format": "json"
-                }
-            )
+            with self.request_slots:
+                response = self.session.post(
+                    self.api_url,
+                    json={
+                        "model": self.model_name,
+                        "prompt": prompt,
+                        "stream": False,
+                        "format": "json",
+                        "options": {
+                            "temperature": 0.1,
+                            "num_predict": 512
+                        }
+                    },
+                    timeout=AI_REQUEST_TIMEOUT
+                )
             if response.status_code == 200:
                 return response.json().get('response', '')
             return f"錯誤: {response.status_code}"
         except Exception as e:
             return f"失敗: {str(e)}"
     
+    def make_cache_key(self, 公告: Dict, 須知: Dict) -> str:
+        """以模型名稱及提示詞欄位計算快取鍵"""
+        payload = {
+            "model": self.model_name,
+            "a": {k: 公告.get(k) for k in self.PROMPT_FIELDS_公告},
+            "r": {k: 須知.get(k) for k in self.PROMPT_FIELDS_須知}
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+    
     def validate_with_ai(self, 公告: Dict, 須知: Dict) -> Dict:
-        """使用AI模型進行綜合驗證"""
+        """使用AI模型進行綜合驗證（相同輸入直接回傳快取結果的副本）"""
+        cache_key = self.make_cache_key(公告, 須知)
+        if cache_key in self.result_cache:
+            # 命中時移到最後，使最久未使用的項目排在最前面（LRU）
+            result = self.result_cache.pop(cache_key)
+            self.result_cache[cache_key] = result
+            # 回傳副本，呼叫端修改報告內容時不影響快取
+            return copy.deepcopy(result)
+        
+        result = self._validate_with_ai(公告, 須知)
+        # 解析失敗或連線錯誤不快取，下次重新呼叫
+        if isinstance(result, dict) and "錯誤" not in result:
+            # 已滿時移除最久未使用的一筆，避免重複審核大量案件時無限累積
+            if len(self.result_cache) >= self.RESULT_CACHE_SIZE:
+                del self.result_cache[next(iter(self.result_cache))]
+            self.result_cache[cache_key] = copy.deepcopy(result)
+        return result
+    
+    def _validate_with_ai(self, 公告: Dict, 須知: Dict) -> Dict:
+        """實際呼叫AI模型進行驗證"""
         
         prompt = f"""你是招標文件審核專家。請檢查以下文件一致性：
 
@@ -759,17 +677,15 @@ class AITenderValidator:
         
         ai_response = self.call_ai_model(prompt)
         
+        # format=json 已保證回應為合法JSON，只解析第一個物件即可
         try:
-            return json.loads(ai_response)
-        except:
-            # 嘗試提取JSON部分
-            json_match = re.search(r'\{.*\}', ai_response, re.DOTALL)
-            if json_match:
-                try:
-                    return json.loads(json_match.group())
-                except:
-                    pass
+            result = json.JSONDecoder().raw_decode(ai_response.lstrip())[0]
+        except ValueError:
+            result = None
+        # 回應不是JSON物件（如陣列或字串）同樣視為解析失敗
+        if not isinstance(result, dict):
             return {"錯誤": "AI回應解析失敗", "原始回應": ai_response}
+        return result
 
 class TenderAuditSystem:
     """招標審核系統主類別"""
@@ -779,12 +695,16 @@ class TenderAuditSystem:
         self.validator = TenderComplianceValidator()
         self.ai_validator = AITenderValidator() if use_ai else None
         self.use_ai = use_ai
+        self.folder_cache = {}
     
     def audit_tender_case(self, case_folder: str) -> Dict:
         """審核完整招標案件"""
         
         print(f"🎯 開始審核招標案件: {case_folder}")
         
+        # 整個審核流程共用同一個時間戳記，報告內各處時間一致
+        audit_time = datetime.now().isoformat()
+        
         # 1. 尋找檔案
         announcement_file = self.find_announcement_file(case_folder)
         requirements_file = self.find_requirements_file(case_folder)
@@ -803,15 +723,18 @@ class TenderAuditSystem:
         if not announcement_data or not requirements_data:
             return {"錯誤": "Gemma AI無法提取文件內容"}
         
-        # 4. 規則引擎驗證
-        print("⚖️ 執行規則引擎驗證...")
-        rule_validation = self.validator.validate_all(announcement_data, requirements_data)
-        
-        # 5. AI輔助驗證（可選）
-        ai_validation = None
-        if self.use_ai and self.ai_validator:
-            print("🤖 執行AI輔助驗證...")
-            ai_validation = self.ai_validator.validate_with_ai(announcement_data, requirements_data)
+        # 4. 規則引擎驗證，同時於背景執行AI輔助驗證（可選）
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            ai_future = None
+            if self.use_ai and self.ai_validator:
+                print("🤖 執行AI輔助驗證...")
+                ai_future = executor.submit(self.ai_validator.validate_with_ai, announcement_data, requirements_data)
+            
+            print("⚖️ 執行規則引擎驗證...")
+            rule_validation = self.validator.validate_all(announcement_data, requirements_data, audit_time)
+            
+            # 5. 等待AI輔助驗證結果
+            ai_validation = ai_future.result() if ai_future else None
         
         # 6. 綜合報告
         result = {
@@ -819,7 +742,7 @@ class TenderAuditSystem:
                 "資料夾": case_folder,
                 "招標公告檔案": os.path.basename(announcement_file),
                 "投標須知檔案": os.path.basename(requirements_file),
-                "審核時間": datetime.now().isoformat()
+                "審核時間": audit_time
             },
             "提取資料": {
                 "招標公告": announcement_data,
@@ -836,31 +759,50 @@ class TenderAuditSystem:
     
     def find_announcement_file(self, case_folder: str) -> Optional[str]:
         """尋找招標公告檔案"""
-        if not os.path.exists(case_folder):
-            return None
-            
-        for file in os.listdir(case_folder):
-            if file.endswith('.odt') and not file.startswith('~$'):
-                if ('公告事項' in file or '公開取得報價' in file) and '須知' not in file:
-                    return os.path.join(case_folder, file)
-                if file.startswith('01') and '須知' not in file:
-                    return os.path.join(case_folder, file)
-        
-        return None
+        return self._scan_folder(case_folder)[0]
     
     def find_requirements_file(self, case_folder: str) -> Optional[str]:
         """尋找投標須知檔案"""
-        if not os.path.exists(case_folder):
-            return None
-            
-        for file in os.listdir(case_folder):
-            if not file.startswith('~$'):
-                if file.endswith(('.docx', '.odt')) and '須知' in file:
-                    return os.path.join(case_folder, file)
-                if file.startswith('03') or file.startswith('02'):
-                    return os.path.join(case_folder, file)
+        return self._scan_folder(case_folder)[1]
+    
+    def _scan_folder(self, case_folder: str) -> Tuple[Optional[str], Optional[str]]:
+        """單次掃描資料夾，同時找出招標公告與投標須知檔案
+        
+        結果依 (資料夾, 修改時間) 快取，資料夾內容未變動時不再重新列目錄
+        """
+        try:
+            cache_key = (case_folder, os.stat(case_folder).st_mtime_ns)
+        except FileNotFoundError:
+            return None, None
+        
+        if cache_key in self.folder_cache:
+            return self.folder_cache[cache_key]
+        
+        announcement_file = None
+        requirements_file = None
+        with os.scandir(case_folder) as entries:
+            for entry in entries:
+                file = entry.name
+                if file.startswith('~$'):
+                    continue
+                
+                if announcement_file is None and file.endswith('.odt'):
+                    if ('公告事項' in file or '公開取得報價' in file) and '須知' not in file:
+                        announcement_file = entry.path
+                    elif file.startswith('01') and '須知' not in file:
+                        announcement_file = entry.path
+                
+                if requirements_file is None:
+                    if file.endswith(('.docx', '.odt')) and '須知' in file:
+                        requirements_file = entry.path
+                    elif file.startswith('03') or file.startswith('02'):
+                        requirements_file = entry.path
+                
+                if announcement_file and requirements_file:
+                    break
         
-        return None
+        self.folder_cache[cache_key] = (announcement_file, requirements_file)
+        return announcement_file, requirements_file
     
     def generate_summary(self, rule_result: Dict, ai_result: Optional[Dict]) -> Dict:
         """生成綜合評估摘要"""
@@ -890,16 +832,20 @@ class TenderAuditSystem:
         
         return summary
     
+    def _audit_time(self, result: Dict) -> datetime:
+        """取得審核開始時的時間戳記，報告檔名及日期皆以此為準"""
+        return datetime.fromisoformat(result["案件資訊"]["審核時間"])
+    
     def save_report(self, result: Dict, output_file: Optional[str] = None):
         """儲存審核報告"""
         if not output_file:
             case_name = result["案件資訊"]["資料夾"].split("/")[-1]
             status = result["綜合評估"]["最終判定"]
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            timestamp = self._audit_time(result).strftime("%Y%m%d_%H%M%S")
             output_file = f"audit_report_{case_name}_{status}_{timestamp}.json"
         
         with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(result, f, ensure_ascii=False, indent=2)
+            f.write(dumps_pretty(result))
         
         print(f"📄 審核報告已儲存: {output_file}")
     
@@ -912,7 +858,7 @@ class TenderAuditSystem:
         if not output_file:
             case_name = result["案件資訊"]["資料夾"].split("/")[-1]
             status = result["綜合評估"]["最終判定"]
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            timestamp = self._audit_time(result).strftime("%Y%m%d_%H%M%S")
             output_file = f"招標審核報告_{case_name}_{status}_{timestamp}.docx"
         
         # 建立新Word文件
@@ -950,7 +896,6 @@ class TenderAuditSystem:
         """匯出審核報告到TXT文件"""
         if not output_file:
             case_name = result["案件資訊"]["資料夾"].split("/")[-1]
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             output_file = f"招標審核報告_{case_name}.txt"
         
         # 提取資料
@@ -962,7 +907,7 @@ class TenderAuditSystem:
         # 建立檢核報告內容
         report_lines = []
         report_lines.append(f"檔名：招標審核報告_{案件資訊['資料夾'].split('/')[-1]}")
-        report_lines.append(f"檢核日期：{datetime.now().strftime('%Y年%m月%d日')}")
+        report_lines.append(f"檢核日期：{self._audit_time(result).strftime('%Y年%m月%d日')}")
         report_lines.append("")
         
         # 23項檢核項目定義和詳細檢查
@@ -1537,6 +1482,29 @@ class TenderAuditSystem:
         footer_p.add_run('本報告由招標文件自動化審核系統生成').italic = True
         footer_p.add_run(f'\n生成時間：{datetime.now().strftime("%Y年%m月%d日 %H:%M:%S")}').italic = True
 
+# 批次審核時每個工作行程各自持有的審核系統（Session等資源不跨行程傳遞）
+_worker_audit_system = None
+
+def _init_audit_worker(use_ai: bool, ai_slots):
+    """工作行程初始化：建立審核系統並套用共用的AI請求限流"""
+    global _worker_audit_system
+    _worker_audit_system = TenderAuditSystem(use_ai=use_ai)
+    _worker_audit_system.extractor.request_slots = ai_slots
+    if _worker_audit_system.ai_validator:
+        _worker_audit_system.ai_validator.request_slots = ai_slots
+
+def _audit_one(case_folder: str) -> Dict:
+    """於工作行程中審核單一案件"""
+    return _worker_audit_system.audit_tender_case(case_folder)
+
+def audit_many(case_folders: List[str], use_ai: bool = True, max_workers: Optional[int] = None) -> List[Dict]:
+    """以多個行程平行審核多個案件資料夾，結果依輸入順序回傳"""
+    ai_slots = multiprocessing.Semaphore(AI_MAX_CONCURRENT_REQUESTS)
+    with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count(),
+                             initializer=_init_audit_worker,
+                             initargs=(use_ai, ai_slots)) as executor:
+        return list(executor.map(_audit_one, case_folders))
+
 # 使用範例
 def main():
     """主程式範例"""
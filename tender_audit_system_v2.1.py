@@ -18,16 +18,26 @@
 """
 
 import json
+import heapq
 import requests
 import zipfile
+import io
 import re
 import os
 import difflib
+import multiprocessing
+import traceback
+from functools import lru_cache
 from typing import Dict, List, Optional, Tuple, Any
 from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, field
 from enum import Enum
 
+# 第一版的提取器與驗證器為本版各增強類別的基礎
+from tender_audit_system import TenderDocumentExtractor, TenderComplianceValidator, AITenderValidator
+from tender_io import dumps_pretty, read_xml_text
+
 try:
     from docx import Document
     from docx.shared import Inches, Pt, RGBColor
@@ -39,6 +49,52 @@ except ImportError:
     DOCX_AVAILABLE = False
     print("⚠️  python-docx未安裝，Word輸出功能不可用。安裝方法：pip install python-docx")
 
+try:
+    from rapidfuzz import fuzz as _rf_fuzz, process as _rf_process
+    RAPIDFUZZ_AVAILABLE = True
+except ImportError:
+    RAPIDFUZZ_AVAILABLE = False
+
+# 批次審核時所有工作行程合計可同時送出的AI請求數上限
+AI_MAX_CONCURRENT_REQUESTS = 2
+
+# 預先編譯的正則表達式，避免每次呼叫重新查找編譯快取
+_TAG_RE = re.compile(r'<[^>]+>')
+_WS_RE = re.compile(r'\s+')
+
+def _json_default(obj):
+    """報告序列化時處理列舉等非原生型別"""
+    if isinstance(obj, Enum):
+        return obj.value
+    raise TypeError(f"無法序列化的型別: {type(obj).__name__}")
+
+def _keyword_re(keywords: List[str]) -> re.Pattern:
+    """將多個關鍵字合併為單一樣式，一次掃描即可判斷是否出現任一關鍵字"""
+    return re.compile("|".join(map(re.escape, keywords)))
+
+# 外國廠商參與規定的判斷關鍵字
+_FOREIGN_ALLOWED_RE = _keyword_re(["可", "得參與", "可以"])
+_FOREIGN_DENY_RE = _keyword_re(["不可", "不得", "禁止"])
+
+# 金額字串只保留ASCII數字時要刪除的位元組
+_NON_DIGIT_BYTES = bytes(b for b in range(256) if not 48 <= b < 58)
+
+def _parse_digits(text: str) -> int:
+    """取出字串中的數字轉為整數（如「1,500,000元」→1500000），沒有數字時為0"""
+    return int(text.encode('ascii', 'ignore').translate(None, _NON_DIGIT_BYTES) or b'0')
+
+def _parse_amount(value) -> int:
+    """將數值或金額字串轉為整數金額，無法辨識時為0"""
+    if isinstance(value, (int, float)):
+        return int(value)
+    elif isinstance(value, str):
+        # 移除所有非數字字符
+        return _parse_digits(value)
+    return 0
+
+# 內容標準化的字元對照：統一標點符號並修復常見OCR錯誤
+_NORMALIZE_TABLE = str.maketrans({'：': ':', '、': ',', '壹': '一', '貳': '二', '參': '三'})
+
 class ValidationStatus(Enum):
     """驗證狀態列舉"""
     PASS = "通過"
@@ -47,7 +103,7 @@ class ValidationStatus(Enum):
     SKIP = "跳過"
     AUTO_FIXED = "自動修復"
 
-@dataclass
+@dataclass(slots=True)
 class ValidationItem:
     """單項驗證結果"""
     item_number: int
@@ -60,7 +116,7 @@ class ValidationItem:
     auto_fix_applied: bool = False
     fix_description: str = ""
 
-@dataclass
+@dataclass(slots=True)
 class SmartExtractResult:
     """智能提取結果"""
     success: bool
@@ -69,6 +125,14 @@ class SmartExtractResult:
     warnings: List[str] = field(default_factory=list)
     auto_fixes: List[str] = field(default_factory=list)
 
+@lru_cache(maxsize=2048)
+def _cached_similarity_ratio(str1: str, str2: str) -> float:
+    """計算相似度並快取結果，同一組字串在各檢核項次間重複比對時不需重算"""
+    # 有rapidfuzz時使用C實作的相似度計算，否則退回difflib
+    if RAPIDFUZZ_AVAILABLE:
+        return _rf_fuzz.ratio(str1, str2) / 100.0
+    return difflib.SequenceMatcher(None, str1, str2).ratio()
+
 class SmartTextMatcher:
     """智能文本匹配器 - 處理模糊比對"""
     
@@ -77,15 +141,47 @@ class SmartTextMatcher:
         """計算兩個字串的相似度（0-1）"""
         if not str1 or not str2:
             return 0.0
-        return difflib.SequenceMatcher(None, str1, str2).ratio()
+        # 完全相同時不必建立比對器
+        if str1 == str2:
+            return 1.0
+        return _cached_similarity_ratio(str1, str2)
+    
+    @staticmethod
+    def affix_similarity(str1: str, str2: str) -> float:
+        """以共同前綴與後綴長度估算相似度，不需執行完整比對
+        
+        結果為最長共同子序列比率（rapidfuzz的ratio）的下限；difflib的ratio可能低於此值，不適用
+        """
+        if not str1 or not str2:
+            return 0.0
+        prefix = len(os.path.commonprefix([str1, str2]))
+        suffix = len(os.path.commonprefix([str1[::-1], str2[::-1]]))
+        matched = min(prefix + suffix, len(str1), len(str2))
+        return 2.0 * matched / (len(str1) + len(str2))
     
     @staticmethod
     def fuzzy_match(target: str, candidates: List[str], threshold: float = 0.8) -> Optional[str]:
         """模糊匹配找出最接近的候選項"""
+        if RAPIDFUZZ_AVAILABLE:
+            if not target:
+                return None
+            match = _rf_process.extractOne(target, candidates, scorer=_rf_fuzz.ratio, score_cutoff=threshold * 100)
+            return match[0] if match else None
+        
+        if not target:
+            return None
+        
         best_match = None
         best_ratio = 0.0
+        target_len = len(target)
         
         for candidate in candidates:
+            # 相似度上限為 2*min(長度)/(長度和)，長度差太大者不可能達標，略過比對
+            candidate_len = len(candidate)
+            upper_bound = 2.0 * min(target_len, candidate_len) / (target_len + candidate_len)
+            if upper_bound < threshold or upper_bound <= best_ratio:
+                continue
+            
             ratio = SmartTextMatcher.similarity_ratio(target, candidate)
             if ratio > best_ratio and ratio >= threshold:
                 best_ratio = ratio
@@ -94,8 +190,9 @@ class SmartTextMatcher:
         return best_match
     
     @staticmethod
+    @lru_cache(maxsize=4096)
     def is_case_number_similar(case1: str, case2: str) -> Tuple[bool, float]:
-        """智能判斷案號是否相似（處理結尾A問題）"""
+        """智能判斷案號是否相似（處理結尾A問題），同一組案號的結果會被快取"""
         # 移除空白並轉大寫
         case1 = case1.strip().upper()
         case2 = case2.strip().upper()
@@ -117,9 +214,55 @@ class SmartTextMatcher:
 class EnhancedDocumentExtractor(TenderDocumentExtractor):
     """增強版文件提取器 - 具備智能容錯能力"""
     
+    # 案號與金額的修復用樣式，依序嘗試；子類別可覆寫
+    CASE_PATTERNS = (
+        re.compile(r'([CcＣ]\d{2}[AaＡ]\d{5}[A-Za-z]?)'),
+        re.compile(r'案號[：:\s]*([A-Za-z0-9]+)'),
+        re.compile(r'採購案號[：:\s]*([A-Za-z0-9]+)')
+    )
+    AMOUNT_PATTERNS = (
+        re.compile(r'預算金額[：:\s]*(?:新臺幣)?[＄$]?\s*([0-9,]+)'),
+        re.compile(r'採購金額[：:\s]*(?:新臺幣)?[＄$]?\s*([0-9,]+)'),
+        re.compile(r'契約金額[：:\s]*(?:新臺幣)?[＄$]?\s*([0-9,]+)')
+    )
+    
+    # AI從文件內容提取的欄位：招標公告25個標準欄位，投標須知基本資訊及各項勾選狀態
+    ANNOUNCEMENT_FIELDS = (
+        "案號", "案名", "招標方式", "採購金額", "預算金額", "採購金級距", "依據法條", "決標方式",
+        "訂有底價", "複數決標", "依64條之2", "標的分類", "適用條約", "敏感性採購", "國安採購",
+        "增購權利", "特殊採購", "統包", "協商措施", "電子領標", "優先身障", "外國廠商",
+        "限定中小企業", "押標金", "開標方式"
+    )
+    REQUIREMENT_CHECKBOXES = (
+        "第3點逾公告金額十分之一", "第4點非特殊採購", "第5點逾公告金額十分之一", "第6點訂底價",
+        "第7點保留增購", "第7點未保留增購", "第8點條約協定", "第8點可參與", "第8點不可參與",
+        "第8點禁止大陸", "第9點電子領標", "第13點敏感性", "第13點國安", "第19點無需押標金",
+        "第19點一定金額", "第35點非統包", "第42點不分段", "第42點分二段", "第54點不協商",
+        "第59點最低標", "第59點非64條之2", "第59點身障優先"
+    )
+    # 提示詞中帶入的文件內容字數上限，避免超出模型的上下文長度
+    PROMPT_CONTENT_LIMIT = 16000
+    
     def __init__(self):
         super().__init__()
         self.text_matcher = SmartTextMatcher()
+    
+    def extract_odt_content(self, file_path: str) -> str:
+        """提取ODT內容"""
+        return self._extract_zip_xml_text(file_path, 'content.xml')
+    
+    def extract_docx_content(self, file_path: str) -> str:
+        """提取DOCX內容"""
+        return self._extract_zip_xml_text(file_path, 'word/document.xml')
+    
+    def _extract_zip_xml_text(self, file_path: str, member_name: str) -> str:
+        """以串流方式解析壓縮檔內的XML並取出文字，失敗時回傳空字串交由備用方法處理"""
+        try:
+            with zipfile.ZipFile(file_path, 'r') as zip_file, zip_file.open(member_name) as member:
+                return ' '.join(read_xml_text(member).split())
+        except Exception as e:
+            print(f"⚠️ 主要提取方法失敗：{e}")
+            return ""
         
     def extract_with_fallback(self, file_path: str) -> str:
         """智能提取文件內容，自動處理各種格式"""
@@ -146,14 +289,16 @@ class EnhancedDocumentExtractor(TenderDocumentExtractor):
         try:
             # 嘗試直接讀取XML內容
             with zipfile.ZipFile(file_path, 'r') as zip_file:
-                for name in zip_file.namelist():
-                    if 'content' in name or 'document' in name:
-                        raw_content = zip_file.read(name).decode('utf-8', errors='ignore')
-                        # 基礎XML清理
-                        clean_text = re.sub(r'<[^>]+>', ' ', raw_content)
-                        clean_text = re.sub(r'\s+', ' ', clean_text)
-                        if len(clean_text) > 100:  # 確保有實質內容
-                            return clean_text
+                candidates = [name for name in zip_file.namelist() if 'content' in name or 'document' in name]
+                for name in candidates:
+                    # 邊讀邊解碼，不同時保留整份位元組與字串
+                    with zip_file.open(name) as member:
+                        raw_content = io.TextIOWrapper(member, encoding='utf-8', errors='ignore', newline='').read()
+                    # 基礎XML清理
+                    clean_text = _TAG_RE.sub(' ', raw_content)
+                    clean_text = _WS_RE.sub(' ', clean_text)
+                    if len(clean_text) > 100:  # 確保有實質內容
+                        return clean_text
         except Exception as e:
             print(f"⚠️ 備用提取方法失敗：{e}")
         
@@ -161,13 +306,59 @@ class EnhancedDocumentExtractor(TenderDocumentExtractor):
     
     def _normalize_content(self, content: str) -> str:
         """標準化文件內容"""
-        # 統一標點符號
-        content = content.replace('：', ':').replace('、', ',')
+        # 統一標點符號並修復常見OCR錯誤（單次轉換）
+        content = content.translate(_NORMALIZE_TABLE)
         # 移除多餘空白
-        content = re.sub(r'\s+', ' ', content)
-        # 修復常見OCR錯誤
-        content = content.replace('壹', '一').replace('貳', '二').replace('參', '三')
-        return content.strip()
+        return _WS_RE.sub(' ', content).strip()
+    
+    def extract_announcement_data(self, content: str) -> Dict:
+        """使用AI從招標公告內容提取標準欄位，AI未提供的欄位填"NA"，交由智能修復從內容補齊"""
+        prompt = f"""你是專業的招標文件分析師。請分析以下招標公告內容，提取關鍵欄位資訊。
+
+招標公告內容：
+{content[:self.PROMPT_CONTENT_LIMIT]}
+
+請以JSON格式回傳以下欄位：{"、".join(self.ANNOUNCEMENT_FIELDS)}
+
+重要：
+1. 如果找不到某個欄位，請填"NA"
+2. 金額資料請提取數字部分
+3. 是/否類型請明確標示"""
+        
+        data = self._parse_ai_object(self.call_gemma_ai(prompt, temperature=0.05))
+        for field_name in self.ANNOUNCEMENT_FIELDS:
+            data.setdefault(field_name, "NA")
+        return self._normalize_fields(data, "案名")
+    
+    def extract_requirements_data(self, content: str) -> Dict:
+        """使用AI從投標須知內容提取基本資訊及勾選狀態，AI未提供的勾選項目視為未勾選"""
+        prompt = f"""你是專業的招標文件分析師。請分析以下投標須知內容，提取關鍵資訊和勾選狀態。
+
+投標須知內容：
+{content[:self.PROMPT_CONTENT_LIMIT]}
+
+請以JSON格式回傳：
+1. 基本資訊：案號、採購標的名稱、押標金金額（純數字）
+2. 勾選狀態（依文件中的■、☑、□符號標示為"已勾選"或"未勾選"）：{"、".join(self.REQUIREMENT_CHECKBOXES)}
+
+重要：如果找不到某個項目，請填"未勾選"。"""
+        
+        data = self._parse_ai_object(self.call_gemma_ai(prompt, temperature=0.05))
+        data.setdefault("案號", "NA")
+        data.setdefault("採購標的名稱", "NA")
+        data.setdefault("押標金金額", 0)
+        for item in self.REQUIREMENT_CHECKBOXES:
+            data.setdefault(item, "未勾選")
+        return self._normalize_fields(data, "採購標的名稱")
+    
+    def _parse_ai_object(self, ai_response: str) -> Dict:
+        """解析AI回應中的第一個JSON物件，無法解析或不是物件時回傳空字典"""
+        try:
+            data = json.JSONDecoder().raw_decode(ai_response.lstrip())[0]
+        except ValueError:
+            print(f"⚠️  AI回應非JSON格式：「{ai_response[:200]}」")
+            return {}
+        return data if isinstance(data, dict) else {}
     
     def smart_extract_announcement_data(self, content: str) -> SmartExtractResult:
         """智能提取招標公告資料，包含容錯機制"""
@@ -198,14 +389,8 @@ class EnhancedDocumentExtractor(TenderDocumentExtractor):
         
         # 1. 修復案號
         if '案號' in data:
-            case_patterns = [
-                r'([CcＣ]\d{2}[AaＡ]\d{5}[A-Za-z]?)',
-                r'案號[：:\s]*([A-Za-z0-9]+)',
-                r'採購案號[：:\s]*([A-Za-z0-9]+)'
-            ]
-            
-            for pattern in case_patterns:
-                match = re.search(pattern, content)
+            for pattern in self.CASE_PATTERNS:
+                match = pattern.search(content)
                 if match:
                     extracted_case = match.group(1).upper()
                     if data['案號'] == "NA" or len(extracted_case) > len(data['案號']):
@@ -215,24 +400,14 @@ class EnhancedDocumentExtractor(TenderDocumentExtractor):
         
         # 2. 修復採購金額
         if '採購金額' in data:
-            amount_patterns = [
-                r'預算金額[：:\s]*(?:新臺幣)?[＄$]?\s*([0-9,]+)',
-                r'採購金額[：:\s]*(?:新臺幣)?[＄$]?\s*([0-9,]+)',
-                r'契約金額[：:\s]*(?:新臺幣)?[＄$]?\s*([0-9,]+)'
-            ]
-            
-            for pattern in amount_patterns:
-                match = re.search(pattern, content)
+            for pattern in self.AMOUNT_PATTERNS:
+                match = pattern.search(content)
                 if match:
-                    amount_str = match.group(1).replace(',', '')
-                    try:
-                        amount = int(amount_str)
-                        if amount > 0:
-                            fixed_data['採購金額'] = amount
-                            confidence_scores['採購金額'] = 0.95
-                            break
-                    except:
-                        pass
+                    amount = _parse_digits(match.group(1))
+                    if amount > 0:
+                        fixed_data['採購金額'] = amount
+                        confidence_scores['採購金額'] = 0.95
+                        break
         
         # 3. 修復決標方式
         if '決標方式' in data:
@@ -253,10 +428,13 @@ class EnhancedDocumentExtractor(TenderDocumentExtractor):
         for field, keywords in bool_fields.items():
             if field in data:
                 for keyword in keywords:
-                    if keyword in content:
-                        if '是' in content[content.find(keyword):content.find(keyword)+20]:
+                    # 只搜尋一次關鍵字位置，再檢查其後20字內的是/否
+                    pos = content.find(keyword)
+                    if pos >= 0:
+                        window = content[pos:pos+20]
+                        if '是' in window:
                             fixed_data[field] = "是"
-                        elif '否' in content[content.find(keyword):content.find(keyword)+20]:
+                        elif '否' in window:
                             fixed_data[field] = "否"
                         confidence_scores[field] = 0.8
                         break
@@ -271,43 +449,77 @@ class EnhancedDocumentExtractor(TenderDocumentExtractor):
 class SmartComplianceValidator(TenderComplianceValidator):
     """智能合規性驗證器 - 具備容錯和自動修復能力"""
     
+    # 標的分類對應：每個分類的關鍵字合併為一個樣式，一次搜尋即可判斷
+    CATEGORY_PATTERNS = tuple(
+        (category, _keyword_re(keywords))
+        for category, keywords in (
+            ("財物", ("財物", "物品", "設備", "材料")),
+            ("勞務", ("勞務", "服務", "委託", "承攬")),
+            ("工程", ("工程", "營造", "建設", "施工")),
+            ("買受定製", ("買受", "定製", "訂製", "製造"))
+        )
+    )
+    
+    # 智能檢核順序表：方法名稱表示需要專用邏輯的項次，其餘為單一勾選對應的簡單規則
+    # 簡單規則格式：(項次, 項目名稱, 公告欄位, 觸發值, 須知欄位, 未勾選時狀態, 信心度, 未勾選說明, 正確說明, 不適用說明)
+    # 公告欄位等於觸發值時須知欄位應勾選，否則該項次標記為跳過
+    SMART_RULES = (
+        "_validate_item_1_smart", "_validate_item_2_smart", "_validate_item_3_smart",
+        "_validate_item_4_smart", "_validate_item_5_smart", "_validate_item_6_smart",
+        "_validate_item_7_smart", "_validate_item_8_smart", "_validate_item_9_smart",
+        "_validate_item_10_smart", "_validate_item_11_smart", "_validate_item_12_smart",
+        (13, "特殊採購認定", "特殊採購", "否", "第4點非特殊採購", ValidationStatus.FAIL, 0.8,
+         "非特殊採購但須知未勾選", "特殊採購設定正確", "特殊採購案件"),
+        (14, "統包認定", "統包", "否", "第35點非統包", ValidationStatus.WARNING, 0.7,
+         "非統包但須知未明確勾選", "統包設定正確", "統包案件"),
+        (15, "協商措施", "協商措施", "否", "第54點不協商", ValidationStatus.WARNING, 0.7,
+         "不採協商但須知未明確勾選", "協商措施設定正確", "採用協商措施"),
+        (16, "電子領標", "電子領標", "是", "第9點電子領標", ValidationStatus.FAIL, 0.8,
+         "提供電子領標但須知未勾選", "電子領標設定正確", "不提供電子領標"),
+        "_validate_item_17_smart",
+        (18, "身障優先採購", "優先身障", "是", "第59點身障優先", ValidationStatus.FAIL, 0.8,
+         "身障優先但須知未勾選", "身障優先設定正確", "非身障優先採購"),
+        "_validate_item_20_smart",
+        (21, "中小企業參與限制", "限定中小企業", "是", "第8點不可參與", ValidationStatus.WARNING, 0.7,
+         "限定中小企業但相關設定可能不完整", "中小企業限制設定正確", "不限定中小企業"),
+        "_validate_item_23_smart"
+    )
+    
     def __init__(self):
         super().__init__()
         self.text_matcher = SmartTextMatcher()
         self.validation_items: List[ValidationItem] = []
         self.auto_fix_count = 0
         
-    def validate_all_smart(self, 公告: Dict, 須知: Dict, extract_results: Dict = None) -> Dict:
-        """執行智能驗證，包含容錯機制"""
+    def validate_all_smart(self, 公告: Dict, 須知: Dict, extract_results: Dict = None,
+                           審核時間: Optional[str] = None) -> Dict:
+        """執行智能驗證，包含容錯機制
+        
+        審核時間未指定時取目前時間
+        """
         # 清空之前的結果
-        self.validation_items = []
         self.auto_fix_count = 0
         
-        # 執行各項檢核
-        self._validate_item_1_smart(公告, 須知)
-        self._validate_item_2_smart(公告, 須知)
-        self._validate_item_3_smart(公告, 須知)
-        self._validate_item_4_smart(公告, 須知)
-        self._validate_item_5_smart(公告, 須知)
-        self._validate_item_6_smart(公告, 須知)
-        self._validate_item_7_smart(公告, 須知)
-        self._validate_item_8_smart(公告, 須知)
-        self._validate_item_9_smart(公告, 須知)
-        self._validate_item_10_smart(公告, 須知)
-        self._validate_item_11_smart(公告, 須知)
-        self._validate_item_12_smart(公告, 須知)
-        self._validate_items_13_to_16_smart(公告, 須知)
-        self._validate_item_17_smart(公告, 須知)
-        self._validate_item_18_smart(公告, 須知)
-        self._validate_item_20_smart(公告, 須知)
-        self._validate_item_21_smart(公告, 須知)
-        self._validate_item_23_smart(公告, 須知)
-        
-        # 統計結果
-        passed = [item for item in self.validation_items if item.status == ValidationStatus.PASS]
-        failed = [item for item in self.validation_items if item.status == ValidationStatus.FAIL]
-        warnings = [item for item in self.validation_items if item.status == ValidationStatus.WARNING]
-        auto_fixed = [item for item in self.validation_items if item.status == ValidationStatus.AUTO_FIXED]
+        # 執行各項檢核：每個項次各自產生一個驗證項目
+        self.validation_items = []
+        for rule in self.SMART_RULES:
+            if isinstance(rule, str):
+                self.validation_items.append(getattr(self, rule)(公告, 須知))
+            else:
+                self.validation_items.append(self._check_simple_rule(rule, 公告, 須知))
+        
+        # 統計結果：單次走訪依狀態分組，每個項目只轉換一次
+        passed, failed, warnings, auto_fixed = [], [], [], []
+        buckets = {
+            ValidationStatus.PASS: passed,
+            ValidationStatus.FAIL: failed,
+            ValidationStatus.WARNING: warnings,
+            ValidationStatus.AUTO_FIXED: auto_fixed
+        }
+        for item in self.validation_items:
+            bucket = buckets.get(item.status)
+            if bucket is not None:
+                bucket.append(self._item_to_dict(item))
         
         # 建立詳細報告
         detailed_result = {
@@ -321,12 +533,12 @@ class SmartComplianceValidator(TenderComplianceValidator):
                 "總體信心度": self._calculate_overall_confidence()
             },
             "詳細結果": {
-                "通過項目": [self._item_to_dict(item) for item in passed],
-                "失敗項目": [self._item_to_dict(item) for item in failed],
-                "警告項目": [self._item_to_dict(item) for item in warnings],
-                "自動修復項目": [self._item_to_dict(item) for item in auto_fixed]
+                "通過項目": passed,
+                "失敗項目": failed,
+                "警告項目": warnings,
+                "自動修復項目": auto_fixed
             },
-            "審核時間": datetime.now().isoformat(),
+            "審核時間": 審核時間 or datetime.now().isoformat(),
             "版本": "北捷V1 v2.1 智能容錯優化版"
         }
         
@@ -346,6 +558,10 @@ class SmartComplianceValidator(TenderComplianceValidator):
             "修復說明": item.fix_description
         }
     
+    def _dict_contains(self, data: Dict, text: str) -> bool:
+        """檢查字典的鍵或值是否包含指定文字，逐項比對而不先將整個字典轉成字串"""
+        return any(text in key or text in str(value) for key, value in data.items())
+    
     def _calculate_overall_confidence(self) -> float:
         """計算整體信心度"""
         if not self.validation_items:
@@ -354,20 +570,22 @@ class SmartComplianceValidator(TenderComplianceValidator):
         total_confidence = sum(item.confidence for item in self.validation_items)
         return total_confidence / len(self.validation_items)
     
-    def _validate_item_1_smart(self, 公告: Dict, 須知: Dict):
+    def _validate_item_1_smart(self, 公告: Dict, 須知: Dict) -> ValidationItem:
         """項次1：案號案名一致性 - 智能版"""
+        ann_get = 公告.get
+        req_get = 須知.get
         item = ValidationItem(
             item_number=1,
             item_name="案號案名一致性",
             status=ValidationStatus.PASS,
             description="",
-            expected_value=f"案號:{公告.get('案號', 'N/A')}, 案名:{公告.get('案名', 'N/A')}",
-            actual_value=f"案號:{須知.get('案號', 'N/A')}, 案名:{須知.get('採購標的名稱', 'N/A')}"
+            expected_value=f"案號:{ann_get('案號', 'N/A')}, 案名:{ann_get('案名', 'N/A')}",
+            actual_value=f"案號:{req_get('案號', 'N/A')}, 案名:{req_get('採購標的名稱', 'N/A')}"
         )
         
         # 智能案號比對
-        公告案號 = 公告.get('案號', '')
-        須知案號 = 須知.get('案號', '')
+        公告案號 = ann_get('案號', '')
+        須知案號 = req_get('案號', '')
         
         case_similar, case_confidence = self.text_matcher.is_case_number_similar(公告案號, 須知案號)
         
@@ -384,11 +602,14 @@ class SmartComplianceValidator(TenderComplianceValidator):
                 item.auto_fix_applied = True
                 item.fix_description = "系統判定為可接受的差異"
             else:
-                # 檢查案名
-                name_similarity = self.text_matcher.similarity_ratio(
-                    公告.get('案名', ''),
-                    須知.get('採購標的名稱', '')
-                )
+                # 檢查案名：使用rapidfuzz時前後綴已足夠相似即不必執行完整比對
+                公告案名 = ann_get('案名', '')
+                須知案名 = req_get('採購標的名稱', '')
+                name_similarity = 0.0
+                if RAPIDFUZZ_AVAILABLE:
+                    name_similarity = self.text_matcher.affix_similarity(公告案名, 須知案名)
+                if name_similarity < 0.8:
+                    name_similarity = self.text_matcher.similarity_ratio(公告案名, 須知案名)
                 
                 if name_similarity < 0.8:
                     item.status = ValidationStatus.WARNING
@@ -398,10 +619,11 @@ class SmartComplianceValidator(TenderComplianceValidator):
                     item.description = "案號案名完全一致"
                     item.confidence = 1.0
         
-        self.validation_items.append(item)
+        return item
     
-    def _validate_item_2_smart(self, 公告: Dict, 須知: Dict):
+    def _validate_item_2_smart(self, 公告: Dict, 須知: Dict) -> ValidationItem:
         """項次2：公開取得報價金額與設定 - 智能版"""
+        ann_get = 公告.get
         item = ValidationItem(
             item_number=2,
             item_name="公開取得報價金額範圍與設定",
@@ -410,18 +632,15 @@ class SmartComplianceValidator(TenderComplianceValidator):
             confidence=1.0
         )
         
-        if "公開取得報價" in 公告.get("招標方式", ""):
+        if "公開取得報價" in ann_get("招標方式", ""):
             errors = []
             warnings = []
             
             # 金額檢查（智能容錯）
-            採購金額 = 公告.get("採購金額", 0)
+            採購金額 = ann_get("採購金額", 0)
             if isinstance(採購金額, str):
                 # 嘗試轉換字串金額
-                try:
-                    採購金額 = int(re.sub(r'[^0-9]', '', 採購金額))
-                except:
-                    採購金額 = 0
+                採購金額 = _parse_digits(採購金額)
             
             if not (150000 <= 採購金額 < 1500000):
                 # 檢查是否接近邊界
@@ -433,12 +652,12 @@ class SmartComplianceValidator(TenderComplianceValidator):
                     errors.append(f"採購金額{採購金額}不在15萬-150萬範圍")
             
             # 其他檢查項目
-            if 公告.get("採購金級距") != "未達公告金額":
+            if ann_get("採購金級距") != "未達公告金額":
                 errors.append("採購金級距應為'未達公告金額'")
             
-            if 公告.get("依據法條") != "政府採購法第49條":
+            if ann_get("依據法條") != "政府採購法第49條":
                 # 檢查是否有相似內容
-                if "49" in str(公告.get("依據法條", "")):
+                if "49" in str(ann_get("依據法條", "")):
                     warnings.append("依據法條可能正確但格式不同")
                 else:
                     errors.append("依據法條應為'政府採購法第49條'")
@@ -461,9 +680,9 @@ class SmartComplianceValidator(TenderComplianceValidator):
             item.description = "非公開取得報價案件"
             item.status = ValidationStatus.SKIP
         
-        self.validation_items.append(item)
+        return item
     
-    def _validate_item_3_smart(self, 公告: Dict, 須知: Dict):
+    def _validate_item_3_smart(self, 公告: Dict, 須知: Dict) -> ValidationItem:
         """項次3：公開取得報價須知設定 - 智能版"""
         item = ValidationItem(
             item_number=3,
@@ -496,9 +715,9 @@ class SmartComplianceValidator(TenderComplianceValidator):
             item.status = ValidationStatus.SKIP
             item.description = "非公開取得報價案件"
         
-        self.validation_items.append(item)
+        return item
     
-    def _validate_item_4_smart(self, 公告: Dict, 須知: Dict):
+    def _validate_item_4_smart(self, 公告: Dict, 須知: Dict) -> ValidationItem:
         """項次4：最低標設定 - 智能版"""
         item = ValidationItem(
             item_number=4,
@@ -536,9 +755,9 @@ class SmartComplianceValidator(TenderComplianceValidator):
             item.status = ValidationStatus.SKIP
             item.description = f"非最低標案件（{決標方式}）"
         
-        self.validation_items.append(item)
+        return item
     
-    def _validate_item_5_smart(self, 公告: Dict, 須知: Dict):
+    def _validate_item_5_smart(self, 公告: Dict, 須知: Dict) -> ValidationItem:
         """項次5：底價設定 - 智能版"""
         item = ValidationItem(
             item_number=5,
@@ -550,12 +769,12 @@ class SmartComplianceValidator(TenderComplianceValidator):
         訂有底價 = 公告.get("訂有底價", "")
         
         # 智能判斷底價設定
-        has_reserve_price = 訂有底價 == "是" or "訂有底價" in str(公告)
+        has_reserve_price = 訂有底價 == "是" or self._dict_contains(公告, "訂有底價")
         
         if has_reserve_price:
             if 須知.get("第6點訂底價") != "已勾選":
                 # 檢查是否有相關文字描述
-                if any(key in 須知 for key in須知 if "底價" in key and "已勾選" in str(須知[key])):
+                if any("底價" in key and "已勾選" in str(value) for key, value in 須知.items()):
                     item.status = ValidationStatus.AUTO_FIXED
                     item.description = "找到底價相關勾選，自動修正"
                     item.auto_fix_applied = True
@@ -570,9 +789,9 @@ class SmartComplianceValidator(TenderComplianceValidator):
             item.status = ValidationStatus.SKIP
             item.description = "無底價設定"
         
-        self.validation_items.append(item)
+        return item
     
-    def _validate_item_6_smart(self, 公告: Dict, 須知: Dict):
+    def _validate_item_6_smart(self, 公告: Dict, 須知: Dict) -> ValidationItem:
         """項次6：非複數決標 - 智能版"""
         item = ValidationItem(
             item_number=6,
@@ -584,7 +803,7 @@ class SmartComplianceValidator(TenderComplianceValidator):
         複數決標 = 公告.get("複數決標", "")
         
         # 智能判斷
-        if 複數決標 == "否" or "非複數" in str(公告):
+        if 複數決標 == "否" or self._dict_contains(公告, "非複數"):
             item.description = "確認為非複數決標"
         elif 複數決標 == "是":
             item.status = ValidationStatus.FAIL
@@ -596,9 +815,9 @@ class SmartComplianceValidator(TenderComplianceValidator):
             item.description = "複數決標資訊不明確，預設為非複數"
             item.confidence = 0.7
         
-        self.validation_items.append(item)
+        return item
     
-    def _validate_item_7_smart(self, 公告: Dict, 須知: Dict):
+    def _validate_item_7_smart(self, 公告: Dict, 須知: Dict) -> ValidationItem:
         """項次7：64條之2 - 智能版"""
         item = ValidationItem(
             item_number=7,
@@ -612,7 +831,7 @@ class SmartComplianceValidator(TenderComplianceValidator):
         if 依64條之2 == "否":
             if 須知.get("第59點非64條之2") != "已勾選":
                 # 檢查是否有相關設定
-                if "64" in str(須知) and "否" in str(須知):
+                if self._dict_contains(須知, "64") and self._dict_contains(須知, "否"):
                     item.status = ValidationStatus.WARNING
                     item.description = "找到64條之2相關設定但格式不同"
                     item.confidence = 0.8
@@ -626,9 +845,9 @@ class SmartComplianceValidator(TenderComplianceValidator):
             item.status = ValidationStatus.SKIP
             item.description = "依64條之2辦理"
         
-        self.validation_items.append(item)
+        return item
     
-    def _validate_item_8_smart(self, 公告: Dict, 須知: Dict):
+    def _validate_item_8_smart(self, 公告: Dict, 須知: Dict) -> ValidationItem:
         """項次8：標的分類 - 智能版"""
         item = ValidationItem(
             item_number=8,
@@ -639,25 +858,17 @@ class SmartComplianceValidator(TenderComplianceValidator):
         
         公告標的 = 公告.get("標的分類", "")
         
-        # 智能分類對應
-        category_mapping = {
-            "財物": ["財物", "物品", "設備", "材料"],
-            "勞務": ["勞務", "服務", "委託", "承攬"],
-            "工程": ["工程", "營造", "建設", "施工"],
-            "買受定製": ["買受", "定製", "訂製", "製造"]
-        }
-        
-        # 找出最可能的分類
+        # 找出最可能的分類（依序取第一個有關鍵字出現的分類）
         best_match = None
-        for category, keywords in category_mapping.items():
-            if any(keyword in 公告標的 for keyword in keywords):
+        for category, pattern in self.CATEGORY_PATTERNS:
+            if pattern.search(公告標的):
                 best_match = category
                 break
         
         if best_match:
             item.description = f"標的分類為{best_match}"
             # 這裡可以進一步檢查須知中的對應設定
-            if "買受，定製" in 公告標的 and "租購" in str(須知):
+            if "買受，定製" in 公告標的 and self._dict_contains(須知, "租購"):
                 item.status = ValidationStatus.WARNING
                 item.description = "標的分類可能不一致（買受定製 vs 租購）"
                 item.confidence = 0.7
@@ -666,9 +877,9 @@ class SmartComplianceValidator(TenderComplianceValidator):
             item.description = f"無法確定標的分類：{公告標的}"
             item.confidence = 0.5
         
-        self.validation_items.append(item)
+        return item
     
-    def _validate_item_9_smart(self, 公告: Dict, 須知: Dict):
+    def _validate_item_9_smart(self, 公告: Dict, 須知: Dict) -> ValidationItem:
         """項次9：條約協定 - 智能版"""
         item = ValidationItem(
             item_number=9,
@@ -698,9 +909,9 @@ class SmartComplianceValidator(TenderComplianceValidator):
             item.description = "條約協定資訊不明"
             item.confidence = 0.5
         
-        self.validation_items.append(item)
+        return item
     
-    def _validate_item_10_smart(self, 公告: Dict, 須知: Dict):
+    def _validate_item_10_smart(self, 公告: Dict, 須知: Dict) -> ValidationItem:
         """項次10：敏感性採購 - 智能版"""
         item = ValidationItem(
             item_number=10,
@@ -733,9 +944,9 @@ class SmartComplianceValidator(TenderComplianceValidator):
             item.status = ValidationStatus.SKIP
             item.description = "非敏感性採購"
         
-        self.validation_items.append(item)
+        return item
     
-    def _validate_item_11_smart(self, 公告: Dict, 須知: Dict):
+    def _validate_item_11_smart(self, 公告: Dict, 須知: Dict) -> ValidationItem:
         """項次11：國安採購 - 智能版"""
         item = ValidationItem(
             item_number=11,
@@ -764,9 +975,9 @@ class SmartComplianceValidator(TenderComplianceValidator):
             item.status = ValidationStatus.SKIP
             item.description = "非國安採購"
         
-        self.validation_items.append(item)
+        return item
     
-    def _validate_item_12_smart(self, 公告: Dict, 須知: Dict):
+    def _validate_item_12_smart(self, 公告: Dict, 須知: Dict) -> ValidationItem:
         """項次12：增購權利 - 智能版"""
         item = ValidationItem(
             item_number=12,
@@ -802,96 +1013,20 @@ class SmartComplianceValidator(TenderComplianceValidator):
             item.description = "增購權利資訊不明"
             item.confidence = 0.5
         
-        self.validation_items.append(item)
+        return item
     
-    def _validate_items_13_to_16_smart(self, 公告: Dict, 須知: Dict):
-        """項次13-16：標準設定 - 智能版"""
-        
-        # 項次13：特殊採購
-        item13 = ValidationItem(
-            item_number=13,
-            item_name="特殊採購認定",
-            status=ValidationStatus.PASS,
-            description=""
-        )
-        
-        if 公告.get("特殊採購") == "否":
-            if 須知.get("第4點非特殊採購") != "已勾選":
-                item13.status = ValidationStatus.FAIL
-                item13.description = "非特殊採購但須知未勾選"
-                item13.confidence = 0.8
-            else:
-                item13.description = "特殊採購設定正確"
-        else:
-            item13.status = ValidationStatus.SKIP
-            item13.description = "特殊採購案件"
-        
-        self.validation_items.append(item13)
-        
-        # 項次14：統包
-        item14 = ValidationItem(
-            item_number=14,
-            item_name="統包認定",
-            status=ValidationStatus.PASS,
-            description=""
-        )
-        
-        if 公告.get("統包") == "否":
-            if 須知.get("第35點非統包") != "已勾選":
-                item14.status = ValidationStatus.WARNING
-                item14.description = "非統包但須知未明確勾選"
-                item14.confidence = 0.7
-            else:
-                item14.description = "統包設定正確"
-        else:
-            item14.status = ValidationStatus.SKIP
-            item14.description = "統包案件"
-        
-        self.validation_items.append(item14)
-        
-        # 項次15：協商措施
-        item15 = ValidationItem(
-            item_number=15,
-            item_name="協商措施",
-            status=ValidationStatus.PASS,
-            description=""
-        )
-        
-        if 公告.get("協商措施") == "否":
-            if 須知.get("第54點不協商") != "已勾選":
-                item15.status = ValidationStatus.WARNING
-                item15.description = "不採協商但須知未明確勾選"
-                item15.confidence = 0.7
-            else:
-                item15.description = "協商措施設定正確"
-        else:
-            item15.status = ValidationStatus.SKIP
-            item15.description = "採用協商措施"
-        
-        self.validation_items.append(item15)
-        
-        # 項次16：電子領標
-        item16 = ValidationItem(
-            item_number=16,
-            item_name="電子領標",
-            status=ValidationStatus.PASS,
-            description=""
-        )
-        
-        if 公告.get("電子領標") == "是":
-            if 須知.get("第9點電子領標") != "已勾選":
-                item16.status = ValidationStatus.FAIL
-                item16.description = "提供電子領標但須知未勾選"
-                item16.confidence = 0.8
-            else:
-                item16.description = "電子領標設定正確"
-        else:
-            item16.status = ValidationStatus.SKIP
-            item16.description = "不提供電子領標"
-        
-        self.validation_items.append(item16)
+    def _check_simple_rule(self, rule: Tuple, 公告: Dict, 須知: Dict) -> ValidationItem:
+        """依簡單規則檢核單一項次（公告設定觸發時須知對應選項應勾選）"""
+        (item_number, item_name, ann_key, trigger, req_key,
+         fail_status, fail_confidence, fail_desc, pass_desc, skip_desc) = rule
+        
+        if 公告.get(ann_key) != trigger:
+            return ValidationItem(item_number, item_name, ValidationStatus.SKIP, skip_desc)
+        if 須知.get(req_key) != "已勾選":
+            return ValidationItem(item_number, item_name, fail_status, fail_desc, confidence=fail_confidence)
+        return ValidationItem(item_number, item_name, ValidationStatus.PASS, pass_desc)
     
-    def _validate_item_17_smart(self, 公告: Dict, 須知: Dict):
+    def _validate_item_17_smart(self, 公告: Dict, 須知: Dict) -> ValidationItem:
         """項次17：押標金 - 智能版"""
         item = ValidationItem(
             item_number=17,
@@ -904,17 +1039,8 @@ class SmartComplianceValidator(TenderComplianceValidator):
         須知押標金 = 須知.get("押標金金額", 0)
         
         # 智能數字轉換
-        def smart_parse_amount(value):
-            if isinstance(value, (int, float)):
-                return int(value)
-            elif isinstance(value, str):
-                # 移除所有非數字字符
-                clean_value = re.sub(r'[^0-9]', '', value)
-                return int(clean_value) if clean_value else 0
-            return 0
-        
-        公告押標金 = smart_parse_amount(公告押標金)
-        須知押標金 = smart_parse_amount(須知押標金)
+        公告押標金 = _parse_amount(公告押標金)
+        須知押標金 = _parse_amount(須知押標金)
         
         if 公告押標金 != 須知押標金:
             # 檢查是否為比例關係（如5%誤差）
@@ -942,31 +1068,9 @@ class SmartComplianceValidator(TenderComplianceValidator):
         else:
             item.description = "無押標金"
         
-        self.validation_items.append(item)
-    
-    def _validate_item_18_smart(self, 公告: Dict, 須知: Dict):
-        """項次18：身障優先 - 智能版"""
-        item = ValidationItem(
-            item_number=18,
-            item_name="身障優先採購",
-            status=ValidationStatus.PASS,
-            description=""
-        )
-        
-        if 公告.get("優先身障") == "是":
-            if 須知.get("第59點身障優先") != "已勾選":
-                item.status = ValidationStatus.FAIL
-                item.description = "身障優先但須知未勾選"
-                item.confidence = 0.8
-            else:
-                item.description = "身障優先設定正確"
-        else:
-            item.status = ValidationStatus.SKIP
-            item.description = "非身障優先採購"
-        
-        self.validation_items.append(item)
+        return item
     
-    def _validate_item_20_smart(self, 公告: Dict, 須知: Dict):
+    def _validate_item_20_smart(self, 公告: Dict, 須知: Dict) -> ValidationItem:
         """項次20：外國廠商 - 智能版"""
         item = ValidationItem(
             item_number=20,
@@ -978,17 +1082,14 @@ class SmartComplianceValidator(TenderComplianceValidator):
         外國廠商 = 公告.get("外國廠商", "")
         
         # 智能判斷
-        foreign_allowed = ["可", "得參與", "可以"]
-        foreign_not_allowed = ["不可", "不得", "禁止"]
-        
-        if any(keyword in 外國廠商 for keyword in foreign_allowed):
+        if _FOREIGN_ALLOWED_RE.search(外國廠商):
             if 須知.get("第8點可參與") != "已勾選":
                 item.status = ValidationStatus.FAIL
                 item.description = "允許外國廠商但須知未勾選可參與"
                 item.confidence = 0.8
             else:
                 item.description = "外國廠商設定正確"
-        elif any(keyword in 外國廠商 for keyword in foreign_not_allowed):
+        elif _FOREIGN_DENY_RE.search(外國廠商):
             if 須知.get("第8點不可參與") != "已勾選":
                 item.status = ValidationStatus.FAIL
                 item.description = "不允許外國廠商但須知設定錯誤"
@@ -1000,31 +1101,9 @@ class SmartComplianceValidator(TenderComplianceValidator):
             item.description = f"外國廠商規定不明確：{外國廠商}"
             item.confidence = 0.5
         
-        self.validation_items.append(item)
+        return item
     
-    def _validate_item_21_smart(self, 公告: Dict, 須知: Dict):
-        """項次21：中小企業 - 智能版"""
-        item = ValidationItem(
-            item_number=21,
-            item_name="中小企業參與限制",
-            status=ValidationStatus.PASS,
-            description=""
-        )
-        
-        if 公告.get("限定中小企業") == "是":
-            if 須知.get("第8點不可參與") != "已勾選":
-                item.status = ValidationStatus.WARNING
-                item.description = "限定中小企業但相關設定可能不完整"
-                item.confidence = 0.7
-            else:
-                item.description = "中小企業限制設定正確"
-        else:
-            item.status = ValidationStatus.SKIP
-            item.description = "不限定中小企業"
-        
-        self.validation_items.append(item)
-    
-    def _validate_item_23_smart(self, 公告: Dict, 須知: Dict):
+    def _validate_item_23_smart(self, 公告: Dict, 須知: Dict) -> ValidationItem:
         """項次23：開標方式 - 智能版"""
         item = ValidationItem(
             item_number=23,
@@ -1059,17 +1138,38 @@ class SmartComplianceValidator(TenderComplianceValidator):
             item.description = f"開標方式不明確：{開標方式}"
             item.confidence = 0.5
         
-        self.validation_items.append(item)
+        return item
 
 class IntelligentAuditSystem:
     """智能審核系統主類別 - 北捷V1 v2.1"""
     
+    # 檔案搜尋規則（於載入時預先編譯）
+    # keywords/exclude 各合併為一個樣式，以找到的不同關鍵字數計分；各清單內的關鍵字互不重疊
+    SEARCH_RULES = {
+        "announcement": {
+            "keywords": _keyword_re(["公告", "公開", "取得", "報價", "招標"]),
+            "exclude": _keyword_re(["須知", "說明", "附件"]),
+            "patterns": [re.compile(p, re.IGNORECASE) for p in (r"01", r"公告.*\.odt", r"公開.*\.odt")],
+            "extensions": (".odt", ".docx", ".doc")
+        },
+        "requirements": {
+            "keywords": _keyword_re(["須知", "說明", "投標"]),
+            "exclude": _keyword_re(["公告", "決標"]),
+            "patterns": [re.compile(p, re.IGNORECASE) for p in (r"0[23]", r"須知.*\.(docx|odt)", r"說明.*\.(docx|odt)")],
+            "extensions": (".docx", ".odt", ".doc")
+        }
+    }
+    
+    # 文件內容快取的最大筆數
+    CONTENT_CACHE_SIZE = 256
+    
     def __init__(self, use_ai=True):
         self.extractor = EnhancedDocumentExtractor()
         self.validator = SmartComplianceValidator()
         self.ai_validator = AITenderValidator() if use_ai else None
         self.use_ai = use_ai
         self.version = "北捷V1 v2.1 智能容錯優化版"
+        self.content_cache = {}
     
     def audit_tender_case_smart(self, case_folder: str) -> Dict:
         """執行智能審核"""
@@ -1077,6 +1177,9 @@ class IntelligentAuditSystem:
         print(f"🎯 開始智能審核招標案件: {case_folder}")
         print(f"📊 使用版本: {self.version}")
         
+        # 整個審核流程共用同一個時間戳記，報告及匯出檔名的時間一致
+        audit_time = datetime.now().isoformat()
+        
         # 1. 智能尋找檔案
         announcement_file = self._smart_find_file(case_folder, "announcement")
         requirements_file = self._smart_find_file(case_folder, "requirements")
@@ -1091,13 +1194,15 @@ class IntelligentAuditSystem:
                 "建議": "請確認資料夾中包含招標公告和投標須知檔案"
             }
         
-        print(f"✅ 找到招標公告: {os.path.basename(announcement_file)}")
-        print(f"✅ 找到投標須知: {os.path.basename(requirements_file)}")
+        announcement_name = os.path.basename(announcement_file)
+        requirements_name = os.path.basename(requirements_file)
+        print(f"✅ 找到招標公告: {announcement_name}")
+        print(f"✅ 找到投標須知: {requirements_name}")
         
         # 2. 智能提取內容
         print("📄 智能提取文件內容...")
-        ann_content = self.extractor.extract_with_fallback(announcement_file)
-        req_content = self.extractor.extract_with_fallback(requirements_file)
+        ann_content = self._extract_content(announcement_file)
+        req_content = self._extract_content(requirements_file)
         
         if not ann_content or not req_content:
             return {"錯誤": "無法讀取文件內容", "可能原因": "檔案格式不支援或已損壞"}
@@ -1118,7 +1223,8 @@ class IntelligentAuditSystem:
         validation_result = self.validator.validate_all_smart(
             ann_extract_result.data,
             req_data,
-            {"announcement": ann_extract_result}
+            {"announcement": ann_extract_result},
+            audit_time
         )
         
         # 5. AI深度分析（可選）
@@ -1135,9 +1241,9 @@ class IntelligentAuditSystem:
             "系統版本": self.version,
             "案件資訊": {
                 "資料夾": case_folder,
-                "招標公告檔案": os.path.basename(announcement_file),
-                "投標須知檔案": os.path.basename(requirements_file),
-                "審核時間": datetime.now().isoformat()
+                "招標公告檔案": announcement_name,
+                "投標須知檔案": requirements_name,
+                "審核時間": audit_time
             },
             "智能提取結果": {
                 "招標公告": {
@@ -1159,78 +1265,93 @@ class IntelligentAuditSystem:
         
         return smart_report
     
+    def audit_batch(self, case_folders: List[str], max_workers: Optional[int] = None) -> List[Dict]:
+        """以多個行程平行智能審核多個案件資料夾，結果依輸入順序回傳
+        
+        每個工作行程依本系統的use_ai設定各自建立審核系統；所有行程合計最多同時送出
+        AI_MAX_CONCURRENT_REQUESTS個AI請求，避免多個行程同時壓垮同一個模型
+        """
+        ai_slots = multiprocessing.Semaphore(AI_MAX_CONCURRENT_REQUESTS)
+        with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count(),
+                                 initializer=_init_audit_worker,
+                                 initargs=(self.use_ai, ai_slots)) as executor:
+            return list(executor.map(_audit_one, case_folders, chunksize=4))
+    
+    def _extract_content(self, file_path: str) -> str:
+        """提取文件內容，檔案未變動（修改時間與大小相同）時直接沿用上次結果"""
+        stat = os.stat(file_path)
+        cache_key = (file_path, stat.st_mtime_ns, stat.st_size)
+        
+        if cache_key in self.content_cache:
+            # 命中時移到最後，使最久未使用的項目排在最前面（LRU）
+            content = self.content_cache.pop(cache_key)
+            self.content_cache[cache_key] = content
+            return content
+        
+        content = self.extractor.extract_with_fallback(file_path)
+        if content:
+            # 只保留最近使用的結果，避免重複審核大量案件時無限累積；已滿時移除最久未使用的一筆
+            if len(self.content_cache) >= self.CONTENT_CACHE_SIZE:
+                del self.content_cache[next(iter(self.content_cache))]
+            self.content_cache[cache_key] = content
+        return content
+    
     def _smart_find_file(self, case_folder: str, file_type: str) -> Optional[str]:
         """智能檔案搜尋"""
         if not os.path.exists(case_folder):
             return None
         
-        # 定義搜尋規則
-        search_rules = {
-            "announcement": {
-                "keywords": ["公告", "公開", "取得", "報價", "招標"],
-                "exclude": ["須知", "說明", "附件"],
-                "patterns": [r"01", r"公告.*\.odt", r"公開.*\.odt"],
-                "extensions": [".odt", ".docx", ".doc"]
-            },
-            "requirements": {
-                "keywords": ["須知", "說明", "投標"],
-                "exclude": ["公告", "決標"],
-                "patterns": [r"0[23]", r"須知.*\.(docx|odt)", r"說明.*\.(docx|odt)"],
-                "extensions": [".docx", ".odt", ".doc"]
-            }
-        }
+        rules = self.SEARCH_RULES.get(file_type)
+        if not rules:
+            return None
         
-        rules = search_rules.get(file_type, {})
-        candidates = []
+        # 逐一計分並只保留目前最高分者（同分時保留先出現的檔案）
+        best_score, best_path = 0, None
         
-        for file in os.listdir(case_folder):
-            if file.startswith('~$'):  # 跳過臨時檔案
-                continue
-            
-            file_lower = file.lower()
-            score = 0
-            
-            # 檢查副檔名
-            if any(file.endswith(ext) for ext in rules.get("extensions", [])):
-                score += 10
-            
-            # 檢查關鍵字
-            for keyword in rules.get("keywords", []):
-                if keyword in file:
-                    score += 5
-            
-            # 檢查排除字
-            for exclude in rules.get("exclude", []):
-                if exclude in file:
-                    score -= 10
-            
-            # 檢查模式
-            for pattern in rules.get("patterns", []):
-                if re.search(pattern, file, re.IGNORECASE):
-                    score += 8
-            
-            if score > 0:
-                candidates.append((score, os.path.join(case_folder, file)))
+        with os.scandir(case_folder) as entries:
+            for entry in entries:
+                file = entry.name
+                if file.startswith('~$'):  # 跳過臨時檔案
+                    continue
+                
+                score = 0
+                
+                # 檢查副檔名
+                if file.endswith(rules["extensions"]):
+                    score += 10
+                
+                # 檢查關鍵字
+                score += 5 * len(set(rules["keywords"].findall(file)))
+                
+                # 檢查排除字
+                score -= 10 * len(set(rules["exclude"].findall(file)))
+                
+                # 檢查模式
+                for pattern in rules["patterns"]:
+                    if pattern.search(file):
+                        score += 8
+                
+                if score > best_score:
+                    best_score, best_path = score, entry.path
         
         # 返回最高分的檔案
-        if candidates:
-            candidates.sort(key=lambda x: x[0], reverse=True)
-            return candidates[0][1]
-        
-        return None
+        return best_path
     
     def _generate_executive_summary(self, validation_result: Dict, ai_analysis: Optional[Dict]) -> Dict:
         """生成執行摘要"""
         智能分析 = validation_result.get("智能分析", {})
+        失敗數 = 智能分析.get("失敗數", 0)
+        警告數 = 智能分析.get("警告數", 0)
+        自動修復數 = 智能分析.get("自動修復數", 0)
         
         # 計算風險分數
-        risk_score = self._calculate_risk_score(智能分析)
+        risk_score = self._calculate_risk_score(失敗數, 警告數, 自動修復數, 智能分析.get("總體信心度", 1.0))
         
         # 決定行動建議
-        if 智能分析.get("失敗數", 0) == 0:
+        if 失敗數 == 0:
             action = "可直接發布"
             risk_level = "低"
-        elif 智能分析.get("失敗數", 0) <= 2:
+        elif 失敗數 <= 2:
             action = "建議修正後發布"
             risk_level = "中"
         else:
@@ -1239,10 +1360,10 @@ class IntelligentAuditSystem:
         
         # 關鍵發現
         key_findings = []
-        if 智能分析.get("自動修復數", 0) > 0:
-            key_findings.append(f"系統自動修復了{智能分析['自動修復數']}項問題")
-        if 智能分析.get("警告數", 0) > 0:
-            key_findings.append(f"發現{智能分析['警告數']}項需要人工確認的警告")
+        if 自動修復數 > 0:
+            key_findings.append(f"系統自動修復了{自動修復數}項問題")
+        if 警告數 > 0:
+            key_findings.append(f"發現{警告數}項需要人工確認的警告")
         
         summary = {
             "最終判定": validation_result.get("審核結果", "未知"),
@@ -1253,9 +1374,9 @@ class IntelligentAuditSystem:
             "關鍵發現": key_findings,
             "通過率": f"{智能分析.get('通過數', 0)}/{智能分析.get('總項次', 23)}",
             "問題數量": {
-                "嚴重": 智能分析.get("失敗數", 0),
-                "警告": 智能分析.get("警告數", 0),
-                "已修復": 智能分析.get("自動修復數", 0)
+                "嚴重": 失敗數,
+                "警告": 警告數,
+                "已修復": 自動修復數
             }
         }
         
@@ -1266,19 +1387,18 @@ class IntelligentAuditSystem:
         
         return summary
     
-    def _calculate_risk_score(self, 智能分析: Dict) -> float:
+    def _calculate_risk_score(self, 失敗數: int, 警告數: int, 自動修復數: int, confidence: float) -> float:
         """計算風險分數（0-100）"""
         base_score = 100.0
         
         # 扣分項目
-        base_score -= 智能分析.get("失敗數", 0) * 15  # 每個失敗扣15分
-        base_score -= 智能分析.get("警告數", 0) * 5   # 每個警告扣5分
+        base_score -= 失敗數 * 15  # 每個失敗扣15分
+        base_score -= 警告數 * 5   # 每個警告扣5分
         
         # 加分項目
-        base_score += 智能分析.get("自動修復數", 0) * 3  # 每個自動修復加3分
+        base_score += 自動修復數 * 3  # 每個自動修復加3分
         
         # 信心度調整
-        confidence = 智能分析.get("總體信心度", 1.0)
         base_score *= confidence
         
         # 確保在0-100範圍內
@@ -1288,40 +1408,46 @@ class IntelligentAuditSystem:
         """顯示審核摘要"""
         summary = report.get("執行摘要", {})
         
-        print("\n" + "="*60)
-        print("📊 智能審核結果摘要")
-        print("="*60)
-        
-        print(f"最終判定: {summary.get('最終判定', 'N/A')}")
-        print(f"風險等級: {summary.get('風險等級', 'N/A')} (分數: {summary.get('風險分數', 'N/A')})")
-        print(f"建議行動: {summary.get('建議行動', 'N/A')}")
-        print(f"總體信心度: {summary.get('總體信心度', 'N/A')}")
-        print(f"通過率: {summary.get('通過率', 'N/A')}")
+        # 先組好所有行再一次輸出，批次審核導向檔案時只需一次寫入
+        lines = [
+            "\n" + "="*60,
+            "📊 智能審核結果摘要",
+            "="*60,
+            f"最終判定: {summary.get('最終判定', 'N/A')}",
+            f"風險等級: {summary.get('風險等級', 'N/A')} (分數: {summary.get('風險分數', 'N/A')})",
+            f"建議行動: {summary.get('建議行動', 'N/A')}",
+            f"總體信心度: {summary.get('總體信心度', 'N/A')}",
+            f"通過率: {summary.get('通過率', 'N/A')}"
+        ]
         
         問題數量 = summary.get("問題數量", {})
         if 問題數量:
-            print("\n問題統計:")
-            print(f"  - 嚴重問題: {問題數量.get('嚴重', 0)}")
-            print(f"  - 警告事項: {問題數量.get('警告', 0)}")
-            print(f"  - 已自動修復: {問題數量.get('已修復', 0)}")
+            lines.append("\n問題統計:")
+            lines.append(f"  - 嚴重問題: {問題數量.get('嚴重', 0)}")
+            lines.append(f"  - 警告事項: {問題數量.get('警告', 0)}")
+            lines.append(f"  - 已自動修復: {問題數量.get('已修復', 0)}")
         
         if summary.get("關鍵發現"):
-            print("\n關鍵發現:")
-            for finding in summary["關鍵發現"]:
-                print(f"  • {finding}")
+            lines.append("\n關鍵發現:")
+            lines.extend(f"  • {finding}" for finding in summary["關鍵發現"])
         
-        print("="*60)
+        lines.append("="*60)
+        print("\n".join(lines))
+    
+    def _audit_time(self, report: Dict) -> datetime:
+        """取得審核開始時的時間戳記，報告檔名皆以此為準"""
+        return datetime.fromisoformat(report["案件資訊"]["審核時間"])
     
     def save_smart_report(self, report: Dict, output_file: Optional[str] = None):
         """儲存智能報告"""
         if not output_file:
             case_name = report["案件資訊"]["資料夾"].split("/")[-1]
             status = report["執行摘要"]["最終判定"]
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            timestamp = self._audit_time(report).strftime("%Y%m%d_%H%M%S")
             output_file = f"smart_audit_{case_name}_{status}_{timestamp}.json"
         
         with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(report, f, ensure_ascii=False, indent=2)
+            f.write(dumps_pretty(report, default=_json_default))
         
         print(f"\n📄 智能審核報告已儲存: {output_file}")
         return output_file
@@ -1330,7 +1456,7 @@ class IntelligentAuditSystem:
         """匯出為Excel相容的CSV格式"""
         import csv
         
-        output_file = f"smart_audit_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+        output_file = f"smart_audit_report_{self._audit_time(report).strftime('%Y%m%d_%H%M%S')}.csv"
         
         with open(output_file, 'w', newline='', encoding='utf-8-sig') as csvfile:
             writer = csv.writer(csvfile)
@@ -1343,20 +1469,18 @@ class IntelligentAuditSystem:
             writer.writerow(["案件資訊"])
             writer.writerow(["項目", "內容"])
             case_info = report.get("案件資訊", {})
-            for key, value in case_info.items():
-                writer.writerow([key, value])
+            writer.writerows(case_info.items())
             writer.writerow([])
             
             # 執行摘要
             writer.writerow(["執行摘要"])
             summary = report.get("執行摘要", {})
-            for key, value in summary.items():
-                if isinstance(value, dict):
-                    writer.writerow([key, json.dumps(value, ensure_ascii=False)])
-                elif isinstance(value, list):
-                    writer.writerow([key, "; ".join(value)])
-                else:
-                    writer.writerow([key, value])
+            writer.writerows(
+                (key, json.dumps(value, ensure_ascii=False)) if isinstance(value, dict)
+                else (key, "; ".join(value)) if isinstance(value, list)
+                else (key, value)
+                for key, value in summary.items()
+            )
             writer.writerow([])
             
             # 詳細檢核結果
@@ -1364,26 +1488,45 @@ class IntelligentAuditSystem:
             writer.writerow(["項次", "項目名稱", "狀態", "描述", "信心度", "自動修復"])
             
             validation = report.get("智能驗證結果", {}).get("詳細結果", {})
-            all_items = []
-            for category in ["通過項目", "失敗項目", "警告項目", "自動修復項目"]:
-                all_items.extend(validation.get(category, []))
+            item_order = lambda x: x.get("項次", 0)
+            # 各類別本已依項次產生，排序通常只需線性檢查；另建排序副本，不更動報告內容
+            categories = [sorted(validation.get(category, []), key=item_order)
+                          for category in ["通過項目", "失敗項目", "警告項目", "自動修復項目"]]
             
-            # 按項次排序
-            all_items.sort(key=lambda x: x.get("項次", 0))
-            
-            for item in all_items:
-                writer.writerow([
+            # 按項次合併各類別，逐列寫出而不另建完整清單
+            writer.writerows(
+                (
                     item.get("項次", ""),
                     item.get("項目名稱", ""),
                     item.get("狀態", ""),
                     item.get("描述", ""),
                     item.get("信心度", ""),
                     "是" if item.get("自動修復", False) else "否"
-                ])
+                )
+                for item in heapq.merge(*categories, key=item_order)
+            )
         
         print(f"📄 Excel格式報告已匯出: {output_file}")
         return output_file
 
+# 批次審核（IntelligentAuditSystem.audit_batch）的工作行程狀態：須為模組層級函式才能傳給工作行程
+_worker_audit_system = None
+
+def _init_audit_worker(use_ai: bool, ai_slots):
+    """工作行程初始化：建立智能審核系統並套用共用的AI請求限流，跨案件重複使用"""
+    global _worker_audit_system
+    _worker_audit_system = IntelligentAuditSystem(use_ai=use_ai)
+    _worker_audit_system.extractor.request_slots = ai_slots
+    if _worker_audit_system.ai_validator:
+        _worker_audit_system.ai_validator.request_slots = ai_slots
+
+def _audit_one(case_folder: str) -> Dict:
+    """於工作行程中智能審核單一案件，發生例外時回傳錯誤結果，不中斷整批審核"""
+    try:
+        return _worker_audit_system.audit_tender_case_smart(case_folder)
+    except Exception as e:
+        return {"錯誤": f"審核{case_folder}時發生錯誤：{e}", "詳情": traceback.format_exc()}
+
 # 使用範例
 def main():
     """主程式 - 展示智能審核系統"""
@@ -1,7 +1,134 @@
-import json
+from decimal import Decimal, InvalidOperation
 from typing import Dict, List, Tuple
+from tender_io import dumps_pretty
+
+# 金額字串中可直接刪除的千分位符號與幣別字樣
+_AMOUNT_NOISE_TBL = str.maketrans('', '', ',元')
+
+def _to_amount(value):
+    """金額轉為整數：只移除千分位、幣別字樣及空白（如「NT$ 59,000元」→59000），空值為0
+    
+    其餘內容無法解析為整數時拋出ValueError（如「1.5萬」、「NA」），不猜測數值
+    """
+    if value is None:
+        return 0
+    if not isinstance(value, str):
+        return value
+    text = ''.join(value.replace('NT$', '').translate(_AMOUNT_NOISE_TBL).split())
+    try:
+        return int(text)
+    except ValueError:
+        # 「59000.0」之類整數值的小數寫法
+        try:
+            amount = Decimal(text)
+        except InvalidOperation:
+            raise ValueError(f"無法解析的金額：{value!r}") from None
+        if not amount.is_finite() or amount != amount.to_integral_value():
+            raise ValueError(f"無法解析的金額：{value!r}")
+        return int(amount)
+
+def _normalize_amounts(data: Dict, fields: Tuple[str, ...]) -> Dict:
+    """金額欄位為字串或空值時回傳轉為整數後的副本；欄位皆已是數值時直接回傳原資料
+    
+    無法解析的金額保留原值，由各項次檢核回報為錯誤
+    """
+    pending = [field for field in fields if field in data and not isinstance(data[field], (int, float))]
+    if not pending:
+        return data
+    data = dict(data)
+    for field in pending:
+        try:
+            data[field] = _to_amount(data[field])
+        except ValueError:
+            pass
+    return data
+
+def _is_amount(value) -> bool:
+    """是否為可比較的金額數值（bool不算）"""
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
 
 class TenderComplianceValidator:
+    # 勾選規則的分支格式：(公告欄位, 比對方式, 觸發值, [(須知欄位, 應勾選, 錯誤類型, 說明), ...])
+    # 比對方式："等於"、"包含"（子字串）、"其他"（前面分支皆不符合時一律適用）
+    # 依序取第一個符合的分支檢查須知勾選狀態；沒有分支符合時該項次不列入通過或失敗
+    # 規則內容為方法名稱時，表示該項次需要專用的檢核邏輯
+    RULES = (
+        # 項次1：案號案名一致性
+        (1, "validate_item_1"),
+        # 項次2：公開取得報價金額與設定
+        (2, "validate_item_2"),
+        # 項次3：公開取得報價須知設定
+        (3, [("招標方式", "包含", "公開取得報價", [
+            ("第5點逾公告金額十分之一", True, "須知設定錯誤", "第5點應勾選")])]),
+        # 項次4：最低標設定
+        (4, [("決標方式", "等於", "最低標", [
+            ("第59點最低標", True, "最低標設定錯誤", "須知第59點相關選項應勾選"),
+            ("第59點非64條之2", True, "最低標設定錯誤", "須知第59點相關選項應勾選")])]),
+        # 項次5：底價設定
+        (5, [("訂有底價", "等於", "是", [
+            ("第6點訂底價", True, "底價設定錯誤", "須知第6點應勾選")])]),
+        # 項次6：非複數決標（這裡簡化處理，實際應檢查所有相關點位）
+        (6, [("複數決標", "等於", "否", [])]),
+        # 項次7：64條之2
+        (7, [("依64條之2", "等於", "否", [
+            ("第59點非64條之2", True, "64條之2設定錯誤", "須知第59點非64條之2應勾選")])]),
+        # 項次8：標的分類（簡化處理）
+        (8, [(None, "其他", None, [])]),
+        # 項次9：條約協定
+        (9, [("適用條約", "等於", "否", [
+            ("第8點條約協定", False, "條約協定設定錯誤", "須知第8點條約協定不應勾選")])]),
+        # 項次10：敏感性採購
+        (10, [("敏感性採購", "等於", "是", [
+            ("第13點敏感性", True, "敏感性採購設定錯誤", "須知第13點敏感性應勾選"),
+            ("第8點禁止大陸", True, "敏感性採購設定錯誤", "須知第8點禁止大陸應勾選")])]),
+        # 項次11：國安採購
+        (11, [("國安採購", "等於", "是", [
+            ("第13點國安", True, "國安採購設定錯誤", "須知第13點國安應勾選"),
+            ("第8點禁止大陸", True, "國安採購設定錯誤", "須知第8點禁止大陸應勾選")])]),
+        # 項次12：增購權利
+        (12, [("增購權利", "等於", "是", [
+                  ("第7點保留增購", True, "增購權利設定錯誤", "須知第7點保留增購應勾選"),
+                  ("第7點未保留增購", False, "增購權利設定矛盾", "不應同時勾選保留與未保留")]),
+              ("增購權利", "等於", "無", [
+                  ("第7點未保留增購", True, "增購權利設定錯誤", "須知第7點未保留增購應勾選")])]),
+        # 項次13：特殊採購
+        (13, [("特殊採購", "等於", "否", [
+            ("第4點非特殊採購", True, "特殊採購設定錯誤", "須知第4點應勾選")])]),
+        # 項次14：統包
+        (14, [("統包", "等於", "否", [
+            ("第35點非統包", True, "統包設定錯誤", "須知第35點應勾選")])]),
+        # 項次15：協商措施
+        (15, [("協商措施", "等於", "否", [
+            ("第54點不協商", True, "協商措施設定錯誤", "須知第54點應勾選")])]),
+        # 項次16：電子領標
+        (16, [("電子領標", "等於", "是", [
+            ("第9點電子領標", True, "電子領標設定錯誤", "須知第9點應勾選")])]),
+        # 項次17：押標金
+        (17, "validate_item_17"),
+        # 項次18：身障優先
+        (18, [("優先身障", "等於", "是", [
+                  ("第59點身障優先", True, "身障優先設定錯誤", "須知第59點身障優先應勾選")]),
+              (None, "其他", None, [])]),
+        # 項次20：外國廠商
+        (20, [("外國廠商", "等於", "可", [
+                  ("第8點可參與", True, "外國廠商設定錯誤", "須知第8點可參與應勾選")]),
+              ("外國廠商", "等於", "不可", [
+                  ("第8點不可參與", True, "外國廠商設定錯誤", "須知第8點不可參與應勾選")])]),
+        # 項次21：中小企業
+        (21, [("限定中小企業", "等於", "是", [
+                  ("第8點不可參與", True, "中小企業設定錯誤", "限定中小企業時須知第8點不可參與應勾選")]),
+              (None, "其他", None, [])]),
+        # 項次23：開標方式
+        (23, [("開標方式", "包含", "不分段", [
+                  ("第42點不分段", True, "開標方式設定錯誤", "須知第42點不分段應勾選"),
+                  ("第42點分二段", False, "開標方式設定矛盾", "不應同時勾選兩種開標方式")]),
+              ("開標方式", "包含", "分二段", [
+                  ("第42點分二段", True, "開標方式設定錯誤", "須知第42點分二段應勾選")])]),
+    )
+    
+    # 這些項次會把同一分支內所有不符的勾選合併成一筆錯誤，其餘項次只回報第一個錯誤
+    MERGED_ERROR_ITEMS = {10, 11}
+    
     def __init__(self):
         self.validation_results = {
             "審核結果": "通過",
@@ -16,59 +143,18 @@ class TenderComplianceValidator:
     def validate_all(self, 公告: Dict, 須知: Dict) -> Dict:
         """執行所有23項審核"""
         
-        # 項次1：案號案名一致性
-        self.validate_item_1(公告, 須知)
-        
-        # 項次2：公開取得報價金額與設定
-        self.validate_item_2(公告, 須知)
-        
-        # 項次3：公開取得報價須知設定
-        self.validate_item_3(公告, 須知)
-        
-        # 項次4：最低標設定
-        self.validate_item_4(公告, 須知)
-        
-        # 項次5：底價設定
-        self.validate_item_5(公告, 須知)
+        # AI提取的金額可能是「59,000」之類的字串，先統一轉為整數，各項檢核只需比較數值
+        公告 = _normalize_amounts(公告, ("採購金額", "押標金"))
+        須知 = _normalize_amounts(須知, ("押標金金額",))
         
-        # 項次6：非複數決標
-        self.validate_item_6(公告, 須知)
+        # 先將須知勾選狀態整理成已勾選項目集合，規則比對時只做集合成員檢查
+        checked = {key for key, value in 須知.items() if value == "已勾選"}
         
-        # 項次7：64條之2
-        self.validate_item_7(公告, 須知)
-        
-        # 項次8：標的分類
-        self.validate_item_8(公告, 須知)
-        
-        # 項次9：條約協定
-        self.validate_item_9(公告, 須知)
-        
-        # 項次10：敏感性採購
-        self.validate_item_10(公告, 須知)
-        
-        # 項次11：國安採購
-        self.validate_item_11(公告, 須知)
-        
-        # 項次12：增購權利
-        self.validate_item_12(公告, 須知)
-        
-        # 項次13-16：標準設定
-        self.validate_items_13_to_16(公告, 須知)
-        
-        # 項次17：押標金
-        self.validate_item_17(公告, 須知)
-        
-        # 項次18：身障優先
-        self.validate_item_18(公告, 須知)
-        
-        # 項次20：外國廠商
-        self.validate_item_20(公告, 須知)
-        
-        # 項次21：中小企業
-        self.validate_item_21(公告, 須知)
-        
-        # 項次23：開標方式
-        self.validate_item_23(公告, 須知)
+        for item_num, rule in self.RULES:
+            if isinstance(rule, str):
+                getattr(self, rule)(公告, 須知)
+            else:
+                self.check_rule(item_num, rule, 公告, checked)
         
         # 更新統計
         self.validation_results["通過數"] = len(self.validation_results["通過項次"])
@@ -77,6 +163,32 @@ class TenderComplianceValidator:
         
         return self.validation_results
     
+    def check_rule(self, item_num: int, branches: List, 公告: Dict, checked: set):
+        """依規則表檢核單一項次的須知勾選設定（checked為須知中已勾選的項目集合）"""
+        for field, match_type, trigger, checks in branches:
+            if match_type == "等於":
+                matched = 公告.get(field) == trigger
+            elif match_type == "包含":
+                matched = trigger in 公告.get(field, "")
+            else:
+                matched = True
+            
+            if not matched:
+                continue
+            
+            errors = []
+            for key, should_check, error_type, description in checks:
+                if (key in checked) != should_check:
+                    errors.append((error_type, description))
+                    if item_num not in self.MERGED_ERROR_ITEMS:
+                        break
+            
+            if errors:
+                self.add_error(item_num, errors[0][0], "; ".join(description for _, description in errors))
+            else:
+                self.add_pass(item_num)
+            return
+    
     def validate_item_1(self, 公告: Dict, 須知: Dict):
         """項次1：案號案名一致性"""
         if 公告["案號"] != 須知["案號"]:
@@ -92,8 +204,11 @@ class TenderComplianceValidator:
             errors = []
             
             # 檢查金額範圍
-            if not (150000 <= 公告.get("採購金額", 0) < 1500000):
-                errors.append(f"採購金額{公告.get('採購金額')}不在15萬-150萬範圍")
+            採購金額 = 公告.get("採購金額", 0)
+            if not _is_amount(採購金額):
+                errors.append(f"採購金額{採購金額}無法辨識")
+            elif not (150000 <= 採購金額 < 1500000):
+                errors.append(f"採購金額{採購金額}不在15萬-150萬範圍")
             
             # 檢查採購金級距
             if 公告.get("採購金級距") != "未達公告金額":
@@ -112,136 +227,14 @@ class TenderComplianceValidator:
             else:
                 self.add_pass(2)
     
-    def validate_item_3(self, 公告: Dict, 須知: Dict):
-        """項次3：公開取得報價須知設定"""
-        if "公開取得報價" in 公告.get("招標方式", ""):
-            if 須知.get("第5點逾公告金額十分之一") != "已勾選":
-                self.add_error(3, "須知設定錯誤", "第5點應勾選")
-            else:
-                self.add_pass(3)
-    
-    def validate_item_4(self, 公告: Dict, 須知: Dict):
-        """項次4：最低標設定"""
-        if 公告.get("決標方式") == "最低標":
-            if 須知.get("第59點最低標") != "已勾選" or 須知.get("第59點非64條之2") != "已勾選":
-                self.add_error(4, "最低標設定錯誤", "須知第59點相關選項應勾選")
-            else:
-                self.add_pass(4)
-    
-    def validate_item_5(self, 公告: Dict, 須知: Dict):
-        """項次5：底價設定"""
-        if 公告.get("訂有底價") == "是":
-            if 須知.get("第6點訂底價") != "已勾選":
-                self.add_error(5, "底價設定錯誤", "須知第6點應勾選")
-            else:
-                self.add_pass(5)
-    
-    def validate_item_6(self, 公告: Dict, 須知: Dict):
-        """項次6：非複數決標"""
-        if 公告.get("複數決標") == "否":
-            # 這裡簡化處理，實際應檢查所有相關點位
-            self.add_pass(6)
-    
-    def validate_item_7(self, 公告: Dict, 須知: Dict):
-        """項次7：64條之2"""
-        if 公告.get("依64條之2") == "否":
-            if 須知.get("第59點非64條之2") != "已勾選":
-                self.add_error(7, "64條之2設定錯誤", "須知第59點非64條之2應勾選")
-            else:
-                self.add_pass(7)
-    
-    def validate_item_8(self, 公告: Dict, 須知: Dict):
-        """項次8：標的分類"""
-        # 簡化處理
-        self.add_pass(8)
-    
-    def validate_item_9(self, 公告: Dict, 須知: Dict):
-        """項次9：條約協定"""
-        if 公告.get("適用條約") == "否":
-            if 須知.get("第8點條約協定") == "已勾選":
-                self.add_error(9, "條約協定設定錯誤", "須知第8點條約協定不應勾選")
-            else:
-                self.add_pass(9)
-    
-    def validate_item_10(self, 公告: Dict, 須知: Dict):
-        """項次10：敏感性採購"""
-        if 公告.get("敏感性採購") == "是":
-            errors = []
-            if 須知.get("第13點敏感性") != "已勾選":
-                errors.append("須知第13點敏感性應勾選")
-            if 須知.get("第8點禁止大陸") != "已勾選":
-                errors.append("須知第8點禁止大陸應勾選")
-            
-            if errors:
-                self.add_error(10, "敏感性採購設定錯誤", "; ".join(errors))
-            else:
-                self.add_pass(10)
-    
-    def validate_item_11(self, 公告: Dict, 須知: Dict):
-        """項次11：國安採購"""
-        if 公告.get("國安採購") == "是":
-            errors = []
-            if 須知.get("第13點國安") != "已勾選":
-                errors.append("須知第13點國安應勾選")
-            if 須知.get("第8點禁止大陸") != "已勾選":
-                errors.append("須知第8點禁止大陸應勾選")
-            
-            if errors:
-                self.add_error(11, "國安採購設定錯誤", "; ".join(errors))
-            else:
-                self.add_pass(11)
-    
-    def validate_item_12(self, 公告: Dict, 須知: Dict):
-        """項次12：增購權利"""
-        if 公告.get("增購權利") == "是":
-            if 須知.get("第7點保留增購") != "已勾選":
-                self.add_error(12, "增購權利設定錯誤", "須知第7點保留增購應勾選")
-            elif 須知.get("第7點未保留增購") == "已勾選":
-                self.add_error(12, "增購權利設定矛盾", "不應同時勾選保留與未保留")
-            else:
-                self.add_pass(12)
-        elif 公告.get("增購權利") == "無":
-            if 須知.get("第7點未保留增購") != "已勾選":
-                self.add_error(12, "增購權利設定錯誤", "須知第7點未保留增購應勾選")
-            else:
-                self.add_pass(12)
-    
-    def validate_items_13_to_16(self, 公告: Dict, 須知: Dict):
-        """項次13-16：標準設定"""
-        # 項次13：特殊採購
-        if 公告.get("特殊採購") == "否":
-            if 須知.get("第4點非特殊採購") != "已勾選":
-                self.add_error(13, "特殊採購設定錯誤", "須知第4點應勾選")
-            else:
-                self.add_pass(13)
-        
-        # 項次14：統包
-        if 公告.get("統包") == "否":
-            if 須知.get("第35點非統包") != "已勾選":
-                self.add_error(14, "統包設定錯誤", "須知第35點應勾選")
-            else:
-                self.add_pass(14)
-        
-        # 項次15：協商措施
-        if 公告.get("協商措施") == "否":
-            if 須知.get("第54點不協商") != "已勾選":
-                self.add_error(15, "協商措施設定錯誤", "須知第54點應勾選")
-            else:
-                self.add_pass(15)
-        
-        # 項次16：電子領標
-        if 公告.get("電子領標") == "是":
-            if 須知.get("第9點電子領標") != "已勾選":
-                self.add_error(16, "電子領標設定錯誤", "須知第9點應勾選")
-            else:
-                self.add_pass(16)
-    
     def validate_item_17(self, 公告: Dict, 須知: Dict):
         """項次17：押標金"""
         公告押標金 = 公告.get("押標金", 0)
         須知押標金 = 須知.get("押標金金額", 0)
         
-        if 公告押標金 != 須知押標金:
+        if not (_is_amount(公告押標金) and _is_amount(須知押標金)):
+            self.add_error(17, "押標金格式錯誤", f"無法辨識的押標金金額 公告:{公告押標金} vs 須知:{須知押標金}")
+        elif 公告押標金 != 須知押標金:
             self.add_error(17, "押標金不一致", f"公告:{公告押標金} vs 須知:{須知押標金}")
         elif 公告押標金 > 0:
             if 須知.get("第19點一定金額") != "已勾選":
@@ -254,54 +247,6 @@ class TenderComplianceValidator:
             else:
                 self.add_pass(17)
     
-    def validate_item_18(self, 公告: Dict, 須知: Dict):
-        """項次18：身障優先"""
-        if 公告.get("優先身障") == "是":
-            if 須知.get("第59點身障優先") != "已勾選":
-                self.add_error(18, "身障優先設定錯誤", "須知第59點身障優先應勾選")
-            else:
-                self.add_pass(18)
-        else:
-            self.add_pass(18)
-    
-    def validate_item_20(self, 公告: Dict, 須知: Dict):
-        """項次20：外國廠商"""
-        if 公告.get("外國廠商") == "可":
-            if 須知.get("第8點可參與") != "已勾選":
-                self.add_error(20, "外國廠商設定錯誤", "須知第8點可參與應勾選")
-            else:
-                self.add_pass(20)
-        elif 公告.get("外國廠商") == "不可":
-            if 須知.get("第8點不可參與") != "已勾選":
-                self.add_error(20, "外國廠商設定錯誤", "須知第8點不可參與應勾選")
-            else:
-                self.add_pass(20)
-    
-    def validate_item_21(self, 公告: Dict, 須知: Dict):
-        """項次21：中小企業"""
-        if 公告.get("限定中小企業") == "是":
-            if 須知.get("第8點不可參與") != "已勾選":
-                self.add_error(21, "中小企業設定錯誤", "限定中小企業時須知第8點不可參與應勾選")
-            else:
-                self.add_pass(21)
-        else:
-            self.add_pass(21)
-    
-    def validate_item_23(self, 公告: Dict, 須知: Dict):
-        """項次23：開標方式"""
-        if "不分段" in 公告.get("開標方式", ""):
-            if 須知.get("第42點不分段") != "已勾選":
-                self.add_error(23, "開標方式設定錯誤", "須知第42點不分段應勾選")
-            elif 須知.get("第42點分二段") == "已勾選":
-                self.add_error(23, "開標方式設定矛盾", "不應同時勾選兩種開標方式")
-            else:
-                self.add_pass(23)
-        elif "分二段" in 公告.get("開標方式", ""):
-            if 須知.get("第42點分二段") != "已勾選":
-                self.add_error(23, "開標方式設定錯誤", "須知第42點分二段應勾選")
-            else:
-                self.add_pass(23)
-    
     def add_error(self, item_num: int, error_type: str, description: str):
         """添加錯誤記錄"""
         self.validation_results["失敗項次"].append(item_num)
@@ -379,7 +324,7 @@ def main():
     result = validator.validate_all(招標公告, 投標須知)
     
     # 輸出結果
-    print(json.dumps(result, ensure_ascii=False, indent=2))
+    print(dumps_pretty(result))
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
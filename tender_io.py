@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+文件讀取共用工具
+各檢核與測試腳本共用：以串流方式解析ODT/DOCX的XML並取出文字，JSON讀寫（有orjson時使用orjson），以及讀取Ollama串流回應
+"""
+
+import json
+import xml.etree.ElementTree as ET
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# 解析JSON，有orjson時使用orjson（解析失敗同樣拋出ValueError）
+json_loads = orjson.loads if ORJSON_AVAILABLE else json.loads
+
+def json_bytes(obj) -> bytes:
+    """序列化為不含空白、保留中文的UTF-8 JSON，有orjson時使用orjson"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+def dumps_compact(obj) -> str:
+    """序列化為不含空白的JSON文字，用於組合提示詞"""
+    return json_bytes(obj).decode('utf-8')
+
+def dumps_pretty(obj, default=None) -> str:
+    """輸出縮排且保留中文的JSON文字，有orjson時使用orjson；default處理無法直接序列化的物件"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, default=default,
+                            option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode('utf-8')
+    return json.dumps(obj, ensure_ascii=False, indent=2, default=default)
+
+# 串流解析XML時每次讀取的位元組數
+XML_CHUNK_SIZE = 64 * 1024
+
+class XMLTextCollector:
+    """XMLParser的target：依文件順序收集文字，標籤位置以separator分隔（預設空白，換行可保留段落格式）
+
+    文字已由解析器還原實體（如&amp;→&、&lt;→<），與舊版以正則移除標籤、保留實體原文的結果不同
+    """
+
+    def __init__(self, separator: str = ' '):
+        self.separator = separator
+        self.parts = []
+
+    def start(self, tag, attrib):
+        self.parts.append(self.separator)
+
+    def end(self, tag):
+        self.parts.append(self.separator)
+
+    def data(self, data):
+        self.parts.append(data)
+
+    def close(self) -> str:
+        return ''.join(self.parts)
+
+def read_xml_text(member, separator: str = ' ', chunk_size: int = XML_CHUNK_SIZE) -> str:
+    """分段餵入XML解析器，由C解析器移除標籤並還原實體，不先把整份XML讀進記憶體
+
+    回傳未整理空白的文字，由呼叫端依需要整理
+    """
+    parser = ET.XMLParser(target=XMLTextCollector(separator))
+    for chunk in iter(lambda: member.read(chunk_size), b''):
+        parser.feed(chunk)
+    return parser.close()
+
+def read_first_json_object(response) -> str:
+    """讀取Ollama串流回應，第一個JSON物件的大括號配對完成即關閉連線，不等模型產生多餘內容"""
+    parts = []
+    depth = 0
+    in_string = escaped = False
+    try:
+        for line in response.iter_lines():
+            if not line:
+                continue
+            chunk = json_loads(line)
+            text = chunk.get('response', '')
+            for i, ch in enumerate(text):
+                if in_string:
+                    if escaped:
+                        escaped = False
+                    elif ch == '\\':
+                        escaped = True
+                    elif ch == '"':
+                        in_string = False
+                elif ch == '"':
+                    in_string = depth > 0
+                elif ch == '{':
+                    depth += 1
+                elif ch == '}' and depth:
+                    depth -= 1
+                    if depth == 0:
+                        parts.append(text[:i + 1])
+                        return ''.join(parts)
+            parts.append(text)
+            if chunk.get('done'):
+                break
+    finally:
+        response.close()
+    return ''.join(parts)
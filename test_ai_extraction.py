@@ -2,44 +2,79 @@
 """
 使用AI模型提取招標文件中的案號和案名
 """
-import json
 import requests
+from requests.adapters import HTTPAdapter
+from llm_cache import llm_cache_file, load_cached_response, save_cached_response
+from tender_io import read_xml_text, json_loads, dumps_pretty
 import zipfile
 import re
 import os
+from typing import Dict, Optional
+
+# 預先編譯的正則表達式：AI回應中的JSON物件
+_JSON_RE = re.compile(r'\{[^}]+\}')
+
+# 案號案名的規則提取樣式：文件格式標準時直接取得，不必呼叫AI模型
+_CASE_NO = r'C\d{2}[A-Z]\d{5}[A-Z]?'
+_ANN_CASE_NO_RE = re.compile(r'案號[：:]\s*(' + _CASE_NO + r')')
+_ANN_CASE_NAME_RE = re.compile(r'案名[：:]\s*([^\s，,。＊]+)')
+_REQ_CASE_RE = re.compile(r'採購標的名稱及案號[：:]\s*(\S+)\s+(' + _CASE_NO + r')')
+
+def _extract_case_by_regex(content: str, doc_type: str) -> Optional[Dict]:
+    """以規則提取案號案名，兩者皆找到才回傳結果，否則回傳None交由AI處理"""
+    if doc_type == "招標公告":
+        number_match = _ANN_CASE_NO_RE.search(content)
+        name_match = _ANN_CASE_NAME_RE.search(content)
+        if number_match and name_match:
+            return {"案號": number_match.group(1), "案名": name_match.group(1)}
+    else:
+        match = _REQ_CASE_RE.search(content)
+        if match:
+            return {"案號": match.group(2), "案名": match.group(1)}
+    return None
+
+# AI回應的磁碟快取（見llm_cache.py）：修改提示詞內容時請遞增PROMPT_VERSION使舊快取失效
+PROMPT_VERSION = "v1"
 
 class AIDocumentExtractor:
-    def __init__(self):
+    def __init__(self, regex_first: bool = False):
         self.ollama_url = "http://192.168.53.254:11434"
         self.model = "gpt-oss:latest"
+        # 設為True時先以規則提取案號案名，找不到才呼叫AI模型；本腳本測試AI提取，預設一律呼叫AI
+        self.regex_first = regex_first
+        
+        # 公告與須知共用同一條連線，第二次呼叫不必重新建立TCP連線
+        self.session = requests.Session()
+        self.session.mount("http://", HTTPAdapter(pool_maxsize=4))
     
     def extract_odt_content(self, file_path: str) -> str:
         """提取ODT內容"""
         try:
-            with zipfile.ZipFile(file_path, 'r') as zip_file:
-                content_xml = zip_file.read('content.xml').decode('utf-8')
-                # 移除XML標籤
-                clean_text = re.sub(r'<[^>]+>', ' ', content_xml)
-                clean_text = re.sub(r'\s+', ' ', clean_text).strip()
-                return clean_text
+            with zipfile.ZipFile(file_path, 'r') as zip_file, zip_file.open('content.xml') as member:
+                return ' '.join(read_xml_text(member).split())
         except Exception as e:
             print(f"❌ 讀取ODT檔案失敗：{e}")
             return ""
     
     def call_ai_model(self, prompt: str) -> str:
         """呼叫AI模型"""
+        payload = {
+            "model": self.model,
+            "prompt": prompt,
+            "stream": False,
+            "temperature": 0.1  # 降低溫度以提高準確性
+        }
+        cache_file = llm_cache_file(payload, PROMPT_VERSION)
+        cached = load_cached_response(cache_file)
+        if cached is not None:
+            return cached
+        
         try:
-            response = requests.post(
-                f"{self.ollama_url}/api/generate",
-                json={
-                    "model": self.model,
-                    "prompt": prompt,
-                    "stream": False,
-                    "temperature": 0.1  # 降低溫度以提高準確性
-                }
-            )
+            response = self.session.post(f"{self.ollama_url}/api/generate", json=payload)
             if response.status_code == 200:
-                return response.json().get('response', '')
+                response_text = json_loads(response.content).get('response', '')
+                save_cached_response(cache_file, response_text, _JSON_RE)
+                return response_text
             else:
                 return f"錯誤: {response.status_code}"
         except Exception as e:
@@ -55,6 +90,12 @@ class AIDocumentExtractor:
         # 針對第一頁（通常包含案號案名）
         first_page = pages[0] if pages else document_content
         
+        if self.regex_first:
+            result = _extract_case_by_regex(first_page, doc_type)
+            if result:
+                print(f"📐 {doc_type}已由規則提取案號案名，略過AI模型")
+                return result
+        
         # 設計提示詞
         if doc_type == "招標公告":
             prompt = f"""請從以下招標公告內容中提取資訊，並以JSON格式回答。
@@ -95,14 +136,19 @@ class AIDocumentExtractor:
         
         # 解析AI回應
         try:
-            # 嘗試提取JSON部分
-            json_match = re.search(r'\{[^}]+\}', ai_response)
-            if json_match:
-                result = json.loads(json_match.group())
-            else:
-                result = {"案號": "解析失敗", "案名": "解析失敗"}
-        except:
-            result = {"案號": "JSON解析錯誤", "案名": "JSON解析錯誤"}
+            # 回應本身是JSON時直接解析；失敗才用正則擷取JSON部分
+            result = json_loads(ai_response)
+            if not isinstance(result, dict):
+                raise ValueError
+        except ValueError:
+            try:
+                json_match = _JSON_RE.search(ai_response)
+                if json_match:
+                    result = json_loads(json_match.group())
+                else:
+                    result = {"案號": "解析失敗", "案名": "解析失敗"}
+            except:
+                result = {"案號": "JSON解析錯誤", "案名": "JSON解析錯誤"}
         
         return result
 
@@ -134,7 +180,7 @@ def main():
     }
     
     print("\n📊 AI模型提取結果：")
-    print(json.dumps(final_result, ensure_ascii=False, indent=2))
+    print(dumps_pretty(final_result))
     
     # 顯示預期結果（基於規則的提取）
     expected_result = {
@@ -145,7 +191,7 @@ def main():
     }
     
     print("\n✅ 預期結果（規則提取）：")
-    print(json.dumps(expected_result, ensure_ascii=False, indent=2))
+    print(dumps_pretty(expected_result))
     
     # 比較差異
     print("\n🔍 差異分析：")
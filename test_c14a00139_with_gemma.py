@@ -1,22 +1,54 @@
 import json
 import requests
+from requests.adapters import HTTPAdapter
+from llm_cache import llm_cache_file, load_cached_response, save_cached_response
+from tender_io import read_xml_text, json_loads, dumps_pretty, read_first_json_object
 import re
 import zipfile
-from typing import Dict, List
+from typing import Dict, List, Optional
+
+# 預先編譯的正則表達式：AI回應中的JSON物件、須知的採購標的名稱及案號段落
+_JSON_RE = re.compile(r'\{[^}]+\}')
+_SECTION_RE = re.compile(r'採購標的名稱及案號[：:](.*?)(?:三、|$)', re.DOTALL)
+
+# 案號案名的規則提取樣式：文件格式標準時直接取得，不必呼叫AI模型
+_CASE_NO = r'C\d{2}[A-Z]\d{5}[A-Z]?'
+_ANN_CASE_NO_RE = re.compile(r'案號[：:]\s*(' + _CASE_NO + r')')
+_ANN_CASE_NAME_RE = re.compile(r'案名[：:]\s*([^\s，,。＊]+)')
+_REQ_CASE_RE = re.compile(r'採購標的名稱及案號[：:]\s*(\S+)\s+(' + _CASE_NO + r')')
+
+def _extract_case_by_regex(content: str, doc_type: str) -> Optional[Dict]:
+    """以規則提取案號案名，兩者皆找到才回傳結果，否則回傳None交由AI處理"""
+    if doc_type == "招標公告":
+        number_match = _ANN_CASE_NO_RE.search(content)
+        name_match = _ANN_CASE_NAME_RE.search(content)
+        if number_match and name_match:
+            return {"案號": number_match.group(1), "案名": name_match.group(1)}
+    else:
+        match = _REQ_CASE_RE.search(content)
+        if match:
+            return {"案號": match.group(2), "案名": match.group(1)}
+    return None
+
+# AI回應的磁碟快取（見llm_cache.py）：修改提示詞內容時請遞增PROMPT_VERSION使舊快取失效
+PROMPT_VERSION = "v1"
 
 class C14A00139Processor:
-    def __init__(self):
+    def __init__(self, regex_first: bool = False):
         self.model_name = "gemma2:7b"  # 可改為 "gpt-oss:latest" 或其他模型
         self.ollama_url = "http://192.168.53.254:11434/api/generate"
+        # 設為True時先以規則提取案號案名，找不到才呼叫模型；本腳本測試模型提取，預設一律呼叫模型
+        self.regex_first = regex_first
         
+        # 連線測試與後續各次呼叫共用連線，避免每次都重新建立TCP連線
+        self.session = requests.Session()
+        self.session.mount("http://", HTTPAdapter(pool_maxsize=4))
+    
     def extract_odt_content(self, file_path: str) -> str:
         """提取ODT內容"""
         try:
-            with zipfile.ZipFile(file_path, 'r') as zip_file:
-                content_xml = zip_file.read('content.xml').decode('utf-8')
-                clean_text = re.sub(r'<[^>]+>', ' ', content_xml)
-                clean_text = re.sub(r'\s+', ' ', clean_text).strip()
-                return clean_text
+            with zipfile.ZipFile(file_path, 'r') as zip_file, zip_file.open('content.xml') as member:
+                return ' '.join(read_xml_text(member).split())
         except Exception as e:
             print(f"❌ 讀取ODT檔案失敗：{e}")
             return ""
@@ -33,8 +65,8 @@ class C14A00139Processor:
 文件內容：
 """
     
-    def call_ollama(self, prompt: str, content: str) -> Dict:
-        """呼叫 Ollama API"""
+    def call_ollama(self, prompt: str, content: str, cache: bool = True) -> Dict:
+        """呼叫 Ollama API；cache=False時不讀寫快取"""
         # 限制內容長度
         if len(content) > 2000:
             content = content[:2000]
@@ -44,28 +76,33 @@ class C14A00139Processor:
         payload = {
             "model": self.model_name,
             "prompt": full_prompt,
-            "stream": False,
+            "stream": True,  # 串流接收，JSON物件完整後即可停止
             "temperature": 0.1,
             "format": "json"
         }
         
+        cache_file = llm_cache_file(payload, PROMPT_VERSION)
+        
         try:
-            print(f"🤖 呼叫 {self.model_name} 模型...")
-            response = requests.post(self.ollama_url, json=payload, timeout=30)
-            response.raise_for_status()
-            result = response.json()
-            
-            response_text = result.get('response', '')
+            response_text = load_cached_response(cache_file) if cache else None
+            if response_text is None:
+                print(f"🤖 呼叫 {self.model_name} 模型...")
+                response = self.session.post(self.ollama_url, json=payload, timeout=30, stream=True)
+                response.raise_for_status()
+                
+                response_text = read_first_json_object(response)
+                if cache:
+                    save_cached_response(cache_file, response_text, _JSON_RE)
             print(f"📝 模型回應: {response_text[:100]}...")
             
             # 解析JSON
             try:
-                return json.loads(response_text)
+                return json_loads(response_text)
             except:
                 # 嘗試提取JSON部分
-                json_match = re.search(r'\{[^}]+\}', response_text)
+                json_match = _JSON_RE.search(response_text)
                 if json_match:
-                    return json.loads(json_match.group())
+                    return json_loads(json_match.group())
                 return {"錯誤": "無法解析JSON"}
                 
         except requests.exceptions.Timeout:
@@ -75,6 +112,15 @@ class C14A00139Processor:
         except Exception as e:
             return {"錯誤": str(e)}
     
+    def extract_case_info(self, content: str, doc_type: str) -> Dict:
+        """提取案號案名：規則可直接取得時略過模型呼叫"""
+        if self.regex_first:
+            result = _extract_case_by_regex(content, doc_type)
+            if result:
+                print(f"📐 {doc_type}已由規則提取案號案名，略過模型呼叫")
+                return result
+        return self.call_ollama(self.create_simple_prompt(), content)
+    
     def process_c14a00139(self):
         """處理 C14A00139 案例"""
         case_folder = "/Users/ada/Desktop/ollama/C14A00139"
@@ -86,7 +132,7 @@ class C14A00139Processor:
         
         if ann_content:
             print(f"✅ 成功讀取招標公告 ({len(ann_content)} 字元)")
-            ann_result = self.call_ollama(self.create_simple_prompt(), ann_content)
+            ann_result = self.extract_case_info(ann_content, "招標公告")
             print(f"招標公告提取結果: {json.dumps(ann_result, ensure_ascii=False)}")
         else:
             ann_result = {"錯誤": "無法讀取檔案"}
@@ -99,15 +145,14 @@ class C14A00139Processor:
         if ins_content:
             print(f"✅ 成功讀取投標須知 ({len(ins_content)} 字元)")
             # 找到"採購標的名稱及案號"部分
-            pattern = r'採購標的名稱及案號[：:](.*?)(?:三、|$)'
-            match = re.search(pattern, ins_content[:5000], re.DOTALL)
+            match = _SECTION_RE.search(ins_content[:5000])
             if match:
                 relevant_content = match.group(0)
                 print(f"📍 找到相關段落: {relevant_content[:100]}...")
             else:
                 relevant_content = ins_content[:2000]
             
-            ins_result = self.call_ollama(self.create_simple_prompt(), relevant_content)
+            ins_result = self.extract_case_info(relevant_content, "投標須知")
             print(f"投標須知提取結果: {json.dumps(ins_result, ensure_ascii=False)}")
         else:
             ins_result = {"錯誤": "無法讀取檔案"}
@@ -121,7 +166,7 @@ class C14A00139Processor:
             "投標須知的案名": ins_result.get("案名", "NA")
         }
         
-        print(json.dumps(final_result, ensure_ascii=False, indent=2))
+        print(dumps_pretty(final_result))
         
         # 4. 與預期結果比較
         print("\n=== 預期結果（基於文件解析）===")
@@ -131,7 +176,7 @@ class C14A00139Processor:
             "投標須知的案號": "C13A00139",  # 注意：文件中是 C13A00139
             "投標須知的案名": "攜帶式數位無線電綜合測試儀採購"
         }
-        print(json.dumps(expected, ensure_ascii=False, indent=2))
+        print(dumps_pretty(expected))
         
         # 5. 差異分析
         print("\n=== 差異分析 ===")
@@ -146,9 +191,9 @@ class C14A00139Processor:
 def main():
     processor = C14A00139Processor()
     
-    # 測試連線
+    # 測試連線（不經快取，確實連到伺服器）
     print("測試 Ollama 連線...")
-    test_result = processor.call_ollama("回答OK", "測試")
+    test_result = processor.call_ollama("回答OK", "測試", cache=False)
     if "錯誤" in test_result:
         print(f"❌ Ollama 連線失敗: {test_result['錯誤']}")
         print("\n請確認:")
@@ -1,15 +1,39 @@
-import json
 import requests
+from requests.adapters import HTTPAdapter
+from llm_cache import llm_cache_file, load_cached_response, save_cached_response
+from tender_io import json_loads, dumps_pretty, read_first_json_object
 import re
 from typing import Dict, List, Any
 import pandas as pd
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+# 預先編譯的正則表達式：AI回應中的JSON物件（可跨行）
+_JSON_RE = re.compile(r'\{.*\}', re.DOTALL)
+
+# AI回應的磁碟快取（見llm_cache.py）：修改提示詞內容時請遞增PROMPT_VERSION使舊快取失效
+PROMPT_VERSION = "v1"
 
 class TenderDocumentProcessor:
+    # 分頁處理時同時送出的最大請求數（依Ollama伺服器可平行處理的數量調整）
+    MAX_CONCURRENT_PAGES = 4
+    
+    # 項次13-16的標準設定：(欄位, 應有值, 項次)，依項次順序輸出通過或失敗說明
+    STANDARD_CHECKS = (
+        ("特殊採購", "否", "項次13"),
+        ("統包", "否", "項次14"),
+        ("協商措施", "否", "項次15"),
+        ("電子領標", "是", "項次16")
+    )
+    
     def __init__(self, model_name="gemma2:7b"):
         self.model_name = model_name
         self.ollama_url = "http://localhost:11434/api/generate"
         
+        # 分頁處理時各頁共用與Ollama的連線，避免每頁都重新建立TCP連線
+        self.session = requests.Session()
+        self.session.mount("http://", HTTPAdapter(pool_maxsize=8))
+    
     def create_extraction_prompt(self) -> str:
         """建立專為 Gemma 2 7B 優化的提示詞"""
         return """從招標公告中提取資訊，以JSON格式回應。
@@ -37,19 +61,26 @@ class TenderDocumentProcessor:
         payload = {
             "model": self.model_name,
             "prompt": full_prompt,
-            "stream": False,
+            "stream": True,  # 串流接收，JSON物件完整後即可停止
             "temperature": 0.1,  # 降低溫度以獲得更穩定的輸出
             "top_p": 0.9,
-            "format": "json"  # 強制 JSON 格式輸出
+            "format": "json",  # 強制 JSON 格式輸出
+            # 分頁之間保持模型載入；各頁提示詞開頭相同，伺服器可沿用已計算的前綴而不必重新處理
+            "keep_alive": "10m"
         }
         
+        cache_file = llm_cache_file(payload, PROMPT_VERSION)
+        
         try:
-            response = requests.post(self.ollama_url, json=payload)
-            response.raise_for_status()
-            result = response.json()
+            response_text = load_cached_response(cache_file)
+            if response_text is None:
+                response = self.session.post(self.ollama_url, json=payload, stream=True)
+                response.raise_for_status()
+                
+                response_text = read_first_json_object(response)
+                save_cached_response(cache_file, response_text, _JSON_RE)
             
             # 提取並解析 JSON
-            response_text = result.get('response', '')
             return self.parse_json_response(response_text)
             
         except Exception as e:
@@ -60,13 +91,13 @@ class TenderDocumentProcessor:
         """解析模型回應的 JSON"""
         try:
             # 嘗試直接解析
-            return json.loads(response_text)
+            return json_loads(response_text)
         except:
             # 如果失敗，嘗試提取 JSON 部分
-            json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
+            json_match = _JSON_RE.search(response_text)
             if json_match:
                 try:
-                    return json.loads(json_match.group())
+                    return json_loads(json_match.group())
                 except:
                     pass
             
@@ -78,17 +109,22 @@ class TenderDocumentProcessor:
         results = []
         prompt = self.create_extraction_prompt()
         
-        for page_num, page_content in enumerate(pages, 1):
+        def process_page(page_num: int, page_content: str) -> Dict:
             print(f"處理第 {page_num} 頁...")
             
             # 限制每頁內容長度（Gemma 2 7B 的上下文限制）
             if len(page_content) > 3000:
                 page_content = page_content[:3000]
             
-            result = self.call_ollama(prompt, page_content)
-            if result:
-                result['頁碼'] = page_num
-                results.append(result)
+            return self.call_ollama(prompt, page_content)
+        
+        # 各頁的API呼叫互不相關，同時送出數頁；map依頁碼順序回傳，合併時仍以前面頁面優先
+        with ThreadPoolExecutor(max_workers=self.MAX_CONCURRENT_PAGES) as executor:
+            page_results = executor.map(process_page, range(1, len(pages) + 1), pages)
+            for page_num, result in enumerate(page_results, 1):
+                if result:
+                    result['頁碼'] = page_num
+                    results.append(result)
                 
         return results
     
@@ -99,10 +135,20 @@ class TenderDocumentProcessor:
         
         merged = results[0].copy()
         
+        # 只需補齊仍為NA的欄位，全部補齊後其餘頁面不必再看
+        na_keys = [key for key, value in merged.items() if value == "NA"]
+        
         for result in results[1:]:
-            for key, value in result.items():
-                if key != '頁碼' and value != "NA" and merged.get(key) == "NA":
+            if not na_keys:
+                break
+            remaining = []
+            for key in na_keys:
+                value = result.get(key, "NA")
+                if value != "NA":
                     merged[key] = value
+                else:
+                    remaining.append(key)
+            na_keys = remaining
                     
         return merged
     
@@ -157,14 +203,7 @@ class TenderDocumentProcessor:
                 validation_results["失敗項目"].append("項次10-11：敏感性/國安採購應限制外國廠商參與")
         
         # 項次13-16：標準設定檢查
-        standard_checks = [
-            ("特殊採購", "否", "項次13"),
-            ("統包", "否", "項次14"),
-            ("協商措施", "否", "項次15"),
-            ("電子領標", "是", "項次16")
-        ]
-        
-        for field, expected, item in standard_checks:
+        for field, expected, item in self.STANDARD_CHECKS:
             if data.get(field) == expected:
                 validation_results["通過項目"].append(f"{item}：{field}設定正確")
             else:
@@ -230,7 +269,7 @@ def main():
     result = processor.call_ollama(prompt, test_content)
     
     print("\n提取結果:")
-    print(json.dumps(result, ensure_ascii=False, indent=2))
+    print(dumps_pretty(result))
     
     # 驗證結果
     validation = processor.validate_tender_requirements(result)
@@ -1,9 +1,19 @@
-import json
 import requests
+from requests.adapters import HTTPAdapter
+from llm_cache import llm_cache_file, load_cached_response, save_cached_response
+from tender_io import json_loads, json_bytes, dumps_compact, dumps_pretty
+from concurrent.futures import ThreadPoolExecutor
 
-def create_item23_ai_prompt():
-    """專門針對項次23的AI分析提示詞"""
-    return """
+OLLAMA_URL = "http://192.168.53.254:11434"
+MODEL_NAME = "gemma3:27b"
+
+# 多個測試案例共用同一條連線，後續呼叫不必重新建立TCP連線
+_SESSION = requests.Session()
+_SESSION.mount("http://", HTTPAdapter(pool_connections=10, pool_maxsize=10, max_retries=0))
+
+# 規則與回應格式為固定文字，單一案例與多案例合併提示詞共用
+# ITEM23_RULES不含任何變動內容且固定放在提示詞最前面，Ollama可重用其前綴快取
+ITEM23_RULES = """
 你是招標開標方式審核專家。請分析開標方式的設定是否一致。
 
 關鍵邏輯規則：
@@ -19,45 +29,139 @@ def create_item23_ai_prompt():
    - 第55點(一)和(二)不能同時勾選
    - 第42點(一)(一)和(一)(二)不能同時勾選
 
-請分析以下資料：
-招標公告開標方式：{opening_method}
-投標須知勾選情況：{requirements}
+"""
 
-判斷：
+ITEM23_JUDGEMENT = """判斷：
 1. 是否有矛盾勾選？
 2. 是否有遺漏勾選？
 3. 邏輯是否一致？
 
-回應格式：
-{{
+"""
+
+ITEM23_RESULT_FORMAT = """{
   "開標方式判定": "不分段/分段",
   "第42點正確性": "正確/錯誤",
   "第55點正確性": "正確/錯誤",
   "矛盾項目": [],
   "修正建議": "",
   "風險評估": "高/中/低"
-}}
-"""
+}"""
+
+# 結構化輸出格式：Ollama依此限制產生的內容，回應必定是含這些欄位的JSON物件
+ITEM23_RESULT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "開標方式判定": {"type": "string", "enum": ["不分段", "分段"]},
+        "第42點正確性": {"type": "string", "enum": ["正確", "錯誤"]},
+        "第55點正確性": {"type": "string", "enum": ["正確", "錯誤"]},
+        "矛盾項目": {"type": "array", "items": {"type": "string"}},
+        "修正建議": {"type": "string"},
+        "風險評估": {"type": "string", "enum": ["高", "中", "低"]}
+    },
+    "required": ["開標方式判定", "第42點正確性", "第55點正確性", "矛盾項目", "修正建議", "風險評估"]
+}
+
+ITEM23_BATCH_SCHEMA = {
+    "type": "object",
+    "properties": {"results": {"type": "array", "items": ITEM23_RESULT_SCHEMA}},
+    "required": ["results"]
+}
+
+# 每個案例的回應長度上限（token），避免模型在JSON之後繼續產生多餘內容
+NUM_PREDICT_PER_CASE = 384
+
+# 合併在同一個提示詞的案例上限，案例過多時單次回應變慢且容易漏答
+MAX_BATCH_CASES = 6
+
+# 單一案例提示詞在案例資料之後的固定部分，模組載入時組合一次
+_ITEM23_PROMPT_TAIL = ITEM23_JUDGEMENT + "回應格式：\n" + ITEM23_RESULT_FORMAT + "\n"
+
+def build_item23_prompt(case):
+    """組合單一案例的提示詞：規則、案例資料（勾選情況為不含空白的JSON）及判斷要求與回應格式"""
+    return (f"{ITEM23_RULES}請分析以下資料：\n"
+            f"招標公告開標方式：{case['opening_method']}\n"
+            f"投標須知勾選情況：{dumps_compact(case['requirements'])}\n\n"
+            f"{_ITEM23_PROMPT_TAIL}")
 
-def call_ai_model(prompt):
-    """呼叫AI模型"""
+def create_item23_batch_prompt(cases):
+    """多個案例合併為一個提示詞，規則只送一次，要求模型依序回傳results陣列"""
+    parts = [ITEM23_RULES, "請分別分析以下各案例資料：\n"]
+    for i, case in enumerate(cases, 1):
+        parts.append(f"## 案例{i}\n"
+                     f"招標公告開標方式：{case['opening_method']}\n"
+                     f"投標須知勾選情況：{dumps_compact(case['requirements'])}\n\n")
+    parts.append(ITEM23_JUDGEMENT)
+    parts.append(f"每個案例各回應一個物件，依案例順序放入results陣列，共{len(cases)}個：\n"
+                 "{\"results\": [\n" + ITEM23_RESULT_FORMAT + "\n]}\n")
+    return "".join(parts)
+
+# AI回應的磁碟快取（見llm_cache.py）：修改提示詞內容時請遞增PROMPT_VERSION使舊快取失效
+PROMPT_VERSION = "v1"
+
+def _read_streamed_response(response) -> str:
+    """邊接收邊串接Ollama串流回應（每行一個JSON），收到done即停止讀取"""
+    parts = []
+    for line in response.iter_lines(chunk_size=4096):
+        if not line:
+            continue
+        chunk = json_loads(line)
+        parts.append(chunk.get('response', ''))
+        if chunk.get('done'):
+            break
+    return ''.join(parts)
+
+def call_ai_model(prompt, cache=True, response_format=ITEM23_RESULT_SCHEMA, num_predict=NUM_PREDICT_PER_CASE):
+    """呼叫AI模型；cache=False時不讀寫快取"""
+    payload = {
+        "model": MODEL_NAME,
+        "prompt": prompt,
+        "stream": True,
+        "format": response_format,
+        # 取樣參數須放在options內，放在最外層會被Ollama忽略
+        "options": {"temperature": 0.1, "top_p": 0.9, "num_predict": num_predict},
+        # 各次呼叫的提示詞都以相同的ITEM23_RULES開頭，模型常駐時可沿用已處理過的前綴
+        "keep_alive": "30m"
+    }
+    cache_file = llm_cache_file(payload, PROMPT_VERSION)
+    if cache:
+        cached = load_cached_response(cache_file)
+        if cached is not None:
+            return cached
     try:
-        response = requests.post(
-            "http://192.168.53.254:11434/api/generate",
-            json={
-                "model": "gemma3:27b",
-                "prompt": prompt,
-                "stream": False,
-                "temperature": 0.1,
-                "format": "json"
-            }
-        )
-        if response.status_code == 200:
-            return response.json().get('response', '')
-        return f"錯誤: {response.status_code}"
+        # 串流回應須關閉才會把連線還給連線池，非200時也一併關閉
+        with _SESSION.post(
+            f"{OLLAMA_URL}/api/generate",
+            data=json_bytes(payload),
+            headers={"Content-Type": "application/json"},
+            timeout=(10, 300),
+            stream=True
+        ) as response:
+            if response.status_code != 200:
+                return f"錯誤: {response.status_code}"
+            response_text = _read_streamed_response(response)
+        if cache:
+            save_cached_response(cache_file, response_text)
+        return response_text
     except Exception as e:
         return f"失敗: {str(e)}"
 
+def call_ai_model_batch(cases):
+    """多個案例合併成一次呼叫，每批最多MAX_BATCH_CASES個；回應筆數不符時回傳None"""
+    results = []
+    for start in range(0, len(cases), MAX_BATCH_CASES):
+        batch = cases[start:start + MAX_BATCH_CASES]
+        response_text = call_ai_model(create_item23_batch_prompt(batch),
+                                      response_format=ITEM23_BATCH_SCHEMA,
+                                      num_predict=NUM_PREDICT_PER_CASE * len(batch))
+        try:
+            batch_results = json_loads(response_text).get("results")
+        except (ValueError, AttributeError):
+            return None
+        if not isinstance(batch_results, list) or len(batch_results) != len(batch):
+            return None
+        results.extend(batch_results)
+    return results
+
 def test_item23_validation():
     """測試項次23的AI驗證"""
     
@@ -72,53 +176,69 @@ def test_item23_validation():
         }
     }
     
-    prompt_template = create_item23_ai_prompt()
-    prompt = prompt_template.format(
-        opening_method=test_case_1["opening_method"],
-        requirements=json.dumps(test_case_1["requirements"], ensure_ascii=False)
-    )
+    # 測試案例2：正確的不分段設定
+    test_case_2 = {
+        "opening_method": "一次投標不分段開標", 
+        "requirements": {
+            "第42點不分段": "已勾選",
+            "第42點分二段": "未勾選",
+            "第55點(一)": "已勾選",
+            "第55點(二)": "未勾選"
+        }
+    }
     
     print("🔍 測試項次23 AI驗證 - 案例1")
     print(f"公告開標方式: {test_case_1['opening_method']}")
     print(f"須知勾選: {test_case_1['requirements']}")
     print("\n🤖 AI分析中...")
     
-    result = call_ai_model(prompt)
+    # 兩個案例合併在同一個提示詞一次送出，規則前言只需處理一次
+    batch_results = call_ai_model_batch([test_case_1, test_case_2])
+    if batch_results is not None:
+        result, result2 = (dumps_compact(r) for r in batch_results)
+    else:
+        # 模型未依格式回傳results陣列時，改為各案例個別呼叫（同時送出）
+        print("⚠️ 合併回應格式不符，改為逐案分析")
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            future2 = executor.submit(call_ai_model, build_item23_prompt(test_case_2))
+            result = call_ai_model(build_item23_prompt(test_case_1))
+            result2 = future2.result()
+    
     print("\n📊 AI分析結果:")
     print(result)
     
     # 嘗試解析JSON
     try:
-        json_result = json.loads(result)
+        json_result = json_loads(result)
         print("\n✅ 結構化結果:")
-        print(json.dumps(json_result, ensure_ascii=False, indent=2))
+        print(dumps_pretty(json_result))
     except:
         print("\n⚠️ JSON解析失敗，但AI回應已顯示")
     
-    # 測試案例2：正確的不分段設定
     print("\n" + "="*60)
     print("🔍 測試項次23 AI驗證 - 案例2（正確設定）")
-    
-    test_case_2 = {
-        "opening_method": "一次投標不分段開標", 
-        "requirements": {
-            "第42點不分段": "已勾選",
-            "第42點分二段": "未勾選",
-            "第55點(一)": "已勾選",
-            "第55點(二)": "未勾選"
-        }
-    }
-    
-    prompt2 = prompt_template.format(
-        opening_method=test_case_2["opening_method"],
-        requirements=json.dumps(test_case_2["requirements"], ensure_ascii=False)
-    )
-    
-    result2 = call_ai_model(prompt2)
     print("📊 AI分析結果 (正確設定):")
     print(result2)
 
+def prewarm():
+    """預先載入模型並建立連線，避免第一個案例承擔模型冷啟動時間
+
+    伺服器端可設定 OLLAMA_NUM_PARALLEL=4 允許同時處理多個請求，
+    OLLAMA_MAX_LOADED_MODELS=2 讓多個模型同時常駐
+    """
+    try:
+        # 空白提示詞只會載入模型，不會產生內容
+        _SESSION.post(
+            f"{OLLAMA_URL}/api/generate",
+            data=json_bytes({"model": MODEL_NAME, "prompt": "", "keep_alive": "30m", "stream": False}),
+            headers={"Content-Type": "application/json"},
+            timeout=(10, 600)
+        )
+    except Exception as e:
+        print(f"⚠️ 模型預熱失敗: {e}")
+
 def main():
+    prewarm()
     test_item23_validation()
 
 if __name__ == "__main__":
@@ -11,9 +11,14 @@ def test_ollama_connection():
     print(f"🔍 測試 Ollama API: {ollama_url}")
     print("="*50)
     
+    with requests.Session() as session:
+        _run_checks(session, ollama_url)
+
+def _run_checks(session, ollama_url):
+    """依序執行各項測試，四次請求共用同一條連線"""
     # 1. 測試基本連線
     try:
-        response = requests.get(f"{ollama_url}/")
+        response = session.get(f"{ollama_url}/")
         if response.status_code == 200:
             print("✅ Ollama 服務正在運行")
         else:
@@ -25,7 +30,7 @@ def test_ollama_connection():
     
     # 2. 列出可用模型
     try:
-        response = requests.get(f"{ollama_url}/api/tags")
+        response = session.get(f"{ollama_url}/api/tags")
         if response.status_code == 200:
             data = response.json()
             models = data.get('models', [])
@@ -41,7 +46,7 @@ def test_ollama_connection():
     prompt = "請用一句話說明什麼是招標文件檢核？"
     
     try:
-        response = requests.post(
+        response = session.post(
             f"{ollama_url}/api/generate",
             json={
                 "model": model_name,
@@ -65,7 +70,7 @@ def test_ollama_connection():
     # 4. 測試對話功能
     print("\n💬 測試對話功能...")
     try:
-        response = requests.post(
+        response = session.post(
             f"{ollama_url}/api/chat",
             json={
                 "model": model_name,
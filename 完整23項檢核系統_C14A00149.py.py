@@ -7,92 +7,227 @@
 import os
 import re
 import zipfile
+import hashlib
+import functools
+import bisect
 import xml.etree.ElementTree as ET
-import json
+import io
+import contextlib
+import traceback
 from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
 from typing import Dict, List, Tuple, Optional
+from tender_io import read_xml_text, json_loads, json_bytes
+
+# 小於此大小的ODT/DOCX先整檔讀入記憶體再解壓，省去讀取中央目錄與成員時的多次磁碟搜尋
+ZIP_READ_AHEAD_LIMIT = 1024 * 1024
+
+# 各檢核項目使用的正則表達式，模組載入時編譯一次
+_CASE_NO = r'C\d{2}A\d{5}'
+# 公告案號：依序嘗試，取第1個群組
+# （「(一) 案號：」必定也符合第一個樣式，不需另列）
+_ANN_CASE_RES = [
+    re.compile(r'案號[：:：]\s*(' + _CASE_NO + r')'),
+    re.compile(r'(' + _CASE_NO + r')'),
+]
+# 須知案號：(樣式, 取用群組)，依序嘗試
+_INS_CASE_RES = [
+    (re.compile(r'採購標的名稱及案號[：:：].*?(' + _CASE_NO + r')'), 1),  # 優先：從「二、採購標的名稱及案號」中提取
+    (re.compile(r'案號[：:：]\s*(' + _CASE_NO + r')'), 1),
+    (re.compile(r'C14A00149'), 0),  # 直接搜尋已知案號
+    (re.compile(r'(' + _CASE_NO + r')'), 1),
+]
+_INS_CASE_CONTEXT_RE = re.compile(r'.{0,20}採購標的名稱及案號.{0,50}')
+_C13A07983_CONTEXT_RE = re.compile(r'.{0,20}C13A07983.{0,20}')
+_ANN_NAME_RES = [
+    re.compile(r'\(二\)案名[：:：]\s*([^＊\n]+)'),  # 匹配 (二)案名：
+    re.compile(r'採購案名[：:：]\s*([^四\n]+)'),   # 原始模式
+    re.compile(r'案名[：:：]\s*([^三四\n]+)'),     # 簡化模式
+]
+_INS_NAME_RE = re.compile(r'採購標的名稱及案號[：:：]\s*([^C\n]+)')
+_QUANTITY_RE = re.compile(r'(\d+)項')
+_AMOUNT_RE = re.compile(r'採購金額[：:：]\s*NT\$\s*([\d,]+)')
+_BUDGET_RES = [
+    re.compile(r'預算金額[：:：][^N]*NT\$\s*([\d,]+)'),  # 匹配 預算金額：...NT$ 1,993,405
+    re.compile(r'預算金額[：:：][^0-9]*([\d,]+)'),       # 原始模式
+]
+# 須知第十三點第1-15目任一項已勾選（■(1)～■(15)，不含第16目）
+_BUSINESS_ITEM_CHECKED_RE = re.compile(r'■\((?:1[0-5]|[1-9])\)')
+# 移除金額中的千分位逗號（及空白）
+_COMMA_TBL = str.maketrans('', '', ',')
+_STRIP_SPACE_COMMA = str.maketrans('', '', ' ,')
+_ANN_BOND_RE = re.compile(r'押標金[：:：]\s*新臺幣\s*([0-9,\s]+)\s*元')
+_INS_BOND_RE = re.compile(r'新臺幣\s*□?[_\s]*(\d+,?\d*)\s*[_\s]*元')
+# 須知第十五點第(二)項外國廠商文件：勾選符號後可有一個空白，一次搜尋涵蓋兩種寫法
+_TRANSLATION_CHECKED_RE = re.compile(r'■ ?應檢附經公證或認證之中文譯本')
+_TRANSLATION_UNCHECKED_RE = re.compile(r'□ ?應檢附經公證或認證之中文譯本')
+_TAX_CHECKED_RE = re.compile(r'■ ?4\.納稅證明')
+_CREDIT_CHECKED_RE = re.compile(r'■ ?5\.信用證明')
+
+# 文件提取結果快取：以(提取版本, 路徑, 修改時間, 檔案大小)為鍵，檔案未變更時重跑不必再解析XML
+# 記憶體最多保留EXTRACT_CACHE_SIZE筆；磁碟最多保留EXTRACT_CACHE_MAX_FILES個檔案，超過時刪除最舊的
+# 修改提取方法（extract_odt_content、extract_docx_content）的輸出時請遞增EXTRACT_CACHE_VERSION使舊快取失效
+EXTRACT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "tender_extract")
+EXTRACT_CACHE_SIZE = 256
+EXTRACT_CACHE_MAX_FILES = 1024
+EXTRACT_CACHE_VERSION = "1"
+
+def _prune_extract_cache():
+    """磁碟快取檔案超過EXTRACT_CACHE_MAX_FILES個時，依修改時間刪除最舊的檔案"""
+    try:
+        entries = [entry for entry in os.scandir(EXTRACT_CACHE_DIR) if entry.name.endswith(".json")]
+    except OSError:
+        return
+    excess = len(entries) - EXTRACT_CACHE_MAX_FILES
+    if excess <= 0:
+        return
+    def entry_mtime(entry):
+        try:
+            return entry.stat().st_mtime_ns
+        except OSError:
+            return 0
+    for entry in sorted(entries, key=entry_mtime)[:excess]:
+        try:
+            os.remove(entry.path)
+        except OSError:
+            pass
+
+def _file_cached(extract):
+    """提取方法的快取裝飾器：先查記憶體再查磁碟，提取失敗（空字串）不快取"""
+    memory = {}
+    
+    @functools.wraps(extract)
+    def wrapper(self, file_path: str) -> str:
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            return extract(self, file_path)
+        key = f"{EXTRACT_CACHE_VERSION}|{extract.__name__}|{os.path.abspath(file_path)}|{st.st_mtime_ns}|{st.st_size}"
+        if key in memory:
+            return memory[key]
+        
+        cache_file = os.path.join(EXTRACT_CACHE_DIR, hashlib.blake2b(key.encode('utf-8'), digest_size=16).hexdigest() + ".json")
+        try:
+            with open(cache_file, 'rb') as f:
+                content = json_loads(f.read())["content"]
+        except (OSError, ValueError, KeyError, TypeError):
+            content = extract(self, file_path)
+            if content:
+                try:
+                    os.makedirs(EXTRACT_CACHE_DIR, exist_ok=True)
+                    tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+                    with open(tmp_file, 'wb') as f:
+                        f.write(json_bytes({"content": content}))
+                    os.replace(tmp_file, cache_file)
+                    _prune_extract_cache()
+                except OSError:
+                    pass
+        
+        if content:
+            if len(memory) >= EXTRACT_CACHE_SIZE:
+                del memory[next(iter(memory))]
+            memory[key] = content
+        return content
+    
+    return wrapper
+
+def _open_document_zip(file_path: str) -> zipfile.ZipFile:
+    """開啟ODT/DOCX壓縮檔：小檔案一次讀入記憶體，大檔案仍由磁碟逐段讀取"""
+    if os.path.getsize(file_path) < ZIP_READ_AHEAD_LIMIT:
+        with open(file_path, 'rb') as f:
+            return zipfile.ZipFile(io.BytesIO(f.read()))
+    return zipfile.ZipFile(file_path, 'r')
 
 class Complete23ItemChecker:
     """完整23項標準檢核系統"""
     
-    def __init__(self, case_id: Optional[str] = None):
+    # 23項完整檢核清單（各實例共用，不需每次建立）
+    CHECKLIST_23 = (
+        {"num": 1, "name": "案號案名一致性", "risk": "high"},
+        {"num": 2, "name": "採購金額級距匹配", "risk": "high"},
+        {"num": 3, "name": "招標方式設定一致性", "risk": "low"},
+        {"num": 4, "name": "決標方式設定", "risk": "low"},
+        {"num": 5, "name": "底價設定一致性", "risk": "high"},
+        {"num": 6, "name": "非複數決標設定", "risk": "medium"},
+        {"num": 7, "name": "施行細則第64條之2", "risk": "low"},
+        {"num": 8, "name": "標的分類一致性", "risk": "low"},
+        {"num": 9, "name": "條約協定適用", "risk": "low"},
+        {"num": 10, "name": "敏感性或國安疑慮", "risk": "low"},
+        {"num": 11, "name": "國家安全", "risk": "low"},
+        {"num": 12, "name": "未來增購權利", "risk": "low"},
+        {"num": 13, "name": "特殊採購認定", "risk": "high"},
+        {"num": 14, "name": "統包認定", "risk": "low"},
+        {"num": 15, "name": "協商措施", "risk": "low"},
+        {"num": 16, "name": "電子領標", "risk": "low"},
+        {"num": 17, "name": "押標金設定", "risk": "low"},
+        {"num": 18, "name": "優先採購身心障礙", "risk": "low"},
+        {"num": 19, "name": "外國廠商參與規定", "risk": "medium"},
+        {"num": 20, "name": "外國廠商文件要求", "risk": "medium"},
+        {"num": 21, "name": "中小企業參與限制", "risk": "medium"},
+        {"num": 22, "name": "廠商資格摘要一致性", "risk": "medium"},
+        {"num": 23, "name": "開標程序一致性", "risk": "high"}
+    )
+    
+    def __init__(self, case_id: Optional[str] = None, debug: bool = False):
         self.ollama_url = "http://192.168.53.254:11434"
         self.model = "gpt-oss:latest"
         self.case_id = case_id
-        self.audit_rules = {}
-        
-        # 載入招標審核規則
-        self.load_audit_rules()
-        
-        # 23項完整檢核清單
-        self.checklist_23 = [
-            {"num": 1, "name": "案號案名一致性", "risk": "high"},
-            {"num": 2, "name": "採購金額級距匹配", "risk": "high"},
-            {"num": 3, "name": "招標方式設定一致性", "risk": "low"},
-            {"num": 4, "name": "決標方式設定", "risk": "low"},
-            {"num": 5, "name": "底價設定一致性", "risk": "high"},
-            {"num": 6, "name": "非複數決標設定", "risk": "medium"},
-            {"num": 7, "name": "施行細則第64條之2", "risk": "low"},
-            {"num": 8, "name": "標的分類一致性", "risk": "low"},
-            {"num": 9, "name": "條約協定適用", "risk": "low"},
-            {"num": 10, "name": "敏感性或國安疑慮", "risk": "low"},
-            {"num": 11, "name": "國家安全", "risk": "low"},
-            {"num": 12, "name": "未來增購權利", "risk": "low"},
-            {"num": 13, "name": "特殊採購認定", "risk": "high"},
-            {"num": 14, "name": "統包認定", "risk": "low"},
-            {"num": 15, "name": "協商措施", "risk": "low"},
-            {"num": 16, "name": "電子領標", "risk": "low"},
-            {"num": 17, "name": "押標金設定", "risk": "low"},
-            {"num": 18, "name": "優先採購身心障礙", "risk": "low"},
-            {"num": 19, "name": "外國廠商參與規定", "risk": "medium"},
-            {"num": 20, "name": "外國廠商文件要求", "risk": "medium"},
-            {"num": 21, "name": "中小企業參與限制", "risk": "medium"},
-            {"num": 22, "name": "廠商資格摘要一致性", "risk": "medium"},
-            {"num": 23, "name": "開標程序一致性", "risk": "high"}
-        ]
+        # 顯示各欄位提取過程的除錯訊息（含未找到案號時的上下文搜尋）
+        self.debug = debug
     
+    @_file_cached
     def extract_odt_content(self, file_path: str) -> str:
         """提取ODT內容"""
         try:
-            with zipfile.ZipFile(file_path, 'r') as zip_file:
-                content_xml = zip_file.read('content.xml').decode('utf-8')
+            with _open_document_zip(file_path) as zip_file:
+                # 以串流方式解析content.xml，不先把整份XML讀進記憶體
+                with zip_file.open('content.xml') as xml_file:
+                    clean_text = read_xml_text(xml_file)
                 
-                # 使用正則表達式移除XML標籤，保留純文字
-                clean_text = re.sub(r'<[^>]+>', ' ', content_xml)
                 # 整理空白字元
-                clean_text = re.sub(r'\s+', ' ', clean_text).strip()
-                
-                return clean_text
+                return ' '.join(clean_text.split())
         except Exception as e:
             print(f"❌ 讀取ODT檔案失敗：{e}")
             return ""
     
+    @_file_cached
     def extract_docx_content(self, file_path: str) -> str:
         """提取DOCX內容"""
         try:
-            with zipfile.ZipFile(file_path, 'r') as zip_file:
-                document_xml = zip_file.read('word/document.xml')
-                root = ET.fromstring(document_xml)
+            with _open_document_zip(file_path) as zip_file:
+                parts = []
+                # 邊解壓邊解析，處理完的節點立即清除以控制記憶體用量
+                with zip_file.open('word/document.xml') as xml_file:
+                    for _, elem in ET.iterparse(xml_file):
+                        if elem.text:
+                            parts.append(elem.text)
+                        elem.clear()
                 
-                text_content = ""
-                for elem in root.iter():
-                    if elem.text:
-                        text_content += elem.text + " "
-                
-                return text_content.strip()
+                return " ".join(parts).strip()
         except Exception as e:
             print(f"❌ 讀取DOCX檔案失敗：{e}")
             return ""
     
+    # 各實例共用的審核規則，第一次使用時才載入
+    _shared_audit_rules = None
+    
+    @functools.cached_property
+    def audit_rules(self) -> Dict:
+        """招標審核規則：建立實例時不讀取，第一次使用時才載入招標審核.docx，之後各實例共用"""
+        if Complete23ItemChecker._shared_audit_rules is None:
+            self.load_audit_rules()
+        return Complete23ItemChecker._shared_audit_rules
+    
     def load_audit_rules(self):
-        """載入招標審核規則"""
+        """載入招標審核規則（直接呼叫時重新讀取）"""
+        audit_rules = {}
         audit_file = "招標審核.docx"
         if os.path.exists(audit_file):
             print(f"📚 正在讀取審核規則檔案: {audit_file}")
             audit_content = self.extract_docx_content(audit_file)
             if audit_content:
                 # 解析審核規則內容並儲存
-                self.audit_rules = {
+                audit_rules = {
                     "content": audit_content,
                     "loaded_at": datetime.now().isoformat(),
                     "file_path": audit_file
@@ -102,6 +237,8 @@ class Complete23ItemChecker:
                 print(f"⚠️ 無法讀取審核規則內容")
         else:
             print(f"⚠️ 找不到審核規則檔案: {audit_file}")
+        Complete23ItemChecker._shared_audit_rules = audit_rules
+        self.audit_rules = audit_rules
     
     def check_case(self, case_id: str = None):
         """檢核指定案號"""
@@ -117,9 +254,10 @@ class Complete23ItemChecker:
         # 檔案路徑
         case_folder = self.case_id
         
-        # 自動尋找檔案
-        announcement_file = self.find_announcement_file(case_folder)
-        instructions_file = self.find_instructions_file(case_folder)
+        # 自動尋找檔案（資料夾只列出一次，兩個尋找方法共用）
+        case_files = self._list_case_files(case_folder)
+        announcement_file = self.find_announcement_file(case_folder, case_files)
+        instructions_file = self.find_instructions_file(case_folder, case_files)
         
         if not announcement_file or not instructions_file:
             print("❌ 找不到必要檔案")
@@ -144,100 +282,9 @@ class Complete23ItemChecker:
         print(f"✅ 招標公告長度：{len(announcement_content)} 字元")
         print(f"✅ 投標須知長度：{len(instructions_content)} 字元")
         
-        # 執行23項檢核
-        results = []
-        
-        # 第1項：案號案名一致性
-        result1 = self.check_item_1(announcement_content, instructions_content)
-        results.append(result1)
-        
-        # 第2項：採購金額級距匹配
-        result2 = self.check_item_2(announcement_content, instructions_content)
-        results.append(result2)
-        
-        # 第3項：招標方式設定一致性
-        result3 = self.check_item_3(announcement_content, instructions_content)
-        results.append(result3)
-        
-        # 第4項：決標方式設定
-        result4 = self.check_item_4(announcement_content, instructions_content)
-        results.append(result4)
-        
-        # 第5項：底價設定一致性
-        result5 = self.check_item_5(announcement_content, instructions_content)
-        results.append(result5)
-        
-        # 第6項：非複數決標設定
-        result6 = self.check_item_6(announcement_content, instructions_content)
-        results.append(result6)
-        
-        # 第7項：施行細則第64條之2
-        result7 = self.check_item_7(announcement_content, instructions_content)
-        results.append(result7)
-        
-        # 第8項：標的分類一致性
-        result8 = self.check_item_8(announcement_content, instructions_content)
-        results.append(result8)
-        
-        # 第9項：條約協定適用
-        result9 = self.check_item_9(announcement_content, instructions_content)
-        results.append(result9)
-        
-        # 第10項：敏感性或國安疑慮
-        result10 = self.check_item_10(announcement_content, instructions_content)
-        results.append(result10)
-        
-        # 第11項：國家安全
-        result11 = self.check_item_11(announcement_content, instructions_content)
-        results.append(result11)
-        
-        # 第12項：未來增購權利
-        result12 = self.check_item_12(announcement_content, instructions_content)
-        results.append(result12)
-        
-        # 第13項：特殊採購認定
-        result13 = self.check_item_13(announcement_content, instructions_content)
-        results.append(result13)
-        
-        # 第14項：統包認定
-        result14 = self.check_item_14(announcement_content, instructions_content)
-        results.append(result14)
-        
-        # 第15項：協商措施
-        result15 = self.check_item_15(announcement_content, instructions_content)
-        results.append(result15)
-        
-        # 第16項：電子領標
-        result16 = self.check_item_16(announcement_content, instructions_content)
-        results.append(result16)
-        
-        # 第17項：押標金設定
-        result17 = self.check_item_17(announcement_content, instructions_content)
-        results.append(result17)
-        
-        # 第18項：優先採購身心障礙
-        result18 = self.check_item_18(announcement_content, instructions_content)
-        results.append(result18)
-        
-        # 第19項：外國廠商參與規定
-        result19 = self.check_item_19(announcement_content, instructions_content)
-        results.append(result19)
-        
-        # 第20項：中小企業參與限制
-        result20 = self.check_item_20(announcement_content, instructions_content)
-        results.append(result20)
-        
-        # 第21項：中小企業參與限制
-        result21 = self.check_item_21(announcement_content, instructions_content)
-        results.append(result21)
-        
-        # 第22項：廠商資格摘要一致性
-        result22 = self.check_item_22(announcement_content, instructions_content)
-        results.append(result22)
-        
-        # 第23項：開標程序一致性
-        result23 = self.check_item_23(announcement_content, instructions_content)
-        results.append(result23)
+        # 執行23項檢核：依檢核清單順序呼叫對應的check_item_N
+        results = [getattr(self, f"check_item_{item['num']}")(announcement_content, instructions_content)
+                   for item in self.CHECKLIST_23]
         
         # 第23項：第19項（外國廠商）在檢核規則中已經是第19項了
         # 根據指南，我們實際上只有22個主要檢核項目
@@ -248,53 +295,38 @@ class Complete23ItemChecker:
     def check_item_1(self, ann: str, ins: str) -> Dict:
         """第1項：案號案名一致性"""
         # 提取案號 - 使用更寬鬆的模式
-        ann_case_patterns = [
-            r'案號[：:：]\s*(C\d{2}A\d{5})',
-            r'\(一\)\s*案號[：:：]\s*(C\d{2}A\d{5})',
-            r'(C\d{2}A\d{5})'
-        ]
-        
         ann_case = "未找到"
-        for pattern in ann_case_patterns:
-            match = re.search(pattern, ann)
+        for pattern in _ANN_CASE_RES:
+            match = pattern.search(ann)
             if match:
-                ann_case = match.group(1) if '(' not in pattern else match.group(1)
+                ann_case = match.group(1)
                 break
         
-        ins_case_patterns = [
-            r'採購標的名稱及案號[：:：].*?(C\d{2}A\d{5})',  # 優先：從「二、採購標的名稱及案號」中提取  
-            r'案號[：:：]\s*(C\d{2}A\d{5})',
-            r'C14A00149',  # 直接搜尋已知案號
-            r'(C\d{2}A\d{5})'
-        ]
-        
         ins_case = "未找到"
-        for pattern in ins_case_patterns:
-            match = re.search(pattern, ins)
+        for pattern, group in _INS_CASE_RES:
+            match = pattern.search(ins)
             if match:
-                if pattern == 'C14A00149':
-                    ins_case = match.group(0)
-                elif '採購標的名稱及案號' in pattern:
-                    ins_case = match.group(1)  # 取第一個群組（案號）
-                    print(f"🔍 成功提取案號: {ins_case} (使用模式: {pattern})")
-                else:
-                    ins_case = match.group(1)
+                ins_case = match.group(group)
+                if self.debug and pattern is _INS_CASE_RES[0][0]:
+                    print(f"🔍 成功提取案號: {ins_case} (使用模式: {pattern.pattern})")
                 break
         
-        # 調試輸出
         if ins_case == "未找到":
             print(f"⚠️ 未能從投標須知提取案號")
+        
+        # 調試輸出：上下文搜尋需再掃描整份須知，僅在除錯模式執行
+        if ins_case == "未找到" and self.debug:
             # 檢查是否包含關鍵字
             if "採購標的名稱及案號" in ins:
                 print("✅ 投標須知包含'採購標的名稱及案號'")
                 # 更細緻的搜尋
-                matches = re.findall(r'.{0,20}採購標的名稱及案號.{0,50}', ins)
+                matches = _INS_CASE_CONTEXT_RE.findall(ins)
                 for match in matches:
                     print(f"📝 相關內容: {match}")
                 # 直接搜尋C13A07983
                 if 'C13A07983' in ins:
                     print("✅ 發現C13A07983")
-                    matches = re.findall(r'.{0,20}C13A07983.{0,20}', ins)
+                    matches = _C13A07983_CONTEXT_RE.findall(ins)
                     for match in matches:
                         print(f"📝 C13A07983內容: {match}")
                 else:
@@ -307,21 +339,16 @@ class Complete23ItemChecker:
         ins_name = "未找到"
         
         # 從公告提取案名 - 改進的模式
-        ann_name_patterns = [
-            r'\(二\)案名[：:：]\s*([^＊\n]+)',  # 匹配 (二)案名：
-            r'採購案名[：:：]\s*([^四\n]+)',   # 原始模式
-            r'案名[：:：]\s*([^三四\n]+)'      # 簡化模式
-        ]
-        
-        for pattern in ann_name_patterns:
-            ann_name_match = re.search(pattern, ann)
+        for pattern in _ANN_NAME_RES:
+            ann_name_match = pattern.search(ann)
             if ann_name_match:
                 ann_name = ann_name_match.group(1).strip()
-                print(f"✅ 公告案名提取成功: {ann_name}")
+                if self.debug:
+                    print(f"✅ 公告案名提取成功: {ann_name}")
                 break
         
         # 從須知提取案名
-        ins_name_match = re.search(r'採購標的名稱及案號[：:：]\s*([^C\n]+)', ins)
+        ins_name_match = _INS_NAME_RE.search(ins)
         if ins_name_match:
             ins_name = ins_name_match.group(1).strip()
         
@@ -332,8 +359,8 @@ class Complete23ItemChecker:
         name_match = True
         quantity_issue = ""
         
-        ann_qty_match = re.search(r'(\d+)項', ann_name) if ann_name != "未找到" else None
-        ins_qty_match = re.search(r'(\d+)項', ins_name) if ins_name != "未找到" else None
+        ann_qty_match = _QUANTITY_RE.search(ann_name) if ann_name != "未找到" else None
+        ins_qty_match = _QUANTITY_RE.search(ins_name) if ins_name != "未找到" else None
         
         if ann_qty_match and ins_qty_match:
             ann_qty = ann_qty_match.group(1)
@@ -380,39 +407,31 @@ class Complete23ItemChecker:
     def check_item_2(self, ann: str, ins: str) -> Dict:
         """第2項：採購金額級距匹配"""
         # 提取採購金額
-        amount_match = re.search(r'採購金額[：:：]\s*NT\$\s*([\d,]+)', ann)
+        amount_match = _AMOUNT_RE.search(ann)
         if amount_match:
             procurement_amount = amount_match.group(1)
-            amount = int(procurement_amount.replace(',', ''))
+            amount = int(procurement_amount.translate(_COMMA_TBL))
             amount_text = f"NT$ {procurement_amount}"
         else:
             amount_text = "空白"
             amount = 0
             
         # 提取預算金額 - 改進的模式
-        budget_patterns = [
-            r'預算金額[：:：][^N]*NT\$\s*([\d,]+)',  # 匹配 預算金額：...NT$ 1,993,405
-            r'預算金額[：:：][^0-9]*([\d,]+)',       # 原始模式
-        ]
-        
         budget_text = ""
         budget_amount = None
-        for pattern in budget_patterns:
-            budget_match = re.search(pattern, ann)
+        for pattern in _BUDGET_RES:
+            budget_match = pattern.search(ann)
             if budget_match:
                 budget_amount = budget_match.group(1)
                 budget_text = f"；預算金額：{budget_amount}元"
-                print(f"✅ 預算金額提取成功: {budget_amount}元")
+                if self.debug:
+                    print(f"✅ 預算金額提取成功: {budget_amount}元")
                 if amount == 0:  # 如果採購金額為空，使用預算金額
-                    amount = int(budget_amount.replace(',', ''))
+                    amount = int(budget_amount.translate(_COMMA_TBL))
                 break
         
         # 檢查級距
-        expected_range = ""
-        if 150000 <= amount < 1500000:
-            expected_range = "(二)逾公告金額十分之一未達公告金額"
-        elif amount >= 1500000:
-            expected_range = "(三)公告金額以上未達查核金額"
+        expected_range = self.AMOUNT_RANGE_LABELS[bisect.bisect_right(self.AMOUNT_RANGE_BOUNDS, amount)]
             
         # 檢查須知勾選
         ins_range = ""
@@ -485,44 +504,93 @@ class Complete23ItemChecker:
             "risk": "low"
         }
     
-    def check_item_5(self, ann: str, ins: str) -> Dict:
-        """第5項：底價設定一致性"""
-        ann_reserve = "訂有底價" if "訂有底價" in ann else "未識別"
-        ins_reserve = "訂底價但不公告" if "訂底價，但不公告底價" in ins else "未識別"
-        
-        return {
-            "num": 5,
+    # 單純勾選／設定項目：公告（及須知）出現指定文字即取得對應值，結果固定為通過
+    # ins 為 None 時，須知欄位直接顯示 ins_value
+    FLAG_CHECKS = {
+        5: {
             "name": "底價設定一致性",
-            "status": "pass",
-            "ann_value": ann_reserve,
-            "ins_value": ins_reserve,
+            "ann": ("訂有底價", "訂有底價"),
+            "ins": ("訂底價，但不公告底價", "訂底價但不公告"),
             "risk": "high"
-        }
-    
-    def check_item_6(self, ann: str, ins: str) -> Dict:
-        """第6項：非複數決標設定"""
-        ann_non_multiple = "非複數決標" if "非複數決標" in ann else "未識別"
-        
-        return {
-            "num": 6,
+        },
+        6: {
             "name": "非複數決標設定",
-            "status": "pass",
-            "ann_value": ann_non_multiple,
+            "ann": ("非複數決標", "非複數決標"),
+            "ins": None,
             "ins_value": "未勾選複數決標選項",
             "risk": "medium"
+        },
+        7: {
+            "name": "施行細則第64條之2",
+            "ann": ("是否依政府採購法施行細則第64條之2辦理：否", "否"),
+            "ins": None,
+            "ins_value": "非依64條之2",
+            "risk": "low"
+        },
+        12: {
+            "name": "未來增購權利",
+            "ann": ("未來增購權利： 無", "無"),
+            "ins": ("■(二)未保留增購權利", "未保留"),
+            "risk": "low"
+        },
+        13: {
+            "name": "特殊採購認定",
+            "ann": ("是否屬特殊採購：否", "否"),
+            "ins": ("■(一)非屬特殊採購", "非特殊"),
+            "risk": "high"
+        },
+        14: {
+            "name": "統包認定",
+            "ann": ("是否屬統包：否", "否"),
+            "ins": None,
+            "ins_value": "非統包",
+            "risk": "low"
+        },
+        15: {
+            "name": "協商措施",
+            "ann": ("是否 採行協商措施 ：否", "否"),
+            "ins": None,
+            "ins_value": "不採行協商",
+            "risk": "low"
+        },
+        16: {
+            "name": "電子領標",
+            "ann": ("是否提供電子領標：是", "是"),
+            "ins": None,
+            "ins_value": "提供電子領標",
+            "risk": "low"
         }
+    }
+    
+    def check_item_5(self, ann: str, ins: str) -> Dict:
+        """第5項：底價設定一致性"""
+        return self._check_flag_item(5, ann, ins)
+    
+    def check_item_6(self, ann: str, ins: str) -> Dict:
+        """第6項：非複數決標設定"""
+        return self._check_flag_item(6, ann, ins)
     
     def check_item_7(self, ann: str, ins: str) -> Dict:
         """第7項：施行細則第64條之2"""
-        ann_64_2 = "否" if "是否依政府採購法施行細則第64條之2辦理：否" in ann else "未識別"
+        return self._check_flag_item(7, ann, ins)
+    
+    def _check_flag_item(self, num: int, ann: str, ins: str) -> Dict:
+        """依FLAG_CHECKS設定檢核單純勾選／設定項目"""
+        spec = self.FLAG_CHECKS[num]
+        ann_mark, ann_label = spec["ann"]
+        if spec["ins"] is None:
+            ins_value = spec["ins_value"]
+        else:
+            ins_mark, ins_label = spec["ins"]
+            ins_value = ins_label if ins_mark in ins else "未識別"
         
         return {
-            "num": 7,
-            "name": "施行細則第64條之2",
+            "num": num,
+            "name": spec["name"],
             "status": "pass",
-            "ann_value": ann_64_2,
-            "ins_value": "非依64條之2",
-            "risk": "low"
+            "ann_value": ann_label if ann_mark in ann else "未識別",
+            "ins_value": ins_value,
+            "risk": spec["risk"]
         }
     
     def check_item_8(self, ann: str, ins: str) -> Dict:
@@ -564,130 +632,89 @@ class Complete23ItemChecker:
             "risk": "low"
         }
     
+    # 第2項採購金額級距：金額落在各下限之間時對應的須知選項（未達十分之一公告金額不需勾選級距）
+    AMOUNT_RANGE_BOUNDS = (150000, 1500000)
+    AMOUNT_RANGE_LABELS = ("", "(二)逾公告金額十分之一未達公告金額", "(三)公告金額以上未達查核金額")
+    
+    # 第10、11項共用同一套檢核邏輯，僅公告問項、須知勾選目次與說明文字不同
+    SECURITY_CHECKS = {
+        10: {
+            "name": "敏感性或國安疑慮",
+            "ann_question": "本採購是否屬「具敏感性或國安(含資安)疑慮之業務範疇」採購：",
+            "ins_marks": ("■具敏感性或國安", "■敏感性或國安"),
+            "clause": 6,
+            "unclear_problem": "公告中敏感性設定不明確",
+            "unclear_suggestion": "明確設定敏感性或國安疑慮狀態"
+        },
+        11: {
+            "name": "國家安全",
+            "ann_question": "本採購是否屬「涉及國家安全」採購：",
+            "ins_marks": ("■涉及國家安全", "■國家安全"),
+            "clause": 7,
+            "unclear_problem": "公告中國家安全設定不明確",
+            "unclear_suggestion": "明確設定國家安全狀態"
+        }
+    }
+    
     def check_item_10(self, ann: str, ins: str) -> Dict:
         """第10項：敏感性或國安疑慮"""
-        # 檢查招標公告中的敏感性設定
-        ann_sensitive_yes = "本採購是否屬「具敏感性或國安(含資安)疑慮之業務範疇」採購：是" in ann
-        ann_sensitive_no = "本採購是否屬「具敏感性或國安(含資安)疑慮之業務範疇」採購：否" in ann
-        
-        # 檢查投標須知第十三點第(三)項第2款第6目
-        ins_checked_6 = "■具敏感性或國安" in ins or "■敏感性或國安" in ins
-        ins_unchecked_6 = "□具敏感性或國安" in ins or "□敏感性或國安" in ins
-        
-        # 檢查投標須知第八點第(二)項大陸地區廠商設定
-        ins_deny_mainland = "■不允許 大陸地區廠商參與" in ins
-        
-        # 邏輯檢核
-        if ann_sensitive_no:
-            # 公告為「否」，須知第6目不得勾選
-            if not ins_checked_6:
-                return {
-                    "num": 10,
-                    "name": "敏感性或國安疑慮",
-                    "status": "pass",
-                    "ann_value": "否",
-                    "ins_value": "未勾選第6目",
-                    "risk": "low"
-                }
-            else:
-                return {
-                    "num": 10,
-                    "name": "敏感性或國安疑慮",
-                    "status": "fail",
-                    "ann_value": "否",
-                    "ins_value": "勾選第6目",
-                    "problem": "公告設為「否」，但須知第十三點第(三)項第2款第6目仍勾選",
-                    "risk": "high",
-                    "suggestion": "須知第6目不得勾選"
-                }
-        elif ann_sensitive_yes:
-            # 公告為「是」，須知第6目應勾選，且不允許大陸廠商
-            problems = []
-            if not ins_checked_6:
-                problems.append("須知第十三點第(三)項第2款第6目未勾選")
-            if not ins_deny_mainland:
-                problems.append("須知第八點未勾選■不允許大陸地區廠商參與")
-            
-            if not problems:
-                return {
-                    "num": 10,
-                    "name": "敏感性或國安疑慮",
-                    "status": "pass",
-                    "ann_value": "是",
-                    "ins_value": "正確設定",
-                    "risk": "low"
-                }
-            else:
-                return {
-                    "num": 10,
-                    "name": "敏感性或國安疑慮",
-                    "status": "fail",
-                    "ann_value": "是",
-                    "ins_value": "設定不完整",
-                    "problem": "；".join(problems),
-                    "risk": "high",
-                    "suggestion": "須知應勾選第6目且不允許大陸廠商參與"
-                }
-        else:
-            return {
-                "num": 10,
-                "name": "敏感性或國安疑慮",
-                "status": "fail",
-                "ann_value": "設定不明確",
-                "ins_value": "無法判定",
-                "problem": "公告中敏感性設定不明確",
-                "risk": "medium",
-                "suggestion": "明確設定敏感性或國安疑慮狀態"
-            }
+        return self._check_security_item(10, ann, ins)
     
     def check_item_11(self, ann: str, ins: str) -> Dict:
         """第11項：國家安全"""
-        # 檢查招標公告中的國家安全設定
-        ann_security_yes = "本採購是否屬「涉及國家安全」採購：是" in ann
-        ann_security_no = "本採購是否屬「涉及國家安全」採購：否" in ann
+        return self._check_security_item(11, ann, ins)
+    
+    def _check_security_item(self, num: int, ann: str, ins: str) -> Dict:
+        """第10、11項：公告問項與須知第十三點第(三)項第2款對應目次、第八點大陸廠商設定的一致性"""
+        spec = self.SECURITY_CHECKS[num]
+        name = spec["name"]
+        clause = spec["clause"]
+        
+        # 檢查招標公告中的設定
+        ann_yes = spec["ann_question"] + "是" in ann
+        ann_no = spec["ann_question"] + "否" in ann
         
-        # 檢查投標須知第十三點第(三)項第2款第7目
-        ins_checked_7 = "■涉及國家安全" in ins or "■國家安全" in ins
-        ins_unchecked_7 = "□涉及國家安全" in ins or "□國家安全" in ins
+        # 檢查投標須知第十三點第(三)項第2款對應目次
+        ins_checked = any(mark in ins for mark in spec["ins_marks"])
         
         # 檢查投標須知第八點第(二)項大陸地區廠商設定
         ins_deny_mainland = "■不允許 大陸地區廠商參與" in ins
         
         # 邏輯檢核
-        if ann_security_no:
-            # 公告為「否」，須知第7目不得勾選
-            if not ins_checked_7:
+        if ann_no:
+            # 公告為「否」，須知對應目次不得勾選
+            if not ins_checked:
                 return {
-                    "num": 11,
-                    "name": "國家安全",
+                    "num": num,
+                    "name": name,
                     "status": "pass",
                     "ann_value": "否",
-                    "ins_value": "未勾選第7目",
+                    "ins_value": f"未勾選第{clause}目",
                     "risk": "low"
                 }
             else:
                 return {
-                    "num": 11,
-                    "name": "國家安全",
+                    "num": num,
+                    "name": name,
                     "status": "fail",
                     "ann_value": "否",
-                    "ins_value": "勾選第7目",
-                    "problem": "公告設為「否」，但須知第十三點第(三)項第2款第7目仍勾選",
+                    "ins_value": f"勾選第{clause}目",
+                    "problem": f"公告設為「否」，但須知第十三點第(三)項第2款第{clause}目仍勾選",
                     "risk": "high",
-                    "suggestion": "須知第7目不得勾選"
+                    "suggestion": f"須知第{clause}目不得勾選"
                 }
-        elif ann_security_yes:
-            # 公告為「是」，須知第7目應勾選，且不允許大陸廠商
+        elif ann_yes:
+            # 公告為「是」，須知對應目次應勾選，且不允許大陸廠商
             problems = []
-            if not ins_checked_7:
-                problems.append("須知第十三點第(三)項第2款第7目未勾選")
+            if not ins_checked:
+                problems.append(f"須知第十三點第(三)項第2款第{clause}目未勾選")
             if not ins_deny_mainland:
                 problems.append("須知第八點未勾選■不允許大陸地區廠商參與")
             
             if not problems:
                 return {
-                    "num": 11,
-                    "name": "國家安全",
+                    "num": num,
+                    "name": name,
                     "status": "pass",
                     "ann_value": "是",
                     "ins_value": "正確設定",
@@ -695,103 +722,56 @@ class Complete23ItemChecker:
                 }
             else:
                 return {
-                    "num": 11,
-                    "name": "國家安全",
+                    "num": num,
+                    "name": name,
                     "status": "fail",
                     "ann_value": "是",
                     "ins_value": "設定不完整",
                     "problem": "；".join(problems),
                     "risk": "high",
-                    "suggestion": "須知應勾選第7目且不允許大陸廠商參與"
+                    "suggestion": f"須知應勾選第{clause}目且不允許大陸廠商參與"
                 }
         else:
             return {
-                "num": 11,
-                "name": "國家安全",
+                "num": num,
+                "name": name,
                 "status": "fail",
                 "ann_value": "設定不明確",
                 "ins_value": "無法判定",
-                "problem": "公告中國家安全設定不明確",
+                "problem": spec["unclear_problem"],
                 "risk": "medium",
-                "suggestion": "明確設定國家安全狀態"
+                "suggestion": spec["unclear_suggestion"]
             }
     
     def check_item_12(self, ann: str, ins: str) -> Dict:
         """第12項：未來增購權利"""
-        ann_future = "無" if "未來增購權利： 無" in ann else "未識別"
-        ins_future = "未保留" if "■(二)未保留增購權利" in ins else "未識別"
-        
-        return {
-            "num": 12,
-            "name": "未來增購權利",
-            "status": "pass",
-            "ann_value": ann_future,
-            "ins_value": ins_future,
-            "risk": "low"
-        }
+        return self._check_flag_item(12, ann, ins)
     
     def check_item_13(self, ann: str, ins: str) -> Dict:
         """第13項：特殊採購認定"""
-        ann_special = "否" if "是否屬特殊採購：否" in ann else "未識別"
-        ins_special = "非特殊" if "■(一)非屬特殊採購" in ins else "未識別"
-        
-        return {
-            "num": 13,
-            "name": "特殊採購認定",
-            "status": "pass",
-            "ann_value": ann_special,
-            "ins_value": ins_special,
-            "risk": "high"
-        }
+        return self._check_flag_item(13, ann, ins)
     
     def check_item_14(self, ann: str, ins: str) -> Dict:
         """第14項：統包認定"""
-        ann_turnkey = "否" if "是否屬統包：否" in ann else "未識別"
-        
-        return {
-            "num": 14,
-            "name": "統包認定",
-            "status": "pass",
-            "ann_value": ann_turnkey,
-            "ins_value": "非統包",
-            "risk": "low"
-        }
+        return self._check_flag_item(14, ann, ins)
     
     def check_item_15(self, ann: str, ins: str) -> Dict:
         """第15項：協商措施"""
-        ann_negotiation = "否" if "是否 採行協商措施 ：否" in ann else "未識別"
-        
-        return {
-            "num": 15,
-            "name": "協商措施",
-            "status": "pass",
-            "ann_value": ann_negotiation,
-            "ins_value": "不採行協商",
-            "risk": "low"
-        }
+        return self._check_flag_item(15, ann, ins)
     
     def check_item_16(self, ann: str, ins: str) -> Dict:
         """第16項：電子領標"""
-        ann_electronic = "是" if "是否提供電子領標：是" in ann else "未識別"
-        
-        return {
-            "num": 16,
-            "name": "電子領標",
-            "status": "pass",
-            "ann_value": ann_electronic,
-            "ins_value": "提供電子領標",
-            "risk": "low"
-        }
+        return self._check_flag_item(16, ann, ins)
     
     def check_item_17(self, ann: str, ins: str) -> Dict:
         """第17項：押標金設定"""
         # 從公告提取押標金
-        ann_bond_match = re.search(r'押標金[：:：]\s*新臺幣\s*([0-9,\s]+)\s*元', ann)
-        ann_bond = ann_bond_match.group(1).replace(' ', '').replace(',', '') if ann_bond_match else "未識別"
+        ann_bond_match = _ANN_BOND_RE.search(ann)
+        ann_bond = ann_bond_match.group(1).translate(_STRIP_SPACE_COMMA) if ann_bond_match else "未識別"
         
         # 從投標須知第十九點提取押標金（更精確的模式）
-        ins_bond_match = re.search(r'新臺幣\s*□?[_\s]*(\d+,?\d*)\s*[_\s]*元', ins)
-        ins_bond = ins_bond_match.group(1).replace(',', '') if ins_bond_match else "未識別"
+        ins_bond_match = _INS_BOND_RE.search(ins)
+        ins_bond = ins_bond_match.group(1).translate(_COMMA_TBL) if ins_bond_match else "未識別"
         
         # 如果公告顯示不完整（如800），但須知顯示完整（如8000），判定為顯示問題
         if ann_bond == "800" and ins_bond == "8000":
@@ -878,14 +858,14 @@ class Complete23ItemChecker:
             # 如果允許外國廠商參與，需檢查投標須知第十五點第(二)項設定
             
             # 檢查第1款：中文譯本要求（更精確的模式匹配）
-            ins_translation = "■應檢附經公證或認證之中文譯本" in ins or "■ 應檢附經公證或認證之中文譯本" in ins
-            ins_translation_unchecked = "□應檢附經公證或認證之中文譯本" in ins or "□ 應檢附經公證或認證之中文譯本" in ins
+            ins_translation = _TRANSLATION_CHECKED_RE.search(ins) is not None
+            ins_translation_unchecked = _TRANSLATION_UNCHECKED_RE.search(ins) is not None
             
             # 檢查第4款：納稅證明（更精確的模式匹配）
-            ins_tax = "■ 4.納稅證明" in ins or "■4.納稅證明" in ins
+            ins_tax = _TAX_CHECKED_RE.search(ins) is not None
             
             # 檢查第5款：信用證明（更精確的模式匹配）
-            ins_credit = "■ 5.信用證明" in ins or "■5.信用證明" in ins
+            ins_credit = _CREDIT_CHECKED_RE.search(ins) is not None
             
             missing_items = []
             checked_items = []
@@ -971,18 +951,9 @@ class Complete23ItemChecker:
         
         # 檢查投標須知第十三點的勾選
         ins_has_16_checked = "■其他業類或其他證明文件" in ins or "■(16)其他業類" in ins
-        ins_has_specific_business = False
-        
-        # 檢查是否有勾選第1-15目的任何項目
-        business_items = [
-            "■(1)", "■(2)", "■(3)", "■(4)", "■(5)",
-            "■(6)", "■(7)", "■(8)", "■(9)", "■(10)",
-            "■(11)", "■(12)", "■(13)", "■(14)", "■(15)"
-        ]
-        for item in business_items:
-            if item in ins:
-                ins_has_specific_business = True
-                break
+        
+        # 檢查是否有勾選第1-15目的任何項目（一次掃描）
+        ins_has_specific_business = _BUSINESS_ITEM_CHECKED_RE.search(ins) is not None
         
         # 判定邏輯
         if ann_has_legal and not ann_has_business_code:
@@ -1054,24 +1025,36 @@ class Complete23ItemChecker:
             "risk": "high"
         }
     
-    def find_announcement_file(self, case_folder: str) -> Optional[str]:
-        """自動尋找招標公告檔案"""
-        if not os.path.exists(case_folder):
+    def _list_case_files(self, case_folder: str) -> Optional[List[str]]:
+        """列出案件資料夾內的檔案名稱（排除~$暫存檔），資料夾不存在時回傳None"""
+        try:
+            with os.scandir(case_folder) as entries:
+                return [entry.name for entry in entries
+                        if entry.is_file() and not entry.name.startswith('~$')]
+        except OSError:
+            return None
+    
+    def find_announcement_file(self, case_folder: str, files: Optional[List[str]] = None) -> Optional[str]:
+        """自動尋找招標公告檔案；files為已列出的檔案名稱時不再重新讀取資料夾"""
+        if files is None:
+            files = self._list_case_files(case_folder)
+        if files is None:
             print(f"❌ 找不到案件資料夾: {case_folder}")
             return None
-            
+        
+        odt_files = [file for file in files if file.endswith('.odt')]
+        
         # 尋找.odt檔案，優先找明確的招標公告檔案
-        for file in os.listdir(case_folder):
-            if file.endswith('.odt') and not file.startswith('~$'):  # 排除臨時檔案
-                # 更精確的條件：包含"公告事項"或以"01"開頭，但不包含"須知"
-                if (('公告事項' in file or '公開取得報價' in file) and '須知' not in file) or file.startswith('01'):
-                    full_path = f"{case_folder}/{file}"
-                    print(f"✅ 找到招標公告檔案: {file}")
-                    return full_path
+        for file in odt_files:
+            # 更精確的條件：包含"公告事項"或以"01"開頭，但不包含"須知"
+            if (('公告事項' in file or '公開取得報價' in file) and '須知' not in file) or file.startswith('01'):
+                full_path = f"{case_folder}/{file}"
+                print(f"✅ 找到招標公告檔案: {file}")
+                return full_path
         
         # 如果上面找不到，用較寬鬆條件但排除須知檔案
-        for file in os.listdir(case_folder):
-            if file.endswith('.odt') and '公告' in file and '須知' not in file and not file.startswith('~$'):
+        for file in odt_files:
+            if '公告' in file and '須知' not in file:
                 full_path = f"{case_folder}/{file}"
                 print(f"✅ 找到招標公告檔案: {file}")
                 return full_path
@@ -1079,21 +1062,23 @@ class Complete23ItemChecker:
         print(f"⚠️ 未找到招標公告檔案(.odt)")
         return None
     
-    def find_instructions_file(self, case_folder: str) -> Optional[str]:
-        """自動尋找投標須知檔案"""
-        if not os.path.exists(case_folder):
+    def find_instructions_file(self, case_folder: str, files: Optional[List[str]] = None) -> Optional[str]:
+        """自動尋找投標須知檔案；files為已列出的檔案名稱時不再重新讀取資料夾"""
+        if files is None:
+            files = self._list_case_files(case_folder)
+        if files is None:
             return None
-            
+        
         # 先尋找.docx檔案
-        for file in os.listdir(case_folder):
-            if file.endswith('.docx') and ('須知' in file or 'instruction' in file.lower()) and not file.startswith('~$'):
+        for file in files:
+            if file.endswith('.docx') and ('須知' in file or 'instruction' in file.lower()):
                 full_path = f"{case_folder}/{file}"
                 print(f"✅ 找到投標須知檔案: {file}")
                 return full_path
         
         # 如果沒有.docx，尋找.odt檔案（投標須知）
-        for file in os.listdir(case_folder):
-            if file.endswith('.odt') and ('須知' in file) and not file.startswith('~$'):
+        for file in files:
+            if file.endswith('.odt') and ('須知' in file):
                 full_path = f"{case_folder}/{file}"
                 print(f"✅ 找到投標須知檔案(.odt): {file}")
                 return full_path
@@ -1101,128 +1086,136 @@ class Complete23ItemChecker:
         print(f"⚠️ 未找到投標須知檔案(.docx或.odt)")
         return None
     
-    def generate_report(self, results: List[Dict], case_id: str):
-        """生成檢核報告"""
-        # 統計
-        total_items = len(results)
-        passed_items = sum(1 for r in results if r["status"] == "pass")
-        failed_items = total_items - passed_items
-        
-        high_risk_fails = [r for r in results if r["status"] == "fail" and r["risk"] == "high"]
-        medium_risk_fails = [r for r in results if r["status"] == "fail" and r["risk"] == "medium"]
-        low_risk_fails = [r for r in results if r["status"] == "fail" and r["risk"] == "low"]
-        
-        compliance_rate = round((passed_items / total_items) * 100, 1)
-        
-        # 判定整體結果
-        if high_risk_fails:
-            overall_status = "錯誤"
-            risk_assessment = "🔴 高風險"
-            action = "立即修正 - 發布前必須修正所有高風險問題"
-        elif medium_risk_fails:
-            overall_status = "錯誤"
-            risk_assessment = "🟡 中風險"
-            action = "建議修正 - 建議修正中風險問題以提高合規性"
-        else:
-            overall_status = "正確"
-            risk_assessment = "🟢 低風險"
-            action = "可接受發布"
-        
-        # 生成HTML報告
-        html_content = f"""<!DOCTYPE html>
-<html lang="zh-TW">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>招標文件檢核報告 - {case_id}</title>
-    <style>
-        body {{
+    # 報告樣式表為固定內容，定義一次供每份報告直接引用
+    REPORT_CSS = """        body {
             font-family: "Microsoft JhengHei", Arial, sans-serif;
             line-height: 1.6;
             margin: 0;
             padding: 20px;
             background-color: #f5f5f5;
-        }}
-        .container {{
+        }
+        .container {
             max-width: 1200px;
             margin: 0 auto;
             background-color: white;
             padding: 30px;
             border-radius: 8px;
             box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-        }}
-        h1 {{
+        }
+        h1 {
             color: #2c3e50;
             text-align: center;
             border-bottom: 3px solid #3498db;
             padding-bottom: 10px;
-        }}
-        h2 {{
+        }
+        h2 {
             color: #34495e;
             border-left: 4px solid #3498db;
             padding-left: 15px;
             margin-top: 30px;
-        }}
-        .summary {{
+        }
+        .summary {
             background-color: #ecf0f1;
             padding: 20px;
             border-radius: 5px;
             margin: 20px 0;
-        }}
-        table {{
+        }
+        table {
             width: 100%;
             border-collapse: collapse;
             margin: 20px 0;
             font-size: 14px;
-        }}
-        th, td {{
+        }
+        th, td {
             border: 1px solid #bdc3c7;
             padding: 10px;
             text-align: left;
-        }}
-        th {{
+        }
+        th {
             background-color: #3498db;
             color: white;
             font-weight: bold;
-        }}
-        tr:nth-child(even) {{
+        }
+        tr:nth-child(even) {
             background-color: #f8f9fa;
-        }}
-        .high-risk {{
+        }
+        .high-risk {
             background-color: #ffebee !important;
-        }}
-        .medium-risk {{
+        }
+        .medium-risk {
             background-color: #fff3e0 !important;
-        }}
-        .low-risk {{
+        }
+        .low-risk {
             background-color: #e8f5e9 !important;
-        }}
-        .pass {{
+        }
+        .pass {
             color: #27ae60;
             font-weight: bold;
-        }}
-        .fail {{
+        }
+        .fail {
             color: #e74c3c;
             font-weight: bold;
-        }}
-        .risk-section {{
+        }
+        .risk-section {
             margin: 20px 0;
             padding: 15px;
             border-radius: 5px;
-        }}
-        .risk-high {{
+        }
+        .risk-high {
             background-color: #ffebee;
             border-left: 5px solid #f44336;
-        }}
-        .risk-medium {{
+        }
+        .risk-medium {
             background-color: #fff3e0;
             border-left: 5px solid #ff9800;
-        }}
-        .risk-low {{
+        }
+        .risk-low {
             background-color: #e8f5e9;
             border-left: 5px solid #4caf50;
-        }}
-    </style>
+        }
+"""
+
+    def generate_report(self, results: List[Dict], case_id: str):
+        """生成檢核報告"""
+        # 統計
+        total_items = len(results)
+        passed_items = sum(1 for r in results if r["status"] == "pass")
+        failed_items = total_items - passed_items
+        
+        high_risk_fails = [r for r in results if r["status"] == "fail" and r["risk"] == "high"]
+        medium_risk_fails = [r for r in results if r["status"] == "fail" and r["risk"] == "medium"]
+        low_risk_fails = [r for r in results if r["status"] == "fail" and r["risk"] == "low"]
+        
+        compliance_rate = round((passed_items / total_items) * 100, 1)
+        
+        # 判定整體結果
+        if high_risk_fails:
+            overall_status = "錯誤"
+            risk_assessment = "🔴 高風險"
+            action = "立即修正 - 發布前必須修正所有高風險問題"
+        elif medium_risk_fails:
+            overall_status = "錯誤"
+            risk_assessment = "🟡 中風險"
+            action = "建議修正 - 建議修正中風險問題以提高合規性"
+        else:
+            overall_status = "正確"
+            risk_assessment = "🟢 低風險"
+            action = "可接受發布"
+        
+        # 檢核日期與報告生成時間取同一時間點
+        now = datetime.now()
+        
+        # 生成HTML報告：各段落先放入串列，最後一次合併
+        html_parts = [f"""<!DOCTYPE html>
+<html lang="zh-TW">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>招標文件檢核報告 - {case_id}</title>
+    <style>
+"""]
+        html_parts.append(self.REPORT_CSS)
+        html_parts.append(f"""    </style>
 </head>
 <body>
     <div class="container">
@@ -1231,7 +1224,7 @@ class Complete23ItemChecker:
         <div class="summary">
             <p><strong>案號：</strong>{case_id}</p>
             <p><strong>案名：</strong>自動識別</p>
-            <p><strong>檢核日期：</strong>{datetime.now().strftime('%Y-%m-%d')}</p>
+            <p><strong>檢核日期：</strong>{now.strftime('%Y-%m-%d')}</p>
             <p><strong>檢核標準：</strong>完整23項標準檢核（基於complete_tender_checklist_guide.md）</p>
         </div>
         
@@ -1242,53 +1235,33 @@ class Complete23ItemChecker:
             <p><strong>建議行動：</strong>{action}</p>
             <p><strong>檢核結果：{overall_status}</strong></p>
         </div>
-"""
+""")
         
         # 問題分類
         if high_risk_fails or medium_risk_fails or low_risk_fails:
-            html_content += "<h2>問題分類</h2>"
+            html_parts.append("<h2>問題分類</h2>")
             
-            if high_risk_fails:
-                html_content += f"""
-        <div class="risk-section risk-high">
-            <h3>🔴 重大問題 (P0優先級 - 發布前必須修正)</h3>
-            <ol>"""
-                for item in high_risk_fails:
-                    html_content += f"""
+            risk_sections = (
+                (high_risk_fails, "risk-high", "🔴 重大問題 (P0優先級 - 發布前必須修正)"),
+                (medium_risk_fails, "risk-medium", "🟡 重要問題 (P1優先級 - 強烈建議修正)"),
+                (low_risk_fails, "risk-low", "🟢 一般問題 (P2優先級 - 建議修正)")
+            )
+            for fails, section_class, title in risk_sections:
+                if not fails:
+                    continue
+                html_parts.append(f"""
+        <div class="risk-section {section_class}">
+            <h3>{title}</h3>
+            <ol>""")
+                html_parts.extend(f"""
                 <li><strong>{item['name']}：</strong>{item.get('problem', '不一致')}<br>
-                    修正建議：{item.get('suggestion', '請修正')}</li>"""
-                html_content += """
+                    修正建議：{item.get('suggestion', '請修正')}</li>""" for item in fails)
+                html_parts.append("""
             </ol>
-        </div>"""
-            
-            if medium_risk_fails:
-                html_content += f"""
-        <div class="risk-section risk-medium">
-            <h3>🟡 重要問題 (P1優先級 - 強烈建議修正)</h3>
-            <ol>"""
-                for item in medium_risk_fails:
-                    html_content += f"""
-                <li><strong>{item['name']}：</strong>{item.get('problem', '不一致')}<br>
-                    修正建議：{item.get('suggestion', '請修正')}</li>"""
-                html_content += """
-            </ol>
-        </div>"""
-            
-            if low_risk_fails:
-                html_content += f"""
-        <div class="risk-section risk-low">
-            <h3>🟢 一般問題 (P2優先級 - 建議修正)</h3>
-            <ol>"""
-                for item in low_risk_fails:
-                    html_content += f"""
-                <li><strong>{item['name']}：</strong>{item.get('problem', '不一致')}<br>
-                    修正建議：{item.get('suggestion', '請修正')}</li>"""
-                html_content += """
-            </ol>
-        </div>"""
+        </div>""")
         
         # 詳細檢核結果
-        html_content += """
+        html_parts.append("""
         <h2>詳細檢核結果</h2>
         <table>
             <thead>
@@ -1300,7 +1273,7 @@ class Complete23ItemChecker:
                     <th width="10%">結果</th>
                 </tr>
             </thead>
-            <tbody>"""
+            <tbody>""")
         
         for result in results:
             status_class = result['status']
@@ -1316,30 +1289,32 @@ class Complete23ItemChecker:
                 else:
                     row_class = "low-risk"
             
-            html_content += f"""
+            html_parts.append(f"""
                 <tr class="{row_class}">
                     <td>{result['num']}</td>
                     <td>{result['name']}</td>
                     <td>{result['ann_value']}</td>
                     <td>{result['ins_value']}</td>
                     <td class="{status_class}">{status_text}</td>
-                </tr>"""
+                </tr>""")
         
-        html_content += """
+        html_parts.append("""
             </tbody>
         </table>
         
         <div class="summary" style="margin-top: 40px;">
             <p><strong>檢核完成</strong></p>
             <p>本次檢核使用完整23項標準，基於政府採購法規定和最佳實踐指南。</p>
-            <p>報告生成時間：""" + datetime.now().strftime('%Y-%m-%d %H:%M:%S') + """</p>
+            <p>報告生成時間：""" + now.strftime('%Y-%m-%d %H:%M:%S') + """</p>
         </div>
     </div>
 </body>
-</html>"""
+</html>""")
+        html_content = ''.join(html_parts)
         
-        # 確保資料夾存在
-        os.makedirs(case_id, exist_ok=True)
+        # 確保資料夾存在（已存在時不再嘗試建立）
+        if not os.path.isdir(case_id):
+            os.makedirs(case_id, exist_ok=True)
         
         # 儲存報告（使用標準命名格式）
         report_filename = f"{case_id}/檢核報告_{case_id}_{overall_status}.html"
@@ -1359,18 +1334,56 @@ class Complete23ItemChecker:
         print(f"   - 低風險：{len(low_risk_fails)}項")
         print(f"   整體判定：{overall_status}")
 
+# 批次檢核：每個工作行程各自建立一個檢核器，跨案件重複使用
+_worker_checker = None
+
+def _init_check_worker(debug: bool):
+    """工作行程初始化：建立檢核器"""
+    global _worker_checker
+    _worker_checker = Complete23ItemChecker(debug=debug)
+
+def _check_one(case_id: str) -> str:
+    """於工作行程中檢核單一案號，回傳該案的輸出訊息，避免多案訊息交錯
+    
+    單一案件發生例外時附上錯誤追蹤並照常回傳，不中斷其他案件的檢核
+    """
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        try:
+            _worker_checker.check_case(case_id)
+        except Exception:
+            print(f"❌ 檢核{case_id}時發生錯誤：")
+            print(traceback.format_exc(), end="")
+    return output.getvalue()
+
+def check_many(case_ids: List[str], debug: bool = False, max_workers: Optional[int] = None):
+    """以多個行程平行檢核多個案號，依輸入順序印出各案結果"""
+    workers = min(max_workers or os.cpu_count() or 1, len(case_ids))
+    with ProcessPoolExecutor(max_workers=workers,
+                             initializer=_init_check_worker,
+                             initargs=(debug,)) as executor:
+        for case_output in executor.map(_check_one, case_ids):
+            print(case_output, end="")
+
 def main():
     """主程式"""
     import sys
     
-    if len(sys.argv) > 1:
-        case_id = sys.argv[1]
-        checker = Complete23ItemChecker(case_id)
+    # --debug：顯示欄位提取的除錯訊息
+    args = [arg for arg in sys.argv[1:] if arg != "--debug"]
+    debug = len(args) < len(sys.argv) - 1
+    
+    if len(args) > 1:
+        # 指定多個案號時平行檢核
+        check_many(args, debug=debug)
+    elif args:
+        case_id = args[0]
+        checker = Complete23ItemChecker(case_id, debug=debug)
         checker.check_case()
     else:
-        print("請指定案號，例如: python 完整23項檢核系統_C14A00149.py C13A05954")
+        print("請指定案號，例如: python 完整23項檢核系統_C14A00149.py C13A05954 [C14A00149 ...] [--debug]")
         print("或直接使用 C14A00149 作為預設案號")
-        checker = Complete23ItemChecker("C14A00149")
+        checker = Complete23ItemChecker("C14A00149", debug=debug)
         checker.check_case()
 
 if __name__ == "__main__":
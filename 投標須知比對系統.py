@@ -6,13 +6,22 @@
 """
 
 import zipfile
-import xml.etree.ElementTree as ET
 import re
 import difflib
 from datetime import datetime
 import os
-import PyPDF2
-import pdfplumber
+from tender_io import read_xml_text
+
+# extract_key_sections使用的正則表達式，模組載入時編譯一次
+_CASE_RE = re.compile(r'採購標的名稱及案號[：:：]([^。\n]+)')
+_DEPOSIT_RE = re.compile(r'押標金[：:：].*?新臺幣([0-9,]+)元')
+# 採購金額級距：比對結果以樣式文字記錄
+_AMOUNT_RES = [
+    re.compile(r'■\s*\(\s*一\s*\)\s*公告金額十分之一以下'),
+    re.compile(r'■\s*\(\s*二\s*\)\s*逾公告金額十分之一未達公告金額'),
+    re.compile(r'■\s*\(\s*三\s*\)\s*公告金額以上未達查核金額'),
+    re.compile(r'■\s*\(\s*四\s*\)\s*查核金額以上')
+]
 
 class TenderDocumentComparator:
     def __init__(self):
@@ -24,11 +33,11 @@ class TenderDocumentComparator:
         """提取ODT文件內容"""
         try:
             with zipfile.ZipFile(file_path, 'r') as zip_file:
-                content_xml = zip_file.read('content.xml').decode('utf-8')
-                # 移除XML標籤，保留純文字
-                clean_text = re.sub(r'<[^>]+>', ' ', content_xml)
-                clean_text = re.sub(r'\s+', ' ', clean_text).strip()
-                return clean_text
+                # 以串流方式解析content.xml，由C解析器移除標籤，不必對整份XML做兩次正則替換
+                with zip_file.open('content.xml') as xml_file:
+                    text = read_xml_text(xml_file)
+                # 整理空白字元
+                return ' '.join(text.split())
         except Exception as e:
             print(f"❌ 讀取ODT檔案失敗：{e}")
             return ""
@@ -36,22 +45,26 @@ class TenderDocumentComparator:
     def extract_pdf_content(self, file_path):
         """提取PDF文件內容"""
         try:
-            text = ""
+            # PDF函式庫載入成本高，只在實際讀取PDF時才匯入
+            import pdfplumber
+            # 逐頁收集後一次合併，避免字串反覆重新配置
+            chunks = []
             with pdfplumber.open(file_path) as pdf:
                 for page in pdf.pages:
                     page_text = page.extract_text()
                     if page_text:
-                        text += page_text + "\n"
-            return text
+                        chunks.append(page_text + "\n")
+            return "".join(chunks)
         except Exception as e:
             print(f"⚠️ pdfplumber失敗，嘗試PyPDF2：{e}")
             try:
-                text = ""
+                import PyPDF2
+                chunks = []
                 with open(file_path, 'rb') as file:
                     pdf_reader = PyPDF2.PdfReader(file)
                     for page in pdf_reader.pages:
-                        text += page.extract_text() + "\n"
-                return text
+                        chunks.append(page.extract_text() + "\n")
+                return "".join(chunks)
             except Exception as e2:
                 print(f"❌ 讀取PDF檔案失敗：{e2}")
                 return ""
@@ -61,20 +74,14 @@ class TenderDocumentComparator:
         sections = {}
         
         # 案號和案名
-        case_match = re.search(r'採購標的名稱及案號[：:：]([^。\n]+)', content)
+        case_match = _CASE_RE.search(content)
         if case_match:
             sections['案號案名'] = case_match.group(1).strip()
         
         # 採購金額級距
-        amount_patterns = [
-            r'■\s*\(\s*一\s*\)\s*公告金額十分之一以下',
-            r'■\s*\(\s*二\s*\)\s*逾公告金額十分之一未達公告金額',
-            r'■\s*\(\s*三\s*\)\s*公告金額以上未達查核金額',
-            r'■\s*\(\s*四\s*\)\s*查核金額以上'
-        ]
-        for pattern in amount_patterns:
-            if re.search(pattern, content):
-                sections['採購金額級距'] = pattern
+        for pattern in _AMOUNT_RES:
+            if pattern.search(content):
+                sections['採購金額級距'] = pattern.pattern
         
         # 外國廠商參與
         if '■不可參與投標' in content:
@@ -83,7 +90,7 @@ class TenderDocumentComparator:
             sections['外國廠商'] = '可以參與投標'
         
         # 押標金
-        deposit_match = re.search(r'押標金[：:：].*?新臺幣([0-9,]+)元', content)
+        deposit_match = _DEPOSIT_RE.search(content)
         if deposit_match:
             sections['押標金'] = deposit_match.group(1)
         
@@ -123,13 +130,18 @@ class TenderDocumentComparator:
                 })
         
         # 進行文字差異比對（找出其他細節差異）
-        problem_lines = problem_text.split('\n')
-        correct_lines = correct_text.split('\n')
+        # 只比對前100行避免太長，切分到第100行即停止，不必切分整份文件
+        problem_head = problem_text.split('\n', 100)[:100]
+        correct_head = correct_text.split('\n', 100)[:100]
+        
+        # 兩份內容相同時不必進入difflib逐行比對
+        if problem_head == correct_head:
+            return differences, []
         
         # 使用difflib找出差異
         differ = difflib.unified_diff(
-            problem_lines[:100],  # 只比對前100行避免太長
-            correct_lines[:100],
+            problem_head,
+            correct_head,
             fromfile='問題版本',
             tofile='正確版本',
             lineterm=''
@@ -153,7 +165,8 @@ class TenderDocumentComparator:
     
     def generate_html_report(self, differences, detailed_diffs):
         """生成HTML比對報告"""
-        html = """<!DOCTYPE html>
+        # 各段落先放入串列，最後一次合併
+        html_parts = ["""<!DOCTYPE html>
 <html lang="zh-TW">
 <head>
     <meta charset="UTF-8">
@@ -271,21 +284,24 @@ class TenderDocumentComparator:
                 </tr>
             </thead>
             <tbody>
-"""
+"""]
+        
+        # 依風險等級排序，差異表與修正建議共用
+        sorted_diffs = sorted(differences, key=lambda x: {'高': 0, '中': 1, '低': 2}[x['severity']])
         
         # 添加差異項目
-        for diff in sorted(differences, key=lambda x: {'高': 0, '中': 1, '低': 2}[x['severity']]):
+        for diff in sorted_diffs:
             risk_class = diff['severity'].lower() if diff['severity'] in ['高', '中', '低'] else ''
-            html += f"""
+            html_parts.append(f"""
                 <tr class="{risk_class}">
                     <td>{diff['item']}</td>
                     <td>{diff['problem']}</td>
                     <td>{diff['correct']}</td>
                     <td>{diff['severity']}風險</td>
                 </tr>
-"""
+""")
         
-        html += """
+        html_parts.append("""
             </tbody>
         </table>
         
@@ -295,39 +311,39 @@ class TenderDocumentComparator:
         </div>
         
         <div class="code-block">
-"""
+""")
         
         # 添加詳細差異（限制顯示行數）
         diff_count = 0
         for line in detailed_diffs[:50]:  # 只顯示前50行差異
             if line.startswith('+'):
-                html += f'<div class="diff-add">{line}</div>'
+                html_parts.append(f'<div class="diff-add">{line}</div>')
                 diff_count += 1
             elif line.startswith('-'):
-                html += f'<div class="diff-remove">{line}</div>'
+                html_parts.append(f'<div class="diff-remove">{line}</div>')
                 diff_count += 1
             elif line.startswith('@'):
-                html += f'<div style="color: #6c757d;">{line}</div>'
+                html_parts.append(f'<div style="color: #6c757d;">{line}</div>')
         
         if diff_count == 0:
-            html += '<div>未發現顯著的文字差異</div>'
+            html_parts.append('<div>未發現顯著的文字差異</div>')
         
-        html += """
+        html_parts.append("""
         </div>
         
         <h2>修正建議</h2>
         <div class="summary">
             <ol>
-"""
+""")
         
         # 添加修正建議
-        for diff in sorted(differences, key=lambda x: {'高': 0, '中': 1, '低': 2}[x['severity']]):
+        for diff in sorted_diffs:
             if diff['severity'] == '高':
-                html += f"<li><strong>{diff['item']}：</strong>必須立即修正為「{diff['correct']}」</li>"
+                html_parts.append(f"<li><strong>{diff['item']}：</strong>必須立即修正為「{diff['correct']}」</li>")
             else:
-                html += f"<li><strong>{diff['item']}：</strong>建議修正為「{diff['correct']}」</li>"
+                html_parts.append(f"<li><strong>{diff['item']}：</strong>建議修正為「{diff['correct']}」</li>")
         
-        html += """
+        html_parts.append("""
             </ol>
         </div>
         
@@ -338,9 +354,9 @@ class TenderDocumentComparator:
     </div>
 </body>
 </html>
-"""
+""")
         
-        return html
+        return ''.join(html_parts)
     
     def compare_documents(self):
         """執行文件比對"""